@@ -4,6 +4,7 @@ import itertools
 import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import (
     Any,
@@ -50,6 +51,7 @@ from sentry.models.groupsnooze import GroupSnooze
 from sentry.models.groupsubscription import GroupSubscription
 from sentry.models.organizationmember import OrganizationMember
 from sentry.models.orgauthtoken import is_org_auth_token_auth
+from sentry.models.project import Project
 from sentry.models.team import Team
 from sentry.models.user import User
 from sentry.notifications.helpers import (
@@ -81,7 +83,7 @@ from sentry.types.group import SUBSTATUS_TO_STR
 from sentry.utils.cache import cache
 from sentry.utils.json import JSONData
 from sentry.utils.safe import safe_execute
-from sentry.utils.snuba import aliased_query, raw_query
+from sentry.utils.snuba import SnubaQueryParams, aliased_query_params, bulk_raw_query, raw_query
 
 # TODO(jess): remove when snuba is primary backend
 snuba_tsdb = SnubaTSDB(**settings.SENTRY_TSDB_OPTIONS)
@@ -179,6 +181,21 @@ class SeenStats(TypedDict):
     user_count: int
 
 
+@dataclass(frozen=True)
+class SeenStatsQuery:
+    """
+    One of the seen stats queries `GroupSerializerSnuba` makes for a page of
+    issues, see `GroupSerializerSnuba._get_seen_stats_plan`.
+    """
+
+    start: Optional[datetime]
+    end: Optional[datetime]
+    conditions: Optional[Sequence[Any]]
+    # Whether `first_seen` and `times_seen` are taken from the query result
+    # rather than from the group.
+    use_result_first_seen_times_seen: bool
+
+
 class GroupSerializerBase(Serializer, ABC):
     def __init__(
         self,
@@ -289,6 +306,12 @@ class GroupSerializerBase(Serializer, ABC):
         ):
             merge_list_dictionaries(annotations_by_group_id, annotations_by_group)
 
+        projects = {item.project_id: item.project for item in item_list}
+        annotation_plugins = {
+            project_id: self._get_annotation_plugins(project)
+            for project_id, project in projects.items()
+        }
+
         snuba_stats = self._get_group_snuba_stats(item_list, seen_stats)
 
         result = {}
@@ -315,7 +338,7 @@ class GroupSerializerBase(Serializer, ABC):
                 "subscription": subscriptions[item.id],
                 "has_seen": seen_groups.get(item.id, active_date) > active_date,
                 "annotations": self._resolve_and_extend_plugin_annotation(
-                    item, annotations_by_group_id[item.id]
+                    item, annotations_by_group_id[item.id], annotation_plugins[item.project_id]
                 ),
                 "ignore_until": ignore_item,
                 "ignore_actor": actors.get(ignore_item.actor_id) if ignore_item else None,
@@ -728,10 +751,33 @@ class GroupSerializerBase(Serializer, ABC):
         return integration_annotations
 
     @staticmethod
+    def _get_annotation_plugins(project: Project) -> Tuple[Sequence[Any], Sequence[Any]]:
+        """
+        Returns the enabled version 1 and version 2 plugins of a project that
+        can annotate its issues. Checking whether a plugin is enabled looks up
+        project options, so this is done once per project rather than per issue.
+        """
+        from sentry.plugins.base import plugins
+
+        return (
+            [
+                plugin
+                for plugin in plugins.for_project(project=project, version=1)
+                if not is_plugin_deprecated(plugin, project)
+            ],
+            list(plugins.for_project(project=project, version=2)),
+        )
+
+    @classmethod
     def _resolve_and_extend_plugin_annotation(
-        item: Group, current_annotations: List[Any]
+        cls,
+        item: Group,
+        current_annotations: List[Any],
+        annotation_plugins: Optional[Tuple[Sequence[Any], Sequence[Any]]] = None,
     ) -> Sequence[Any]:
-        from sentry.plugins.base import plugins
+        if annotation_plugins is None:
+            annotation_plugins = cls._get_annotation_plugins(item.project)
+        plugins_v1, plugins_v2 = annotation_plugins
 
         annotations_for_group = []
         annotations_for_group.extend(current_annotations)
@@ -739,11 +785,9 @@ class GroupSerializerBase(Serializer, ABC):
         # add the annotations for plugins
         # note that the model GroupMeta(where all the information is stored) is already cached at the start of
         # `get_attrs`, so these for loops doesn't make a bunch of queries
-        for plugin in plugins.for_project(project=item.project, version=1):
-            if is_plugin_deprecated(plugin, item.project):
-                continue
+        for plugin in plugins_v1:
             safe_execute(plugin.tags, None, item, annotations_for_group, _with_transaction=False)
-        for plugin in plugins.for_project(project=item.project, version=2):
+        for plugin in plugins_v2:
             annotations_for_group.extend(
                 safe_execute(plugin.get_annotations, group=item, _with_transaction=False) or ()
             )
@@ -1031,40 +1075,113 @@ class GroupSerializerSnuba(GroupSerializerBase):
                         conditions.append(new_condition)
         self.conditions = conditions
 
+    def _get_seen_stats(
+        self, item_list: Sequence[Group], user
+    ) -> Optional[Mapping[Group, SeenStats]]:
+        if self._collapse("stats"):
+            return None
+
+        if not item_list:
+            return None
+
+        error_issues = [group for group in item_list if GroupCategory.ERROR == group.issue_category]
+        generic_issues = [
+            group for group in item_list if group.issue_category != GroupCategory.ERROR
+        ]
+        stats = self._execute_seen_stats_plan(
+            [
+                (error_issues, self._build_error_seen_stats_query),
+                (generic_issues, self._build_generic_seen_stats_query),
+            ]
+        )
+        return {group: stats.get(group, {}) for group in item_list}
+
     def _seen_stats_error(
         self, error_issue_list: Sequence[Group], user
     ) -> Mapping[Group, SeenStats]:
-        return self._parse_seen_stats_results(
-            self._execute_error_seen_stats_query(
-                item_list=error_issue_list,
-                start=self.start,
-                end=self.end,
-                conditions=self.conditions,
-                environment_ids=self.environment_ids,
-            ),
-            error_issue_list,
-            bool(self.start or self.end or self.conditions),
-            self.environment_ids,
+        return self._execute_seen_stats_plan(
+            [(error_issue_list, self._build_error_seen_stats_query)]
         )
 
     def _seen_stats_generic(
         self, generic_issue_list: Sequence[Group], user
     ) -> Mapping[Group, SeenStats]:
-        return self._parse_seen_stats_results(
-            self._execute_generic_seen_stats_query(
-                item_list=generic_issue_list,
-                start=self.start,
-                end=self.end,
-                conditions=self.conditions,
-                environment_ids=self.environment_ids,
-            ),
-            generic_issue_list,
-            bool(self.start or self.end or self.conditions),
-            self.environment_ids,
+        return self._execute_seen_stats_plan(
+            [(generic_issue_list, self._build_generic_seen_stats_query)]
         )
 
+    def _get_seen_stats_plan(self) -> Mapping[str, SeenStatsQuery]:
+        """
+        Returns the seen stats queries to make for every category of issues on
+        the page by name. Their results are put together by
+        `_combine_seen_stats`.
+        """
+        return {
+            "time_range": SeenStatsQuery(
+                self.start,
+                self.end,
+                self.conditions,
+                bool(self.start or self.end or self.conditions),
+            )
+        }
+
+    def _combine_seen_stats(
+        self, stats_by_query: Mapping[str, MutableMapping[Group, SeenStats]]
+    ) -> Mapping[Group, SeenStats]:
+        return stats_by_query["time_range"]
+
+    def _execute_seen_stats_plan(
+        self,
+        issue_lists: Sequence[Tuple[Sequence[Group], Callable[..., Mapping[str, Any]]]],
+    ) -> Mapping[Group, SeenStats]:
+        """
+        Makes all seen stats queries of the plan, for every given list of issues
+        and the function building the query for their dataset. Queries with the
+        same referrer, i.e. on the same dataset, are made in a single batch
+        instead of one Snuba request after the other.
+        """
+        plan = self._get_seen_stats_plan()
+        queries_by_referrer: MutableMapping[
+            str, List[Tuple[str, SeenStatsQuery, Sequence[Group], SnubaQueryParams]]
+        ] = defaultdict(list)
+        for issue_list, build_query in issue_lists:
+            if not issue_list:
+                continue
+            for name, query in plan.items():
+                params = build_query(
+                    item_list=issue_list,
+                    start=query.start,
+                    end=query.end,
+                    conditions=query.conditions,
+                    environment_ids=self.environment_ids,
+                )
+                queries_by_referrer[params["referrer"]].append(
+                    (name, query, issue_list, SnubaQueryParams(**params))
+                )
+
+        stats_by_query: MutableMapping[str, MutableMapping[Group, SeenStats]] = {
+            name: {} for name in plan
+        }
+        if not queries_by_referrer:
+            return {}
+
+        for referrer, queries in queries_by_referrer.items():
+            results = bulk_raw_query(
+                [snuba_params for _, _, _, snuba_params in queries], referrer=referrer
+            )
+            for (name, query, issue_list, _), result in zip(queries, results):
+                stats_by_query[name].update(
+                    self._parse_seen_stats_results(
+                        result,
+                        issue_list,
+                        query.use_result_first_seen_times_seen,
+                        self.environment_ids,
+                    )
+                )
+        return self._combine_seen_stats(stats_by_query)
+
     @staticmethod
-    def _execute_error_seen_stats_query(
+    def _build_error_seen_stats_query(
         item_list, start=None, end=None, conditions=None, environment_ids=None
     ):
         project_ids = list({item.project_id for item in item_list})
@@ -1079,7 +1196,7 @@ class GroupSerializerSnuba(GroupSerializerBase):
         if environment_ids:
             filters["environment"] = environment_ids
 
-        return aliased_query(
+        return aliased_query_params(
             dataset=Dataset.Events,
             start=start,
             end=end,
@@ -1094,40 +1211,7 @@ class GroupSerializerSnuba(GroupSerializerBase):
         )
 
     @staticmethod
-    def _execute_perf_seen_stats_query(
-        item_list, start=None, end=None, conditions=None, environment_ids=None
-    ):
-        project_ids = list({item.project_id for item in item_list})
-        group_ids = [item.id for item in item_list]
-        aggregations = [
-            ["arrayJoin", ["group_ids"], "group_id"],
-            ["count()", "", "times_seen"],
-            ["min", "timestamp", "first_seen"],
-            ["max", "timestamp", "last_seen"],
-            ["uniq", "tags[sentry:user]", "count"],
-        ]
-        filters = {"project_id": project_ids}
-        if environment_ids:
-            filters["environment"] = environment_ids
-        return aliased_query(
-            dataset=Dataset.Transactions,
-            start=start,
-            end=end,
-            groupby=["group_id"],
-            conditions=[
-                [["hasAny", ["group_ids", ["array", group_ids]]], "=", 1],
-            ]
-            + (conditions or []),
-            filter_keys=filters,
-            aggregations=aggregations,
-            referrer="serializers.GroupSerializerSnuba._execute_perf_seen_stats_query",
-            tenant_ids={"organization_id": item_list[0].project.organization_id}
-            if item_list
-            else None,
-        )
-
-    @staticmethod
-    def _execute_generic_seen_stats_query(
+    def _build_generic_seen_stats_query(
         item_list, start=None, end=None, conditions=None, environment_ids=None
     ):
         project_ids = list({item.project_id for item in item_list})
@@ -1141,7 +1225,7 @@ class GroupSerializerSnuba(GroupSerializerBase):
         filters = {"project_id": project_ids, "group_id": group_ids}
         if environment_ids:
             filters["environment"] = environment_ids
-        return aliased_query(
+        return aliased_query_params(
             dataset=Dataset.IssuePlatform,
             start=start,
             end=end,
@@ -4,7 +4,7 @@ import functools
 from abc import abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Callable, Mapping, MutableMapping, Optional, Sequence
+from typing import Any, Mapping, MutableMapping, Optional, Sequence
 
 from django.utils import timezone
 
@@ -14,6 +14,7 @@ from sentry.api.serializers.models.group import (
     GroupSerializer,
     GroupSerializerSnuba,
     SeenStats,
+    SeenStatsQuery,
     snuba_tsdb,
 )
 from sentry.constants import StatsPeriod
@@ -397,60 +398,33 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
             )
         return results
 
-    def _seen_stats_error(
-        self, error_issue_list: Sequence[Group], user
-    ) -> Mapping[Group, SeenStats]:
-        return self.__seen_stats_impl(error_issue_list, self._execute_error_seen_stats_query)
+    def _get_seen_stats_plan(self) -> Mapping[str, SeenStatsQuery]:
+        use_result_first_seen_times_seen = bool(self.start or self.end or self.conditions)
+        plan = {
+            "time_range": SeenStatsQuery(
+                self.start, self.end, None, use_result_first_seen_times_seen
+            )
+        }
+        if self.conditions and not self._collapse("filtered"):
+            plan["filtered"] = SeenStatsQuery(
+                self.start, self.end, self.conditions, use_result_first_seen_times_seen
+            )
+        if (self.start or self.end) and not self._collapse("lifetime"):
+            plan["lifetime"] = SeenStatsQuery(None, None, None, False)
+        return plan
 
-    def _seen_stats_generic(
-        self, generic_issue_list: Sequence[Group], user
+    def _combine_seen_stats(
+        self, stats_by_query: Mapping[str, MutableMapping[Group, SeenStats]]
     ) -> Mapping[Group, SeenStats]:
-        return self.__seen_stats_impl(generic_issue_list, self._execute_generic_seen_stats_query)
-
-    def __seen_stats_impl(
-        self,
-        error_issue_list: Sequence[Group],
-        seen_stats_func: Callable[[Any, Any, Any, Any, Any], Mapping[str, Any]],
-    ) -> Mapping[Any, SeenStats]:
-        partial_execute_seen_stats_query = functools.partial(
-            seen_stats_func,
-            item_list=error_issue_list,
-            environment_ids=self.environment_ids,
-            start=self.start,
-            end=self.end,
-        )
-        time_range_result = self._parse_seen_stats_results(
-            partial_execute_seen_stats_query(),
-            error_issue_list,
-            self.start or self.end or self.conditions,
-            self.environment_ids,
-        )
-        filtered_result = (
-            self._parse_seen_stats_results(
-                partial_execute_seen_stats_query(conditions=self.conditions),
-                error_issue_list,
-                self.start or self.end or self.conditions,
-                self.environment_ids,
-            )
-            if self.conditions and not self._collapse("filtered")
-            else None
-        )
+        time_range_result = stats_by_query["time_range"]
+        filtered_result = stats_by_query.get("filtered")
         lifetime_result = (
-            (
-                self._parse_seen_stats_results(
-                    partial_execute_seen_stats_query(start=None, end=None),
-                    error_issue_list,
-                    False,
-                    self.environment_ids,
-                )
-                if self.start or self.end
-                else time_range_result
-            )
+            stats_by_query.get("lifetime", time_range_result)
             if not self._collapse("lifetime")
             else None
         )
 
-        for item in error_issue_list:
+        for item in time_range_result:
             time_range_result[item].update(
                 {
                     "filtered": filtered_result.get(item) if filtered_result else None,
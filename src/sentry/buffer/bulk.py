@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import Any, Mapping, Set, Tuple, Type
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, router
+from django.db.models import Model
+
+# (counter increments, last-write-wins column values) for a single row
+BulkRow = Tuple[Mapping[str, int], Mapping[str, Any]]
+
+
+def can_bulk_update(
+    model: Type[Model], columns: Mapping[str, int], extra: Mapping[str, Any]
+) -> bool:
+    """
+    Returns whether the given buffered update only touches concrete columns of ``model`` and can
+    therefore be applied through `bulk_update`.
+    """
+    opts = model._meta
+    for name in list(columns) + list(extra):
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        if not getattr(field, "concrete", False) or field.primary_key:
+            return False
+    return True
+
+
+def bulk_update(model: Type[Model], rows: Mapping[int, BulkRow]) -> Set[int]:
+    """
+    Applies buffered updates for many rows of ``model`` with a single
+    ``UPDATE ... FROM (VALUES ...)`` statement.
+
+    ``rows`` maps primary keys to a ``(columns, extra)`` pair, where ``columns`` are counter
+    increments and ``extra`` are values that overwrite the current column value, including with
+    ``None``. Rows that do not mention a column leave it untouched.
+
+    Returns the set of primary keys that were actually updated, so that callers can deal with rows
+    that no longer (or not yet) exist.
+    """
+    if not rows:
+        return set()
+
+    from sentry.models.group import Group
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = model._meta
+
+    incr_fields = [
+        opts.get_field(name)
+        for name in sorted({c for columns, _ in rows.values() for c in columns})
+    ]
+    extra_fields = [
+        opts.get_field(name) for name in sorted({c for _, extra in rows.values() for c in extra})
+    ]
+    fields = [opts.pk] + incr_fields + extra_fields
+    # Whether a row sets the extra column, since `NULL` is a value it can be set to.
+    flag_columns = [qn("set_%s" % field.column) for field in extra_fields]
+
+    placeholder = "(%s)" % ", ".join(
+        ["CAST(%%s AS %s)" % field.db_type(connection=connection) for field in fields]
+        + ["CAST(%s AS boolean)"] * len(flag_columns)
+    )
+    params: list[Any] = []
+    for pk, (columns, extra) in rows.items():
+        params.append(pk)
+        for field in incr_fields:
+            params.append(columns.get(field.name))
+        for field in extra_fields:
+            value = extra.get(field.name)
+            params.append(
+                field.get_db_prep_save(value, connection=connection) if value is not None else None
+            )
+        for field in extra_fields:
+            params.append(field.name in extra)
+
+    assignments = [
+        "{col} = t.{col} + COALESCE(v.{col}, 0)".format(col=qn(field.column))
+        for field in incr_fields
+    ]
+    assignments += [
+        "{col} = CASE WHEN v.{flag} THEN v.{col} ELSE t.{col} END".format(
+            col=qn(field.column), flag=flag
+        )
+        for field, flag in zip(extra_fields, flag_columns)
+    ]
+
+    # Mirrors the `ScoreClause` special case in `Buffer.process`: the score is only recomputed
+    # for rows which carry both a `times_seen` increment and a new `last_seen`.
+    if (
+        model is Group
+        and "times_seen" in {field.name for field in incr_fields}
+        and "last_seen" in {field.name for field in extra_fields}
+    ):
+        assignments.append(
+            '"score" = CASE WHEN v."times_seen" IS NOT NULL AND v."last_seen" IS NOT NULL '
+            'THEN log(t."times_seen" + v."times_seen") * 600 '
+            '+ FLOOR(EXTRACT(EPOCH FROM v."last_seen")) ELSE t."score" END'
+        )
+
+    pk_column = qn(opts.pk.column)
+    sql = (
+        "UPDATE {table} AS t SET {assignments} "
+        "FROM (VALUES {values}) AS v ({columns}) "
+        "WHERE t.{pk} = v.{pk} RETURNING t.{pk}"
+    ).format(
+        table=qn(opts.db_table),
+        assignments=", ".join(assignments),
+        values=", ".join([placeholder] * len(rows)),
+        columns=", ".join([qn(field.column) for field in fields] + flag_columns),
+        pk=pk_column,
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {row[0] for row in cursor.fetchall()}
@@ -3,13 +3,18 @@ from __future__ import annotations
 import logging
 import pickle
 import threading
+from collections import defaultdict
 from datetime import date, datetime, timezone
 from time import time
 
 from django.db import models
+from django.db.models.signals import post_save
 from django.utils.encoding import force_bytes, force_str
 
+from sentry import options
 from sentry.buffer.base import Buffer
+from sentry.buffer.bulk import bulk_update, can_bulk_update
+from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr, process_pending
 from sentry.utils import json, metrics
 from sentry.utils.compat import crc32
@@ -272,7 +277,10 @@ class RedisBuffer(Buffer):
         if not client.set(lock_key, "1", nx=True, ex=60):
             return
 
-        pending_buffer = PendingBuffer(self.incr_batch_size)
+        if options.get("buffer.bulk-flush.enabled"):
+            pending_buffer = PendingBuffer(options.get("buffer.bulk-flush.batch-size"))
+        else:
+            pending_buffer = PendingBuffer(self.incr_batch_size)
 
         try:
             keycount = 0
@@ -318,12 +326,201 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if options.get("buffer.bulk-flush.enabled"):
+            self._process_batch(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
     def _process(self, model, columns, filters, extra=None, signal_only=None):
         return super().process(model, columns, filters, extra, signal_only)
 
+    def _load_payload(self, values):
+        """
+        Decodes the hash stored by `incr` into the arguments of `Buffer.process`.
+        """
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_str(k): v for k, v in values.items()}
+
+        model = import_string(force_str(values.pop("m")))
+
+        if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
+            filters = self._load_values(json.loads(force_str(values.pop("f"))))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(force_bytes(values.pop("f")))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"[" if not self.is_redis_cluster else "["):
+                    extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(force_bytes(v))
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
+
+    def _execute_for_keys(self, keys, command):
+        """
+        Runs ``command(client, key)`` for every key, pipelined per Redis host, and
+        returns the results in the same order as ``keys``.
+        """
+        if self.is_redis_cluster:
+            pipe = self.cluster.pipeline(transaction=False)
+            for key in keys:
+                command(pipe, key)
+            return pipe.execute()
+
+        with self.cluster.map() as client:
+            promises = [command(client, key) for key in keys]
+        return [promise.value for promise in promises]
+
+    def _read_and_clear_keys(self, keys):
+        """
+        Fetches and deletes the hashes of many buffer keys at once, removing them
+        from their pending sets. Returns a mapping of key to hash contents.
+        """
+        if self.is_redis_cluster:
+            pipe = self.cluster.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+                pipe.zrem(self._make_pending_key_from_key(key), key)
+                pipe.delete(key)
+            return dict(zip(keys, pipe.execute()[::3]))
+
+        # Group keys by host so every host gets a single transactional pipeline,
+        # matching the atomicity of `_process_single_incr`.
+        router = self.cluster.get_router()
+        keys_by_host = defaultdict(list)
+        for key in keys:
+            keys_by_host[router.get_host_for_key(key)].append(key)
+
+        rv = {}
+        for host_id, host_keys in keys_by_host.items():
+            pipe = self.cluster.get_local_client(host_id).pipeline()
+            for key in host_keys:
+                pipe.hgetall(key)
+                pipe.zrem(self._make_pending_key_from_key(key), key)
+                pipe.delete(key)
+            rv.update(zip(host_keys, pipe.execute()[::3]))
+        return rv
+
+    def _process_batch(self, batch_keys):
+        """
+        Flushes many buffer keys at once. Hashes are read with one pipeline per
+        Redis host, counters are merged per model and row in memory and then applied
+        with a single multi-row UPDATE per model. Anything that can't be expressed as
+        a plain primary key update (signal only updates, non-pk filters, rows which
+        don't exist yet) goes through the regular `Buffer.process` path.
+        """
+        with metrics.timer("buffer.bulk-flush.duration"):
+            locked = [
+                key
+                for key, acquired in zip(
+                    batch_keys,
+                    self._execute_for_keys(
+                        batch_keys,
+                        lambda client, key: client.set(
+                            self._make_lock_key(key), "1", nx=True, ex=10
+                        ),
+                    ),
+                )
+                if acquired
+            ]
+            if len(locked) < len(batch_keys):
+                metrics.incr(
+                    "buffer.revoked",
+                    amount=len(batch_keys) - len(locked),
+                    tags={"reason": "locked"},
+                    skip_internal=False,
+                )
+
+            try:
+                self._flush_payloads(self._read_and_clear_keys(locked))
+            finally:
+                self._execute_for_keys(
+                    locked, lambda client, key: client.delete(self._make_lock_key(key))
+                )
+
+        metrics.timing("buffer.bulk-flush.keys", len(batch_keys))
+
+    def _flush_payloads(self, payloads):
+        from sentry.models.group import Group
+
+        # model -> pk -> (columns, filters, extra)
+        rows_by_model = defaultdict(dict)
+        fallback = []
+
+        for key, values in payloads.items():
+            if not values:
+                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+                logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+                continue
+
+            model, columns, filters, extra, signal_only = self._load_payload(values)
+            pk = filters.get("id", filters.get("pk")) if len(filters) == 1 else None
+            if (
+                signal_only
+                or not isinstance(pk, int)
+                or not (isinstance(model, type) and issubclass(model, models.Model))
+                or not can_bulk_update(model, columns, extra)
+            ):
+                fallback.append((model, columns, filters, extra, signal_only))
+                continue
+
+            rows = rows_by_model[model]
+            if pk in rows:
+                # Two keys (e.g. `id` and `pk` filters) buffered for the same row.
+                merged_columns, filters, merged_extra = rows[pk]
+                for column, amount in columns.items():
+                    merged_columns[column] = merged_columns.get(column, 0) + amount
+                merged_extra.update(extra)
+            else:
+                rows[pk] = (columns, filters, extra)
+
+        for model, rows in rows_by_model.items():
+            tags = {"module": model.__module__, "model": model.__name__}
+            updated = bulk_update(
+                model, {pk: (columns, extra) for pk, (columns, _, extra) in rows.items()}
+            )
+            metrics.timing("buffer.bulk-flush.rows", len(updated), tags=tags)
+
+            if model is Group:
+                # `Buffer.process` goes through `Group.update`, which fires
+                # `post_save` to keep the group cache fresh; do the same here.
+                for instance in model.objects.filter(id__in=updated):
+                    post_save.send(sender=model, instance=instance, created=False)
+
+            for pk, (columns, filters, extra) in rows.items():
+                if pk in updated:
+                    buffer_incr_complete.send_robust(
+                        model=model,
+                        columns=columns,
+                        filters=filters,
+                        extra=extra,
+                        created=False,
+                        sender=model,
+                    )
+                else:
+                    # The row is gone (or never existed), let `Buffer.process`
+                    # decide whether it should be created.
+                    fallback.append((model, columns, filters, extra, None))
+
+        if fallback:
+            metrics.timing("buffer.bulk-flush.fallback", len(fallback))
+        for model, columns, filters, extra, signal_only in fallback:
+            self._process(model, columns, filters, extra, signal_only)
+
     def _process_single_incr(self, key):
         if self.is_redis_cluster:
             client = self.cluster
@@ -352,39 +549,12 @@ class RedisBuffer(Buffer):
             pipe.delete(key)
             values = pipe.execute()[0]
 
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_str(k): v for k, v in values.items()}
-
             if not values:
                 metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
                 logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            model = import_string(force_str(values.pop("m")))
-
-            if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
-                filters = self._load_values(json.loads(force_str(values.pop("f"))))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(force_bytes(values.pop("f")))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"[" if not self.is_redis_cluster else "["):
-                        extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(force_bytes(v))
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
+            model, incr_values, filters, extra_values, signal_only = self._load_payload(values)
             self._process(model, incr_values, filters, extra_values, signal_only)
         finally:
             client.delete(lock_key)
@@ -2103,6 +2103,9 @@ CACHE_VERSION = 1
 # Digests backend
 SENTRY_DIGESTS = "sentry.digests.backends.dummy.DummyBackend"
 SENTRY_DIGESTS_OPTIONS: dict[str, Any] = {}
+# The number of ready timelines that are digested and delivered by a single
+# task. With 1, every timeline is delivered by a task of its own.
+SENTRY_DIGESTS_DELIVERY_BATCH_SIZE = 1
 
 # Quota backend
 SENTRY_QUOTAS = "sentry.quotas.Quota"
@@ -2137,10 +2140,22 @@ SENTRY_DEFAULT_MAX_EVENTS_PER_MINUTE = "90%"
 SENTRY_SNUBA = os.environ.get("SNUBA", "http://127.0.0.1:1218")
 SENTRY_SNUBA_TIMEOUT = 30
 SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
+# Overrides of SENTRY_SNUBA_CACHE_TTL_SECONDS by referrer.
+SENTRY_SNUBA_CACHE_REFERRER_TTL_SECONDS: dict[str, int] = {}
+# How long cached results of a referrer are still served after they expired,
+# while they are refreshed in the background. Referrers that are not listed
+# never get stale results.
+SENTRY_SNUBA_CACHE_STALE_TTL_SECONDS: dict[str, int] = {}
+# How long to wait for the result of an identical cached query that is already
+# running before running it again. 0 disables coalescing of cached queries.
+SENTRY_SNUBA_CACHE_COALESCE_TIMEOUT_SECONDS = 10
 
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS: dict[str, Any] = {}
+# Mapping of zstd dictionary name (platform, "native" or "default") to the path
+# of a dictionary trained with `sentry nodestore train-dictionary`.
+SENTRY_NODESTORE_COMPRESSION_DICTIONARIES: dict[str, str] = {}
 
 # Node storage backend used for ArtifactBundle indexing (aka FlatFileIndex aka BundleIndex)
 SENTRY_INDEXSTORE = "sentry.nodestore.django.DjangoNodeStorage"
@@ -2178,6 +2193,14 @@ SENTRY_TSDB_ROLLUPS = (
     (3600 * 24, 90),  # 90 days at 1 day
 )
 
+# Coalesce the TSDB counter increments and distinct counter records of saved
+# events in memory (per process) and write them out every
+# `SENTRY_TSDB_COALESCE_FLUSH_INTERVAL` seconds, or as soon as more than
+# `SENTRY_TSDB_COALESCE_MAX_PENDING` counters are pending.
+SENTRY_TSDB_COALESCE_WRITES = False
+SENTRY_TSDB_COALESCE_FLUSH_INTERVAL = 1.0
+SENTRY_TSDB_COALESCE_MAX_PENDING = 10000
+
 # Internal metrics
 SENTRY_METRICS_BACKEND = "sentry.metrics.dummy.DummyMetricsBackend"
 SENTRY_METRICS_OPTIONS: dict[str, Any] = {}
@@ -3513,6 +3536,15 @@ SENTRY_GROUPING_AUTO_UPDATE_ENABLED = False
 # How long the migration phase for grouping lasts
 SENTRY_GROUPING_UPDATE_MIGRATION_PHASE = 7 * 24 * 3600  # 7 days
 
+# Results of applying grouping enhancements to a stacktrace are cached by
+# stacktrace fingerprint, in the default cache (shared) and in a per-process
+# LRU in front of it. The LRU is bounded by the number of stacktraces and by
+# their total number of frames; setting either limit to 0 disables it.
+SENTRY_GROUPING_STACKTRACE_CACHE_TTL = 300
+SENTRY_GROUPING_STACKTRACE_CACHE_LOCAL_TTL = 60
+SENTRY_GROUPING_STACKTRACE_CACHE_LOCAL_MAX_ENTRIES = 10000
+SENTRY_GROUPING_STACKTRACE_CACHE_LOCAL_MAX_FRAMES = 500000
+
 SENTRY_USE_UWSGI = True
 
 # When copying attachments for to-be-reprocessed events into processing store,
@@ -3706,6 +3738,16 @@ SENTRY_POST_PROCESS_LOCKS_BACKEND_OPTIONS = {
     "options": {"cluster": "default"},
 }
 
+# Number of threads the independent steps of a post-process job (see
+# `POST_PROCESS_PIPELINE_STEP_DEPENDENCIES`) run on, next to the task's own
+# thread. 1 runs all steps in order on the task's own thread.
+SENTRY_POST_PROCESS_PIPELINE_CONCURRENCY = 1
+
+# Seconds a post-process pipeline step may take, by step name. Steps that run
+# longer are counted in the `deadline_exceeded` metric.
+SENTRY_POST_PROCESS_PIPELINE_DEFAULT_DEADLINE = 30.0
+SENTRY_POST_PROCESS_PIPELINE_DEADLINES: dict[str, float] = {}
+
 # maximum number of projects allowed to query snuba with for the organization_vitals_overview endpoint
 ORGANIZATION_VITALS_OVERVIEW_PROJECT_LIMIT = 300
 
@@ -1,5 +1,17 @@
 import logging
-from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional
+from contextlib import contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+)
 
 from sentry.utils.imports import import_string
 from sentry.utils.services import Service
@@ -58,7 +70,16 @@ class Backend(Service):
     be transitioned to "waiting" instead.)
     """
 
-    __all__ = ("add", "delete", "digest", "enabled", "maintenance", "schedule", "validate")
+    __all__ = (
+        "add",
+        "delete",
+        "digest",
+        "digest_many",
+        "enabled",
+        "maintenance",
+        "schedule",
+        "validate",
+    )
 
     def __init__(self, **options: Any) -> None:
         # The ``minimum_delay`` option defines the default minimum amount of
@@ -168,6 +189,61 @@ class Backend(Service):
         """
         raise NotImplementedError
 
+    @contextmanager
+    def digest_many(
+        self,
+        keys: Sequence[str],
+        minimum_delays: Optional[Mapping[str, Optional[int]]] = None,
+        timestamp: Optional[float] = None,
+    ) -> Iterator[MutableMapping[str, List["Record"]]]:
+        """
+        Extract records from several timelines for processing at once.
+
+        This method acts as a context manager, like ``digest``. The target of
+        the ``as`` clause is a mapping of timeline keys to the records of each
+        timeline. Timelines that are not in the "ready" state, or that are
+        being digested elsewhere, are left out of the mapping.
+
+        If the context manager successfully exits, the timelines in the
+        mapping are closed as if they had been digested individually.
+        Timelines that the caller removes from the mapping are left untouched,
+        just like all of them are if an exception is raised, so that they are
+        retried after being rescheduled by the maintenance process.
+
+        ``minimum_delays`` maps timeline keys to their minimum delay, falling
+        back to the backend default for missing keys.
+
+        Backends can override this to digest timelines with fewer round trips
+        than the default implementation, which digests them one by one.
+        """
+        if minimum_delays is None:
+            minimum_delays = {}
+
+        contexts: MutableMapping[str, ContextManager[List["Record"]]] = {}
+        timelines: MutableMapping[str, List["Record"]] = {}
+        try:
+            for key in keys:
+                context = self.digest(key, minimum_delay=minimum_delays.get(key))
+                try:
+                    timelines[key] = context.__enter__()
+                except InvalidState as error:
+                    logger.info("Skipped digest of %s: %s", key, error)
+                    continue
+                contexts[key] = context
+
+            yield timelines
+        except BaseException as error:
+            for context in contexts.values():
+                context.__exit__(type(error), error, error.__traceback__)
+            raise
+        else:
+            skipped = InvalidState("Timeline was removed from the digest batch.")
+            for key, context in contexts.items():
+                if key in timelines:
+                    context.__exit__(None, None, None)
+                else:
+                    context.__exit__(InvalidState, skipped, None)
+
     def schedule(
         self, deadline: float, timestamp: Optional[float] = None
     ) -> Iterable["ScheduleEntry"]:
@@ -1,13 +1,15 @@
 import logging
 import time
+from collections import defaultdict
 from contextlib import contextmanager
-from typing import Any, Iterable, Optional, Tuple
+from typing import Any, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
 from rb.clients import LocalClient
 from redis.exceptions import ResponseError
 
 from sentry.digests import Record, ScheduleEntry
 from sentry.digests.backends.base import Backend, InvalidState
+from sentry.utils import metrics
 from sentry.utils.locking.backends.redis import RedisLockBackend
 from sentry.utils.locking.lock import Lock
 from sentry.utils.locking.manager import LockManager
@@ -215,28 +217,7 @@ class RedisBackend(Backend):
                 else:
                     raise
 
-            records = [
-                Record(
-                    key.decode(),
-                    self.codec.decode(value) if value is not None else None,
-                    float(timestamp),
-                )
-                for key, value, timestamp in response
-            ]
-
-            # If the record value is `None`, this means the record data was
-            # missing (it was presumably evicted by Redis) so we don't need to
-            # return it here.
-            filtered_records = [record for record in records if record.value is not None]
-            if len(records) != len(filtered_records):
-                logger.warning(
-                    "Filtered out missing records when fetching digest",
-                    extra={
-                        "key": key,
-                        "record_count": len(records),
-                        "filtered_record_count": len(filtered_records),
-                    },
-                )
+            records, filtered_records = self._decode_records(key, response)
             yield filtered_records
 
             script(
@@ -246,6 +227,126 @@ class RedisBackend(Backend):
                 + [record.key for record in records],
             )
 
+    def _decode_records(self, key: str, response: Any) -> Tuple[List[Record], List[Record]]:
+        """
+        Returns all records of a digest, and the records that still have a
+        value.
+        """
+        records = [
+            Record(
+                record_key.decode(),
+                self.codec.decode(value) if value is not None else None,
+                float(timestamp),
+            )
+            for record_key, value, timestamp in response
+        ]
+
+        # If the record value is `None`, this means the record data was
+        # missing (it was presumably evicted by Redis) so we don't need to
+        # return it here.
+        filtered_records = [record for record in records if record.value is not None]
+        if len(records) != len(filtered_records):
+            logger.warning(
+                "Filtered out missing records when fetching digest",
+                extra={
+                    "key": key,
+                    "record_count": len(records),
+                    "filtered_record_count": len(filtered_records),
+                },
+            )
+        return records, filtered_records
+
+    @contextmanager
+    def digest_many(
+        self,
+        keys: Sequence[str],
+        minimum_delays: Optional[Mapping[str, Optional[int]]] = None,
+        timestamp: Optional[float] = None,
+    ) -> Iterator[MutableMapping[str, List[Record]]]:
+        """
+        Digests the timelines with a single script call per host to open them
+        and another one to close them. Timelines are locked with the same locks
+        as ``digest`` uses, which are taken and released by the scripts. A
+        timeline whose lock expired before it is closed is left as it is, so
+        that its records are delivered again.
+        """
+        if minimum_delays is None:
+            minimum_delays = {}
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        router = self.cluster.get_router()
+        keys_by_host: MutableMapping[int, List[str]] = defaultdict(list)
+        for key in keys:
+            keys_by_host[router.get_host_for_key(f"{self.namespace}:t:{key}")].append(key)
+
+        lock_backend = self.locks.backend
+        lock = [lock_backend.prefix, lock_backend.uuid, 30]
+
+        # host -> timeline key -> keys of all records in the digest
+        opened: MutableMapping[int, MutableMapping[str, List[str]]] = defaultdict(dict)
+        timelines: MutableMapping[str, List[Record]] = {}
+
+        def close(hosts: Iterable[int], closing: bool) -> None:
+            for host in hosts:
+                arguments = ["DIGEST_CLOSE_MANY", self.namespace, self.ttl, timestamp, *lock]
+                for key, record_keys in opened[host].items():
+                    if closing and key in timelines:
+                        minimum_delay = minimum_delays.get(key)
+                        if minimum_delay is None:
+                            minimum_delay = self.minimum_delay
+                        arguments += [key, minimum_delay, len(record_keys), *record_keys]
+                    else:
+                        arguments += [key, -1, 0]
+                expired = script(self.cluster.get_local_client(host), ["-"], arguments)
+                for key in expired:
+                    logger.warning(
+                        "Timeline lock expired before the digest was closed",
+                        extra={"key": key.decode()},
+                    )
+                    metrics.incr("digests.digest_many.lock_expired")
+
+        try:
+            for host, host_keys in keys_by_host.items():
+                response = script(
+                    self.cluster.get_local_client(host),
+                    ["-"],
+                    [
+                        "DIGEST_OPEN_MANY",
+                        self.namespace,
+                        self.ttl,
+                        timestamp,
+                        *lock,
+                        self.capacity if self.capacity else -1,
+                        *host_keys,
+                    ],
+                )
+                for key, status, records_response in response:
+                    key = key.decode()
+                    if status != b"ok":
+                        logger.info(
+                            "Skipped digest delivery",
+                            extra={"key": key, "reason": status.decode()},
+                        )
+                        metrics.incr(
+                            "digests.digest_many.skipped", tags={"reason": status.decode()}
+                        )
+                        continue
+                    records, timelines[key] = self._decode_records(key, records_response)
+                    opened[host][key] = [record.key for record in records]
+        except Exception:
+            close(opened.keys(), closing=False)
+            raise
+
+        try:
+            yield timelines
+        except BaseException:
+            close(opened.keys(), closing=False)
+            raise
+        else:
+            close(opened.keys(), closing=True)
+
     def delete(self, key: str, timestamp: Optional[float] = None) -> None:
         if timestamp is None:
             timestamp = time.time()
@@ -70,6 +70,7 @@ from sentry.grouping.api import (
     get_grouping_config_dict_for_project,
     load_grouping_config,
 )
+from sentry.grouping.enhancer.cache import LRUCache
 from sentry.grouping.result import CalculatedHashes
 from sentry.ingest.inbound_filters import FilterStatKeys
 from sentry.issues.grouptype import GroupCategory
@@ -119,6 +120,7 @@ from sentry.tasks.integrations import kick_off_status_syncs
 from sentry.tasks.process_buffer import buffer_incr
 from sentry.tasks.relay import schedule_invalidate_project_config
 from sentry.tsdb.base import TSDBModel
+from sentry.tsdb.coalescing import get_writer as get_tsdb_writer
 from sentry.types.activity import ActivityType
 from sentry.types.group import GroupSubStatus
 from sentry.utils import json, metrics
@@ -126,6 +128,7 @@ from sentry.utils.cache import cache_key_for_event
 from sentry.utils.canonical import CanonicalKeyDict
 from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.event import has_event_minified_stack_trace, has_stacktrace, is_handled
+from sentry.utils.hashlib import md5_text
 from sentry.utils.metrics import MutableTags
 from sentry.utils.outcomes import Outcome, track_outcome
 from sentry.utils.performance_issues.performance_detection import detect_performance_problems
@@ -145,6 +148,21 @@ CRASH_REPORT_TIMEOUT = 24 * 3600  # one day
 
 NON_TITLE_EVENT_TITLES = ["<untitled>", "<unknown>", "<unlabeled event>"]
 
+# Top-level event payload keys that neither the grouping strategies nor
+# fingerprint variables read. They differ between otherwise identical events
+# (the same crash over and over again, typically) and are left out of the key
+# under which calculated hashes are reused.
+GROUPING_IGNORED_KEYS = frozenset(("event_id", "timestamp", "received", "breadcrumbs", "_metrics"))
+
+# Hashes calculated by `_calculate_event_grouping`, by the grouping config and
+# the normalized and fingerprinted payload they were calculated from.
+GROUPING_HASHES_CACHE_MAX_ENTRIES = 10000
+_grouping_hashes_cache: LRUCache[str, CalculatedHashes] = LRUCache(
+    "event_manager.grouping_hashes_cache",
+    max_entries=GROUPING_HASHES_CACHE_MAX_ENTRIES,
+    max_size=GROUPING_HASHES_CACHE_MAX_ENTRIES,
+)
+
 
 @dataclass
 class GroupInfo:
@@ -521,63 +539,10 @@ class EventManager:
         _derive_plugin_tags_many(jobs, projects)
         _derive_interface_tags_many(jobs)
 
-        do_background_grouping_before = options.get("store.background-grouping-before")
-        if do_background_grouping_before:
-            _run_background_grouping(project, job)
-
-        secondary_hashes = None
-        migrate_off_hierarchical = False
-
-        if _check_to_run_secondary_grouping(project):
-            with metrics.timer("event_manager.secondary_grouping", tags=metric_tags):
-                secondary_hashes = calculate_secondary_hash_if_needed(project, job)
-
-        with metrics.timer("event_manager.load_grouping_config"):
-            # At this point we want to normalize the in_app values in case the
-            # clients did not set this appropriately so far.
-            if is_reprocessed:
-                # The customer might have changed grouping enhancements since
-                # the event was ingested -> make sure we get the fresh one for reprocessing.
-                grouping_config = get_grouping_config_dict_for_project(project)
-                # Write back grouping config because it might have changed since the
-                # event was ingested.
-                # NOTE: We could do this unconditionally (regardless of `is_processed`).
-                job["data"]["grouping_config"] = grouping_config
-            else:
-                grouping_config = get_grouping_config_dict_for_event_data(
-                    job["event"].data.data, project
-                )
-
-        with sentry_sdk.start_span(
-            op="event_manager",
-            description="event_manager.save.calculate_event_grouping",
-        ), metrics.timer("event_manager.calculate_event_grouping", tags=metric_tags):
-            hashes = _calculate_event_grouping(project, job["event"], grouping_config)
-
-        # Because this logic is not complex enough we want to special case the situation where we
-        # migrate from a hierarchical hash to a non hierarchical hash.  The reason being that
-        # `_save_aggregate` needs special logic to not create orphaned hashes in migration cases
-        # but it wants a different logic to implement splitting of hierarchical hashes.
-        migrate_off_hierarchical = bool(
-            secondary_hashes
-            and secondary_hashes.hierarchical_hashes
-            and not hashes.hierarchical_hashes
-        )
-
-        hashes = CalculatedHashes(
-            hashes=list(hashes.hashes) + list(secondary_hashes and secondary_hashes.hashes or []),
-            hierarchical_hashes=(
-                list(hashes.hierarchical_hashes)
-                + list(secondary_hashes and secondary_hashes.hierarchical_hashes or [])
-            ),
-            tree_labels=(
-                hashes.tree_labels or (secondary_hashes and secondary_hashes.tree_labels) or []
-            ),
-        )
-
-        if not do_background_grouping_before:
-            _run_background_grouping(project, job)
+        with sentry_sdk.start_span(op="event_manager.save.calculate_grouping_many"):
+            _calculate_grouping_many(project, jobs, metric_tags)
 
+        hashes = job["hashes"]
         if hashes.tree_labels:
             job["finest_tree_label"] = hashes.finest_tree_label
 
@@ -603,7 +568,8 @@ class EventManager:
                     release=job["release"],
                     metadata=dict(job["event_metadata"]),
                     received_timestamp=job["received_timestamp"],
-                    migrate_off_hierarchical=migrate_off_hierarchical,
+                    migrate_off_hierarchical=job["migrate_off_hierarchical"],
+                    existing_grouphashes=job["grouphashes"],
                     **group_creation_kwargs,
                 )
                 job["groups"] = [group_info]
@@ -1267,6 +1233,8 @@ def _tsdb_record_all_metrics(jobs: Sequence[Job]) -> None:
 
     # XXX: validate whether anybody actually uses those metrics
 
+    tsdb_writer = get_tsdb_writer()
+
     for job in jobs:
         incrs = []
         frequencies = []
@@ -1306,10 +1274,10 @@ def _tsdb_record_all_metrics(jobs: Sequence[Job]) -> None:
             records.append((TSDBModel.users_affected_by_project, project_id, (user.tag_value,)))
 
         if incrs:
-            tsdb.backend.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
+            tsdb_writer.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
 
         if records:
-            tsdb.backend.record_multi(
+            tsdb_writer.record_multi(
                 records, timestamp=event.datetime, environment_id=environment.id
             )
 
@@ -1564,12 +1532,20 @@ def _save_aggregate(
     metadata: dict[str, Any],
     received_timestamp: Union[int, float],
     migrate_off_hierarchical: Optional[bool] = False,
+    existing_grouphashes: Optional[Mapping[str, GroupHash]] = None,
     **kwargs: Any,
 ) -> Optional[GroupInfo]:
     project = event.project
 
+    # Look up all flat and hierarchical hashes with a single query (unless the
+    # caller already fetched them for a whole batch), and only fall back to
+    # `get_or_create` for the ones that do not exist yet.
+    if existing_grouphashes is None:
+        existing_grouphashes = _get_grouphashes(project, hashes)
     flat_grouphashes = [
-        GroupHash.objects.get_or_create(project=project, hash=hash)[0] for hash in hashes.hashes
+        existing_grouphashes.get(hash)
+        or GroupHash.objects.get_or_create(project=project, hash=hash)[0]
+        for hash in hashes.hashes
     ]
 
     # The root_hierarchical_hash is the least specific hash within the tree, so
@@ -1579,13 +1555,17 @@ def _save_aggregate(
     # when groups are created and also relieves contention by locking a more
     # specific hash than `hierarchical_hashes[0]`.
     existing_grouphash, root_hierarchical_hash = _find_existing_grouphash(
-        project, flat_grouphashes, hashes.hierarchical_hashes
+        project,
+        flat_grouphashes,
+        hashes.hierarchical_hashes,
+        hierarchical_grouphashes=existing_grouphashes,
     )
 
     if root_hierarchical_hash is not None:
-        root_hierarchical_grouphash = GroupHash.objects.get_or_create(
-            project=project, hash=root_hierarchical_hash
-        )[0]
+        root_hierarchical_grouphash = (
+            existing_grouphashes.get(root_hierarchical_hash)
+            or GroupHash.objects.get_or_create(project=project, hash=root_hierarchical_hash)[0]
+        )
 
         metadata.update(
             hashes.group_metadata_from_hash(
@@ -1772,21 +1752,52 @@ def _save_aggregate(
     return GroupInfo(group, is_new, is_regression)
 
 
+def _get_grouphashes(project: Project, hashes: CalculatedHashes) -> dict[str, GroupHash]:
+    """
+    Fetches the existing GroupHash rows for all flat and hierarchical hashes of
+    an event with one query.
+    """
+    return _get_grouphashes_many(project, [hashes])
+
+
+def _get_grouphashes_many(
+    project: Project, hashes_many: Sequence[CalculatedHashes]
+) -> dict[str, GroupHash]:
+    """
+    Fetches the existing GroupHash rows for all flat and hierarchical hashes of
+    a batch of events with one query.
+    """
+    all_hashes: set[str] = set()
+    for hashes in hashes_many:
+        all_hashes.update(hashes.hashes)
+        all_hashes.update(hashes.hierarchical_hashes or ())
+    if not all_hashes:
+        return {}
+    return {h.hash: h for h in GroupHash.objects.filter(project=project, hash__in=all_hashes)}
+
+
 def _find_existing_grouphash(
     project: Project,
     flat_grouphashes: Sequence[GroupHash],
     hierarchical_hashes: Optional[Sequence[str]],
+    hierarchical_grouphashes: Optional[Mapping[str, GroupHash]] = None,
 ) -> tuple[Optional[GroupHash], Optional[str]]:
+    """
+    Finds the GroupHash that determines the group of an event. Already fetched
+    GroupHash rows can be passed as `hierarchical_grouphashes` (by hash) to
+    avoid looking them up again.
+    """
     all_grouphashes = []
     root_hierarchical_hash = None
 
     found_split = False
 
     if hierarchical_hashes:
-        hierarchical_grouphashes = {
-            h.hash: h
-            for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
-        }
+        if hierarchical_grouphashes is None:
+            hierarchical_grouphashes = {
+                h.hash: h
+                for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
+            }
 
         # Look for splits:
         # 1. If we find a hash with SPLIT state at `n`, we want to use
@@ -2492,6 +2503,78 @@ def _materialize_event_metrics(jobs: Sequence[Job]) -> None:
         job["event_metrics"] = event_metrics
 
 
+def _calculate_grouping_many(
+    project: Project, jobs: Sequence[Job], metric_tags: MutableTags
+) -> None:
+    """
+    Grouping stage of `save_error_events`. Calculates the (primary and
+    secondary) hashes of all jobs, where identical events reuse each other's
+    hashes (see `_get_event_hashes`), and then fetches the existing GroupHash
+    rows of all jobs with a single query.
+    """
+    do_background_grouping_before = options.get("store.background-grouping-before")
+    run_secondary_grouping = _check_to_run_secondary_grouping(project)
+
+    for job in jobs:
+        if do_background_grouping_before:
+            _run_background_grouping(project, job)
+
+        secondary_hashes = None
+        if run_secondary_grouping:
+            with metrics.timer("event_manager.secondary_grouping", tags=metric_tags):
+                secondary_hashes = calculate_secondary_hash_if_needed(project, job)
+
+        with metrics.timer("event_manager.load_grouping_config"):
+            # At this point we want to normalize the in_app values in case the
+            # clients did not set this appropriately so far.
+            if is_reprocessed_event(job["data"]):
+                # The customer might have changed grouping enhancements since
+                # the event was ingested -> make sure we get the fresh one for reprocessing.
+                grouping_config = get_grouping_config_dict_for_project(project)
+                # Write back grouping config because it might have changed since the
+                # event was ingested.
+                # NOTE: We could do this unconditionally (regardless of `is_processed`).
+                job["data"]["grouping_config"] = grouping_config
+            else:
+                grouping_config = get_grouping_config_dict_for_event_data(
+                    job["event"].data.data, project
+                )
+
+        with sentry_sdk.start_span(
+            op="event_manager",
+            description="event_manager.save.calculate_event_grouping",
+        ), metrics.timer("event_manager.calculate_event_grouping", tags=metric_tags):
+            hashes = _calculate_event_grouping(project, job["event"], grouping_config)
+
+        # Because this logic is not complex enough we want to special case the situation where we
+        # migrate from a hierarchical hash to a non hierarchical hash.  The reason being that
+        # `_save_aggregate` needs special logic to not create orphaned hashes in migration cases
+        # but it wants a different logic to implement splitting of hierarchical hashes.
+        job["migrate_off_hierarchical"] = bool(
+            secondary_hashes
+            and secondary_hashes.hierarchical_hashes
+            and not hashes.hierarchical_hashes
+        )
+
+        job["hashes"] = CalculatedHashes(
+            hashes=list(hashes.hashes) + list(secondary_hashes and secondary_hashes.hashes or []),
+            hierarchical_hashes=(
+                list(hashes.hierarchical_hashes)
+                + list(secondary_hashes and secondary_hashes.hierarchical_hashes or [])
+            ),
+            tree_labels=(
+                hashes.tree_labels or (secondary_hashes and secondary_hashes.tree_labels) or []
+            ),
+        )
+
+        if not do_background_grouping_before:
+            _run_background_grouping(project, job)
+
+    grouphashes = _get_grouphashes_many(project, [job["hashes"] for job in jobs])
+    for job in jobs:
+        job["grouphashes"] = grouphashes
+
+
 def _calculate_event_grouping(
     project: Project, event: Event, grouping_config: GroupingConfig
 ) -> CalculatedHashes:
@@ -2527,19 +2610,44 @@ def _calculate_event_grouping(
             )
 
         with metrics.timer("event_manager.event.get_hashes", tags=metric_tags):
-            # Here we try to use the grouping config that was requested in the
-            # event. If that config has since been deleted (because it was an
-            # experimental grouping config) we fall back to the default.
-            try:
-                hashes = event.get_hashes(grouping_config)
-            except GroupingConfigNotFound:
-                event.data["grouping_config"] = get_grouping_config_dict_for_project(project)
-                hashes = event.get_hashes()
+            hashes = _get_event_hashes(project, event, grouping_config)
 
         hashes.write_to_event(event.data)
         return hashes
 
 
+def _get_grouping_hashes_cache_key(
+    project: Project, event: Event, grouping_config: GroupingConfig
+) -> str:
+    data = {k: v for k, v in event.data.data.items() if k not in GROUPING_IGNORED_KEYS}
+    return md5_text(json.dumps([project.id, grouping_config, data], sort_keys=True)).hexdigest()
+
+
+def _get_event_hashes(
+    project: Project, event: Event, grouping_config: GroupingConfig
+) -> CalculatedHashes:
+    """
+    Runs the grouping strategies on an already normalized and fingerprinted
+    event, unless hashes were calculated for an identical payload before.
+    """
+    cache_key = _get_grouping_hashes_cache_key(project, event, grouping_config)
+    hashes = _grouping_hashes_cache.get(cache_key, tags={"grouping_config": grouping_config["id"]})
+    if hashes is not None:
+        return copy.deepcopy(hashes)
+
+    # Here we try to use the grouping config that was requested in the
+    # event. If that config has since been deleted (because it was an
+    # experimental grouping config) we fall back to the default.
+    try:
+        hashes = event.get_hashes(grouping_config)
+    except GroupingConfigNotFound:
+        event.data["grouping_config"] = get_grouping_config_dict_for_project(project)
+        return event.get_hashes()
+
+    _grouping_hashes_cache.set(cache_key, copy.deepcopy(hashes))
+    return hashes
+
+
 @metrics.wraps("save_event.calculate_span_grouping")
 def _calculate_span_grouping(jobs: Sequence[Job], projects: ProjectsMapping) -> None:
     for job in jobs:
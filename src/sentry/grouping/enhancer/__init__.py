@@ -9,7 +9,6 @@ from typing import Any, Sequence
 
 import msgpack
 import sentry_sdk
-from django.core.cache import cache
 from parsimonious.exceptions import ParseError
 from parsimonious.grammar import Grammar
 from parsimonious.nodes import NodeVisitor
@@ -17,12 +16,14 @@ from parsimonious.nodes import NodeVisitor
 from sentry import projectoptions
 from sentry.grouping.component import GroupingComponent
 from sentry.stacktraces.functions import set_in_app
-from sentry.utils import metrics
-from sentry.utils.hashlib import hash_value
+from sentry.utils import json, metrics
+from sentry.utils.cache import memoize
+from sentry.utils.hashlib import hash_value, hash_values
 from sentry.utils.safe import get_path, set_path
 from sentry.utils.strings import unescape_string
 
 from .actions import Action, FlagAction, VarAction
+from .cache import LRUCache, StacktraceCache
 from .exceptions import InvalidEnhancerConfig
 from .matchers import (
     CalleeMatch,
@@ -32,6 +33,7 @@ from .matchers import (
     Match,
     create_match_frame,
 )
+from .program import EnhancementsProgram
 
 DATADOG_KEY = "save_event.stacktrace"
 logger = logging.getLogger(__name__)
@@ -85,6 +87,20 @@ _        = space*
 VERSIONS = [1, 2]
 LATEST_VERSION = VERSIONS[-1]
 
+# Parsed enhancements are immutable, so they can be shared by everything in the
+# process that resolves the same config. Sizes are estimated by the length of the
+# serialized config (or rule text) they were parsed from.
+ENHANCEMENTS_CACHE_MAX_ENTRIES = 1000
+ENHANCEMENTS_CACHE_MAX_SIZE = 16 * 1024 * 1024
+_enhancements_cache: LRUCache[str, Enhancements] = LRUCache(
+    "grouping.enhancements.cache",
+    max_entries=ENHANCEMENTS_CACHE_MAX_ENTRIES,
+    max_size=ENHANCEMENTS_CACHE_MAX_SIZE,
+)
+
+# Results of applying enhancements to stacktraces, by stacktrace fingerprint.
+_stacktrace_cache = StacktraceCache()
+
 
 class StacktraceState:
     def __init__(self):
@@ -94,15 +110,13 @@ class StacktraceState:
     def set(self, var, value, rule=None):
         self.vars[var] = value
         if rule is not None:
-            self.setters[var] = rule
+            self.setters[var] = rule.matcher_description
 
     def get(self, var):
         return self.vars.get(var)
 
     def describe_var_rule(self, var):
-        rule = self.setters.get(var)
-        if rule is not None:
-            return rule.matcher_description
+        return self.setters.get(var)
 
     def add_to_hint(self, hint, var):
         description = self.describe_var_rule(var)
@@ -136,6 +150,18 @@ class Enhancements:
             if updater_rule := rule._as_updater_rule():
                 self._updater_rules.append(updater_rule)
 
+    @memoize
+    def _modifier_program(self) -> EnhancementsProgram:
+        return EnhancementsProgram(self._modifier_rules)
+
+    @memoize
+    def _updater_program(self) -> EnhancementsProgram:
+        return EnhancementsProgram(self._updater_rules)
+
+    @memoize
+    def _dumped(self) -> str:
+        return self.dumps()
+
     def apply_modifications_to_frame(
         self,
         frames: Sequence[dict[str, Any]],
@@ -151,7 +177,7 @@ class Enhancements:
         # The extra fingerprint mostly makes sense during test execution when two different group configs
         # can share the same set of rules and bases
         stacktrace_fingerprint = _generate_stacktrace_fingerprint(
-            match_frames, exception_data, f"{extra_fingerprint}.{self.dumps()}", platform
+            match_frames, exception_data, f"{extra_fingerprint}.{self._dumped}", platform
         )
         # The most expensive part of creating groups is applying the rules to frames (next code block)
         cache_key = f"stacktrace_hash.{stacktrace_fingerprint}"
@@ -163,10 +189,10 @@ class Enhancements:
                 return
 
         with sentry_sdk.start_span(op="stacktrace_processing", description="apply_rules_to_frames"):
-            for rule in self._modifier_rules:
-                for idx, action in rule.get_matching_frame_actions(
-                    match_frames, platform, exception_data, in_memory_cache
-                ):
+            for rule, actions in self._modifier_program.iter_matching_frame_actions(
+                match_frames, platform, exception_data, in_memory_cache
+            ):
+                for idx, action in actions:
                     # Both frames and match_frames are updated
                     action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
 
@@ -174,17 +200,54 @@ class Enhancements:
             _cache_changed_frame_values(frames, cache_key, platform)
 
     def update_frame_components_contributions(self, components, frames, platform, exception_data):
-        in_memory_cache: dict[str, str] = {}
-
         match_frames = [create_match_frame(frame, platform) for frame in frames]
 
+        # The outcome also depends on the incoming state of the components, on
+        # whether `apply_modifications_to_frame` changed `in_app` (see
+        # `FlagAction._in_app_changed`) and on the exception mechanism, so all
+        # of them are part of the fingerprint.
+        stacktrace_fingerprint = _generate_stacktrace_fingerprint(
+            match_frames,
+            exception_data,
+            hash_values(
+                [
+                    self._dumped,
+                    get_path(exception_data, "mechanism", "type"),
+                    [_get_component_contributions(component) for component in components],
+                    [get_path(frame, "data", "orig_in_app") for frame in frames],
+                ]
+            ),
+            platform,
+        )
+        cache_key = f"stacktrace_contributions.{stacktrace_fingerprint}"
+        use_cache = bool(stacktrace_fingerprint)
+        if use_cache:
+            stacktrace_state = _update_components_from_cached_values(
+                components, cache_key, platform
+            )
+            if stacktrace_state is not None:
+                return stacktrace_state
+
+        stacktrace_state = self._update_frame_components_contributions(
+            components, frames, match_frames, platform, exception_data
+        )
+
+        if use_cache:
+            _cache_component_contributions(components, stacktrace_state, cache_key, platform)
+
+        return stacktrace_state
+
+    def _update_frame_components_contributions(
+        self, components, frames, match_frames, platform, exception_data
+    ):
+        in_memory_cache: dict[str, str] = {}
+
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
-
-            for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, in_memory_cache
-            ):
+        for rule, actions in self._updater_program.iter_matching_frame_actions(
+            match_frames, platform, exception_data, in_memory_cache
+        ):
+            for idx, action in actions:
                 action.update_frame_components_contributions(components, frames, idx, rule=rule)
                 action.modify_stacktrace_state(stacktrace_state, rule)
 
@@ -290,8 +353,19 @@ class Enhancements:
 
     @classmethod
     def loads(cls, data):
-        if isinstance(data, str):
-            data = data.encode("ascii", "ignore")
+        if isinstance(data, bytes):
+            data = data.decode("ascii", "ignore")
+
+        cache_key = f"loads:{data}"
+        rv = _enhancements_cache.get(cache_key)
+        if rv is None:
+            rv = cls._loads(data)
+            _enhancements_cache.set(cache_key, rv, size=len(data))
+        return rv
+
+    @classmethod
+    def _loads(cls, data):
+        data = data.encode("ascii", "ignore")
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
             return cls._from_config_structure(
@@ -301,7 +375,18 @@ class Enhancements:
             raise ValueError("invalid stack trace rule config: %s" % e)
 
     @classmethod
-    def from_config_string(self, s, bases=None, id=None):
+    def from_config_string(cls, s, bases=None, id=None):
+        cache_key = (
+            "from_config_string:" + md5(json.dumps([s, bases, id]).encode("utf-8")).hexdigest()
+        )
+        rv = _enhancements_cache.get(cache_key)
+        if rv is None:
+            rv = cls._from_config_string(s, bases=bases, id=id)
+            _enhancements_cache.set(cache_key, rv, size=len(s))
+        return rv
+
+    @classmethod
+    def _from_config_string(cls, s, bases=None, id=None):
         try:
             tree = enhancements_grammar.parse(s)
         except ParseError as e:
@@ -504,7 +589,9 @@ def _update_frames_from_cached_values(
     Returns True if the merged has correctly happened.
     """
     frames_changed = False
-    changed_frames_values = cache.get(cache_key, {})
+    changed_frames_values = _stacktrace_cache.get(
+        cache_key, kind="modifications", platform=platform, size=len(frames)
+    )
 
     # This helps tracking changes in the hit/miss ratio of the cache
     metrics.incr(
@@ -516,13 +603,14 @@ def _update_frames_from_cached_values(
             for frame, changed_frame_values in zip(frames, changed_frames_values):
                 if changed_frame_values.get("in_app") is not None:
                     set_in_app(frame, changed_frame_values["in_app"])
-                    frames_changed = True
                 if changed_frame_values.get("category") is not None:
                     set_path(frame, "data", "category", value=changed_frame_values["category"])
-                    frames_changed = True
 
-            if frames_changed:
-                logger.debug("We have merged the cached stacktrace to the incoming one.")
+            # The cache key covers the incoming frames, so a cached entry
+            # without any changes is just as good: the rules did not change
+            # anything for this stacktrace.
+            frames_changed = True
+            logger.debug("We have merged the cached stacktrace to the incoming one.")
         except Exception as error:
             logger.exception(
                 "We have failed to update the stacktrace from the cache. Not aborting execution.",
@@ -543,25 +631,18 @@ def _cache_changed_frame_values(
     frames: Sequence[dict[str, Any]], cache_key: str, platform: str
 ) -> None:
     """Store in the cache the values which have been modified for each frame."""
-    caching_succeeded = False
-    # Check that some other event has not already populated the cache
-    if cache.get(cache_key):
-        return
-
-    try:
-        # XXX: A follow up PR will be required to make sure that only a whitelisted set of parameters
-        # are allowed to be modified in apply_modifications_to_frame, thus, not falling out of date with this
-        changed_frames_values = [
-            {
-                "in_app": frame.get("in_app"),  # Based on FlagAction
-                "category": get_path(frame, "data", "category"),  # Based on VarAction's
-            }
-            for frame in frames
-        ]
-        cache.set(cache_key, changed_frames_values)
-        caching_succeeded = True
-    except Exception:
-        logger.exception("Failed to store changed frames in cache", extra={"platform": platform})
+    # XXX: A follow up PR will be required to make sure that only a whitelisted set of parameters
+    # are allowed to be modified in apply_modifications_to_frame, thus, not falling out of date with this
+    changed_frames_values = [
+        {
+            "in_app": frame.get("in_app"),  # Based on FlagAction
+            "category": get_path(frame, "data", "category"),  # Based on VarAction's
+        }
+        for frame in frames
+    ]
+    caching_succeeded = _stacktrace_cache.set(
+        cache_key, changed_frames_values, kind="modifications", platform=platform, size=len(frames)
+    )
 
     metrics.incr(
         f"{DATADOG_KEY}.cache.set",
@@ -569,6 +650,64 @@ def _cache_changed_frame_values(
     )
 
 
+def _get_component_contributions(component: GroupingComponent) -> list[Any]:
+    """The parts of a frame component that `update_frame_components_contributions` may change."""
+    return [
+        component.contributes,
+        component.hint,
+        component.is_prefix_frame,
+        component.is_sentinel_frame,
+    ]
+
+
+def _update_components_from_cached_values(
+    components: Sequence[GroupingComponent], cache_key: str, platform: str
+) -> StacktraceState | None:
+    """
+    Applies the cached outcome of `update_frame_components_contributions` to
+    the components and returns the cached stacktrace state, or None if nothing
+    was cached.
+    """
+    cached = _stacktrace_cache.get(
+        cache_key, kind="contributions", platform=platform, size=len(components)
+    )
+    if cached is None or len(cached["components"]) != len(components):
+        return None
+
+    for component, (contributes, hint, is_prefix_frame, is_sentinel_frame) in zip(
+        components, cached["components"]
+    ):
+        component.contributes = contributes
+        component.hint = hint
+        component.is_prefix_frame = is_prefix_frame
+        component.is_sentinel_frame = is_sentinel_frame
+
+    stacktrace_state = StacktraceState()
+    stacktrace_state.vars.update(cached["vars"])
+    stacktrace_state.setters.update(cached["setters"])
+    return stacktrace_state
+
+
+def _cache_component_contributions(
+    components: Sequence[GroupingComponent],
+    stacktrace_state: StacktraceState,
+    cache_key: str,
+    platform: str,
+) -> None:
+    """Store in the cache the outcome of `update_frame_components_contributions`."""
+    _stacktrace_cache.set(
+        cache_key,
+        {
+            "components": [_get_component_contributions(component) for component in components],
+            "vars": dict(stacktrace_state.vars),
+            "setters": dict(stacktrace_state.setters),
+        },
+        kind="contributions",
+        platform=platform,
+        size=len(components),
+    )
+
+
 def _generate_stacktrace_fingerprint(
     stacktrace_match_frames: Sequence[dict[str, Any]],
     stacktrace_container: dict[str, Any],
@@ -638,7 +777,7 @@ def _load_configs():
                 # We cannot use `:` in filenames on Windows but we already have ids with
                 # `:` in their names hence this trickery.
                 fn = fn.replace("@", ":")
-                rv[fn[:-4]] = Enhancements.from_config_string(f.read(), id=fn[:-4])
+                rv[fn[:-4]] = Enhancements._from_config_string(f.read(), id=fn[:-4])
     return rv
 
 
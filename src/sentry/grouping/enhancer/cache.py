@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A thread-safe, process-wide LRU cache bounded both by the number of entries
+    and by the total (estimated) size of its values. Entries can optionally
+    expire after a TTL (in seconds).
+
+    Reports `<name>.hit`, `<name>.miss` and `<name>.eviction` metrics.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_size: int) -> None:
+        assert max_entries > 0
+        assert max_size > 0
+        self.name = name
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        # key -> (value, size, expiry timestamp or None)
+        self._data: OrderedDict[K, tuple[V, int, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K, tags: dict[str, str] | None = None) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                if item[2] is not None and item[2] <= time.monotonic():
+                    del self._data[key]
+                    self.size -= item[1]
+                    item = None
+                else:
+                    self._data.move_to_end(key)
+
+        metrics.incr(f"{self.name}.{'hit' if item is not None else 'miss'}", tags=tags)
+        return item[0] if item is not None else None
+
+    def set(self, key: K, value: V, size: int = 1, ttl: int | None = None) -> None:
+        if size > self.max_size:
+            # Would evict everything else and still not fit.
+            return
+
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._data[key] = (value, size, expires)
+            self.size += size
+            self._evict()
+
+    def resize(self, max_entries: int, max_size: int) -> None:
+        assert max_entries > 0
+        assert max_size > 0
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_size = max_size
+            self._evict()
+
+    def _evict(self) -> None:
+        evicted = 0
+        while len(self._data) > self.max_entries or self.size > self.max_size:
+            _, (_, evicted_size, _) = self._data.popitem(last=False)
+            self.size -= evicted_size
+            evicted += 1
+
+        if evicted:
+            metrics.incr(f"{self.name}.eviction", amount=evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+
+class StacktraceCache:
+    """
+    Caches the results of applying enhancements to a stacktrace, keyed by a
+    fingerprint of the stacktrace and the enhancements. A process-local
+    `LRUCache` sits in front of the shared django cache (Redis), so that repeated
+    crashes skip both the rule evaluation and the network round-trip.
+
+    Cached values are shared between callers and must not be mutated.
+
+    Every lookup reports `grouping.stacktrace_cache.get`, tagged by the tier
+    that answered it (`local`, `remote` or `miss`), the kind of result and the
+    platform. Both tiers are configured through the
+    `SENTRY_GROUPING_STACKTRACE_CACHE_*` settings, which are read on every
+    access so that they can be overridden at runtime.
+    """
+
+    def __init__(self, name: str = "grouping.stacktrace_cache") -> None:
+        self.name = name
+        self._local: LRUCache[str, Any] | None = None
+
+    def _get_local(self) -> LRUCache[str, Any] | None:
+        max_entries = settings.SENTRY_GROUPING_STACKTRACE_CACHE_LOCAL_MAX_ENTRIES
+        max_frames = settings.SENTRY_GROUPING_STACKTRACE_CACHE_LOCAL_MAX_FRAMES
+        if max_entries <= 0 or max_frames <= 0:
+            self._local = None
+        elif self._local is None:
+            self._local = LRUCache(f"{self.name}.local", max_entries, max_frames)
+        elif (self._local.max_entries, self._local.max_size) != (max_entries, max_frames):
+            self._local.resize(max_entries, max_frames)
+        return self._local
+
+    def get(self, key: str, kind: str, platform: str, size: int = 1) -> Any | None:
+        tags = {"kind": kind, "platform": platform}
+        local = self._get_local()
+
+        value = local.get(key, tags=tags) if local is not None else None
+        if value is not None:
+            metrics.incr(f"{self.name}.get", tags={"tier": "local", **tags})
+            return value
+
+        value = cache.get(key)
+        metrics.incr(
+            f"{self.name}.get", tags={"tier": "remote" if value is not None else "miss", **tags}
+        )
+        if value is not None and local is not None:
+            local.set(
+                key, value, size=size, ttl=settings.SENTRY_GROUPING_STACKTRACE_CACHE_LOCAL_TTL
+            )
+        return value
+
+    def set(self, key: str, value: Any, kind: str, platform: str, size: int = 1) -> bool:
+        """
+        Stores `value` in both tiers and returns whether storing it in the
+        shared tier succeeded. `size` is the cost of the value in the local
+        tier, which is measured in frames.
+        """
+        local = self._get_local()
+        if local is not None:
+            local.set(
+                key, value, size=size, ttl=settings.SENTRY_GROUPING_STACKTRACE_CACHE_LOCAL_TTL
+            )
+
+        try:
+            cache.set(key, value, settings.SENTRY_GROUPING_STACKTRACE_CACHE_TTL)
+        except Exception:
+            logger.exception(
+                "Failed to store stacktrace in cache", extra={"kind": kind, "platform": platform}
+            )
+            return False
+        return True
+
+    def clear_local(self) -> None:
+        if self._local is not None:
+            self._local.clear()
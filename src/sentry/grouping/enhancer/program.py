@@ -0,0 +1,162 @@
+"""
+Compiled form of enhancement rules.
+
+Matching every rule against every frame is O(rules x frames), and most of
+those checks are glob matches which cannot succeed. `EnhancementsProgram`
+compiles a list of rules once, so that a rule is only checked against the
+frames it can possibly match:
+
+* Rules with a positive `family:` matcher are only checked against frames of
+  one of those families.
+* Rules with a positive, non-glob `function:` or `module:` matcher are only
+  checked against frames with exactly that value.
+* The remaining matchers of a rule are ordered by cost, so that cheap checks
+  (family, in-app, exact matches) reject frames before any glob is evaluated.
+
+Only frame fields that are never changed by actions are indexed (the family,
+function and module). `in_app` and `category` may change while rules are
+applied, so matchers on those are always evaluated against the current frame.
+The result is the same as calling `Rule.get_matching_frame_actions` for each
+rule in order.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterator, Sequence
+
+from .actions import Action
+from .matchers import (
+    CalleeMatch,
+    CallerMatch,
+    FamilyMatch,
+    FrameFieldMatch,
+    FunctionMatch,
+    InAppMatch,
+    Match,
+    ModuleMatch,
+)
+
+if TYPE_CHECKING:
+    from . import Rule
+
+# A pattern without any of these can only match a value equal to itself.
+GLOB_CHARACTERS = frozenset(b"*?[]{}\\")
+
+
+def _is_literal(pattern: bytes) -> bool:
+    return not any(c in GLOB_CHARACTERS for c in pattern)
+
+
+def _get_matcher_cost(matcher: Match) -> int:
+    if isinstance(matcher, (FamilyMatch, InAppMatch)):
+        return 0
+    if isinstance(matcher, FrameFieldMatch) and _is_literal(matcher._encoded_pattern):
+        return 1
+    if isinstance(matcher, (CallerMatch, CalleeMatch)):
+        return 3
+    return 2
+
+
+class FrameIndex:
+    """Lazily built per-stacktrace index of frame positions by field value."""
+
+    def __init__(self, match_frames: Sequence[dict[str, Any]]) -> None:
+        self.match_frames = match_frames
+        self._indexes: dict[str, dict[Any, list[int]]] = {}
+
+    def lookup(self, field: str, value: Any) -> list[int]:
+        index = self._indexes.get(field)
+        if index is None:
+            index = self._indexes[field] = {}
+            for idx, match_frame in enumerate(self.match_frames):
+                index.setdefault(match_frame[field], []).append(idx)
+        return index.get(value, [])
+
+
+class CompiledRule:
+    def __init__(self, rule: Rule) -> None:
+        self.rule = rule
+        self.matchers = sorted(rule._other_matchers, key=_get_matcher_cost)
+
+        # Families of frames this rule can match, `None` if any.
+        self.families: frozenset[bytes] | None = None
+        # (field, value) pairs a frame must have for this rule to match.
+        self.literals: list[tuple[str, bytes]] = []
+
+        for matcher in rule._other_matchers:
+            if isinstance(matcher, FamilyMatch) and not matcher.negated:
+                if b"all" not in matcher._flags:
+                    flags = frozenset(matcher._flags)
+                    self.families = flags if self.families is None else self.families & flags
+            elif (
+                isinstance(matcher, (FunctionMatch, ModuleMatch))
+                and not matcher.negated
+                and _is_literal(matcher._encoded_pattern)
+            ):
+                self.literals.append((matcher.field, matcher._encoded_pattern))
+
+    def _get_candidates(self, index: FrameIndex) -> Sequence[int]:
+        candidates: list[int] | None = None
+        if self.families is not None:
+            candidates = sorted(
+                idx for family in self.families for idx in index.lookup("family", family)
+            )
+        for field, value in self.literals:
+            indices = index.lookup(field, value)
+            if candidates is None or len(indices) < len(candidates):
+                candidates = indices
+        if candidates is None:
+            return range(len(index.match_frames))
+        return candidates
+
+    def get_matching_frame_actions(
+        self,
+        index: FrameIndex,
+        platform: str,
+        exception_data: dict[str, Any],
+        in_memory_cache: dict[str, str],
+    ) -> list[tuple[int, Action]]:
+        rule = self.rule
+        if not rule.matchers:
+            return []
+
+        match_frames = index.match_frames
+        for m in rule._exception_matchers:
+            if not m.matches_frame(match_frames, None, platform, exception_data, in_memory_cache):
+                return []
+
+        rv = []
+        for idx in self._get_candidates(index):
+            if all(
+                m.matches_frame(match_frames, idx, platform, exception_data, in_memory_cache)
+                for m in self.matchers
+            ):
+                for action in rule.actions:
+                    rv.append((idx, action))
+
+        return rv
+
+
+class EnhancementsProgram:
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = [CompiledRule(rule) for rule in rules]
+
+    def iter_matching_frame_actions(
+        self,
+        match_frames: Sequence[dict[str, Any]],
+        platform: str,
+        exception_data: dict[str, Any],
+        in_memory_cache: dict[str, str],
+    ) -> Iterator[tuple[Rule, list[tuple[int, Action]]]]:
+        """
+        Yields the matching actions of every rule, in rule order. Matching for a
+        rule happens only once the actions of the previous rule have been
+        applied, exactly like calling `Rule.get_matching_frame_actions` in a
+        loop.
+        """
+        index = FrameIndex(match_frames)
+        for compiled_rule in self.rules:
+            actions = compiled_rule.get_matching_frame_actions(
+                index, platform, exception_data, in_memory_cache
+            )
+            if actions:
+                yield compiled_rule.rule, actions
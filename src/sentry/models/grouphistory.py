@@ -1,6 +1,6 @@
-from typing import TYPE_CHECKING, ClassVar, List, Optional, Union
+from typing import TYPE_CHECKING, ClassVar, List, Optional, Sequence, Union
 
-from django.db import models
+from django.db import models, router, transaction
 from django.db.models import SET_NULL, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -274,7 +274,7 @@ def record_group_history(
         else:
             raise ValueError("record_group_history actor argument must be RPCUser or Team")
 
-    return GroupHistory.objects.create(
+    history = GroupHistory.objects.create(
         organization=group.project.organization,
         group=group,
         project=group.project,
@@ -284,6 +284,8 @@ def record_group_history(
         prev_history=prev_history,
         prev_history_date=prev_history.date_added if prev_history else None,
     )
+    _invalidate_search_results([group])
+    return history
 
 
 def bulk_record_group_history(
@@ -309,7 +311,7 @@ def bulk_record_group_history(
         else:
             raise ValueError("record_group_history actor argument must be RPCUser or Team")
 
-    return GroupHistory.objects.bulk_create(
+    histories = GroupHistory.objects.bulk_create(
         [
             GroupHistory(
                 organization=group.project.organization,
@@ -324,3 +326,20 @@ def bulk_record_group_history(
             for group in groups
         ]
     )
+    _invalidate_search_results(groups)
+    return histories
+
+
+def _invalidate_search_results(groups: Sequence["Group"]) -> None:
+    """
+    Drops the cached issue search results of the projects of the groups. Every
+    status, assignment or deletion change of a group records its history, so
+    that the issue stream reflects it right away.
+    """
+    from sentry.search.snuba.result_cache import invalidate_result_cache
+
+    project_ids = {group.project_id for group in groups}
+    if project_ids:
+        transaction.on_commit(
+            lambda: invalidate_result_cache(project_ids), using=router.db_for_write(GroupHistory)
+        )
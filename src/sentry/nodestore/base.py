@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import struct
+from collections.abc import Mapping
 from threading import local
 
 import sentry_sdk
 from django.core.cache import InvalidCacheBackendError, caches
 
+from sentry import options
+from sentry.nodestore.compression import NodeCompressor, is_compressed
 from sentry.utils import json
 from sentry.utils.cache import memoize
 from sentry.utils.services import Service
@@ -24,6 +28,21 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json.loads
 
+# Subkey-indexed encoding. Payloads start with a fixed header followed by an
+# offset table with one entry per subkey, and then the concatenated JSON
+# documents. Legacy payloads are newline-separated JSON (or pickles in the
+# Django backend) and therefore can never start with a null byte.
+#
+#   header: magic (4 bytes), version (u8), number of subkeys (u16)
+#   entry:  subkey length (u8), offset (u32), length (u32), subkey (ascii)
+#
+# Offsets are relative to the end of the offset table, and the default subkey
+# (`None`) is stored as the empty string.
+INDEXED_ENCODING_MAGIC = b"\x00nsi"
+INDEXED_ENCODING_VERSION = 1
+_indexed_header = struct.Struct("!4sBH")
+_indexed_entry = struct.Struct("!BII")
+
 
 class NodeStorage(local, Service):
     """
@@ -96,6 +115,12 @@ class NodeStorage(local, Service):
         if value is None:
             return None
 
+        if is_compressed(value):
+            value = self.compressor.decompress(value)
+
+        if value.startswith(INDEXED_ENCODING_MAGIC):
+            return self._decode_indexed(value, subkey)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -116,6 +141,32 @@ class NodeStorage(local, Service):
         except StopIteration:
             return None
 
+    def _decode_indexed(self, value, subkey):
+        """
+        Decode a single subkey from a payload written with the indexed encoding,
+        only deserializing the bytes that belong to it.
+        """
+        _, version, count = _indexed_header.unpack_from(value)
+        if version != INDEXED_ENCODING_VERSION:
+            raise ValueError(f"Unsupported nodestore encoding version: {version}")
+
+        wanted = subkey.encode("ascii") if subkey is not None else b""
+        position = _indexed_header.size
+        found = None
+        for _ in range(count):
+            key_length, offset, length = _indexed_entry.unpack_from(value, position)
+            position += _indexed_entry.size
+            if found is None and value[position : position + key_length] == wanted:
+                found = offset, length
+            position += key_length
+
+        if found is None:
+            return None
+
+        offset, length = found
+        start = position + offset
+        return json_loads(value[start : start + length])
+
     def get_bytes(self, id):
         """
         >>> nodestore._get_bytes('key1')
@@ -207,7 +258,13 @@ class NodeStorage(local, Service):
 
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
+
+        If `nodestore.indexed-encoding` is enabled, the subkey-indexed encoding
+        is written instead, see `_encode_indexed`.
         """
+        if options.get("nodestore.indexed-encoding"):
+            return self._encode_indexed(data)
+
         lines = [json_dumps(data.pop(None)).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
@@ -215,6 +272,27 @@ class NodeStorage(local, Service):
 
         return b"\n".join(lines)
 
+    def _encode_indexed(self, data):
+        """
+        Encode data dict with an offset table in front of the values, so that a
+        single subkey can be read without scanning the whole payload.
+        """
+        keys = [b""]
+        values = [json_dumps(data.pop(None)).encode("utf8")]
+        for key, value in data.items():
+            assert key, "subkeys must be non-empty"
+            keys.append(key.encode("ascii"))
+            values.append(json_dumps(value).encode("utf8"))
+
+        parts = [_indexed_header.pack(INDEXED_ENCODING_MAGIC, INDEXED_ENCODING_VERSION, len(keys))]
+        offset = 0
+        for key, value in zip(keys, values):
+            parts.append(_indexed_entry.pack(len(key), offset, len(value)))
+            parts.append(key)
+            offset += len(value)
+
+        return b"".join(parts + values)
+
     def set_bytes(self, id, data, ttl=None):
         """
         >>> nodestore.set_bytes('key1', b"{'foo': 'bar'}")
@@ -253,6 +331,14 @@ class NodeStorage(local, Service):
             span.set_data("subkeys_count", len(data))
             cache_item = data.get(None)
             bytes_data = self._encode(data)
+            if options.get("nodestore.compression"):
+                bytes_data = self.compressor.compress(
+                    bytes_data,
+                    platform=cache_item.get("platform")
+                    if isinstance(cache_item, Mapping)
+                    else None,
+                    level=options.get("nodestore.compression-level"),
+                )
             self._set_bytes(id, bytes_data, ttl=ttl)
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
@@ -288,6 +374,11 @@ class NodeStorage(local, Service):
         if self.cache:
             self.cache.delete_many([id for id in id_list])
 
+    @memoize
+    def compressor(self):
+        # `NodeStorage` is thread-local, and so is this compressor.
+        return NodeCompressor()
+
     @memoize
     def cache(self):
         try:
@@ -0,0 +1,122 @@
+"""
+Optional zstd compression of nodestore payloads.
+
+Compressed payloads start with a small header, so that readers can tell them
+apart from plain (legacy or indexed) payloads:
+
+    magic (4 bytes), dictionary id (u32, 0 if no dictionary was used)
+
+followed by a single zstd frame. Dictionaries are trained per platform family
+(see `sentry nodestore train-dictionary`) and configured through
+`SENTRY_NODESTORE_COMPRESSION_DICTIONARIES`, a mapping of dictionary name to
+file path. Event platforms are mapped to dictionary names with
+`get_dictionary_name`. Dictionaries that were used for writing must stay
+configured for as long as payloads compressed with them are retained.
+"""
+from __future__ import annotations
+
+import struct
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+import zstandard
+from django.conf import settings
+
+COMPRESSED_MAGIC = b"\x00nsz"
+_compressed_header = struct.Struct("!4sI")
+
+NATIVE_DICTIONARY = "native"
+DEFAULT_DICTIONARY = "default"
+
+
+class UnknownDictionary(Exception):
+    pass
+
+
+def get_dictionary_name(platform: str | None) -> str:
+    """
+    Returns the name of the dictionary that should be used for events of the
+    given platform. All native platforms share one dictionary.
+    """
+    from sentry.lang.native.utils import is_native_platform
+
+    if is_native_platform(platform):
+        return NATIVE_DICTIONARY
+    return platform or DEFAULT_DICTIONARY
+
+
+@lru_cache(maxsize=None)
+def _load_dictionary(path: str) -> zstandard.ZstdCompressionDict:
+    with open(path, "rb") as f:
+        return zstandard.ZstdCompressionDict(f.read())
+
+
+def get_dictionaries() -> Mapping[str, zstandard.ZstdCompressionDict]:
+    return {
+        name: _load_dictionary(path)
+        for name, path in settings.SENTRY_NODESTORE_COMPRESSION_DICTIONARIES.items()
+    }
+
+
+def is_compressed(value: bytes) -> bool:
+    return value.startswith(COMPRESSED_MAGIC)
+
+
+class NodeCompressor:
+    """
+    Compresses and decompresses nodestore payloads. zstd (de)compressor objects
+    are not thread-safe, so an instance must not be shared between threads.
+    """
+
+    def __init__(self) -> None:
+        self._compressors: dict[tuple[int, int], zstandard.ZstdCompressor] = {}
+        self._decompressors: dict[int, zstandard.ZstdDecompressor] = {}
+
+    def _get_compressor(
+        self, dictionary: zstandard.ZstdCompressionDict | None, level: int
+    ) -> zstandard.ZstdCompressor:
+        dict_id = dictionary.dict_id() if dictionary is not None else 0
+        compressor = self._compressors.get((dict_id, level))
+        if compressor is None:
+            compressor = self._compressors[(dict_id, level)] = zstandard.ZstdCompressor(
+                level=level, dict_data=dictionary
+            )
+        return compressor
+
+    def _get_decompressor(self, dict_id: int) -> zstandard.ZstdDecompressor:
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = None
+            if dict_id:
+                for candidate in get_dictionaries().values():
+                    if candidate.dict_id() == dict_id:
+                        dictionary = candidate
+                        break
+                else:
+                    raise UnknownDictionary(dict_id)
+            decompressor = self._decompressors[dict_id] = zstandard.ZstdDecompressor(
+                dict_data=dictionary
+            )
+        return decompressor
+
+    def compress(self, data: bytes, platform: str | None = None, level: int = 3) -> bytes:
+        dictionaries = get_dictionaries()
+        dictionary = dictionaries.get(get_dictionary_name(platform)) or dictionaries.get(
+            DEFAULT_DICTIONARY
+        )
+        dict_id = dictionary.dict_id() if dictionary is not None else 0
+        return _compressed_header.pack(COMPRESSED_MAGIC, dict_id) + self._get_compressor(
+            dictionary, level
+        ).compress(data)
+
+    def decompress(self, value: bytes) -> bytes:
+        _, dict_id = _compressed_header.unpack_from(value)
+        return self._get_decompressor(dict_id).decompress(value[_compressed_header.size :])
+
+
+def train_dictionary(samples: Iterable[bytes], size: int) -> zstandard.ZstdCompressionDict:
+    """
+    Trains a zstd dictionary of (at most) `size` bytes from encoded nodestore
+    payloads.
+    """
+    return zstandard.train_dictionary(size, list(samples))
@@ -1,21 +1,57 @@
 from __future__ import annotations
 
+import base64
 import logging
 import math
 import pickle
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
+from django.db import connections, router
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
-from sentry.nodestore.base import NodeStorage
-from sentry.utils.strings import compress, decompress
+from sentry.nodestore.base import INDEXED_ENCODING_MAGIC, NodeStorage
+from sentry.nodestore.compression import COMPRESSED_MAGIC
+from sentry.utils import metrics
+from sentry.utils.iterators import chunked
+from sentry.utils.strings import compress
 
 from .models import Node
 
 logger = logging.getLogger("sentry")
 
 
+def _compress(data: bytes) -> str:
+    # Payloads compressed with zstd don't get smaller with zlib, only base64
+    # encode them for the text column.
+    if data.startswith(COMPRESSED_MAGIC):
+        return base64.b64encode(data).decode("utf-8")
+    return compress(data)
+
+
+def _decompress(value: str) -> bytes:
+    data = base64.b64decode(value)
+    if data.startswith(COMPRESSED_MAGIC):
+        return data
+    return zlib.decompress(data)
+
+
 class DjangoNodeStorage(NodeStorage):
+    """
+    :param multi_get_chunk_size: Maximum number of ids fetched with a single
+        query in `get_multi`.
+    :param multi_get_concurrency: Maximum number of chunks fetched in parallel
+        in `get_multi`, each on its own database connection. With the default
+        of 1, all chunks are fetched sequentially on the current connection.
+    """
+
+    def __init__(self, multi_get_chunk_size=100, multi_get_concurrency=1):
+        assert multi_get_chunk_size > 0
+        assert multi_get_concurrency > 0
+        self.multi_get_chunk_size = multi_get_chunk_size
+        self.multi_get_concurrency = multi_get_concurrency
+
     def delete(self, id):
         Node.objects.filter(id=id).delete()
         self._delete_cache_item(id)
@@ -25,7 +61,7 @@ class DjangoNodeStorage(NodeStorage):
             return None
 
         try:
-            if value.startswith(b"{"):
+            if value.startswith((b"{", INDEXED_ENCODING_MAGIC, COMPRESSED_MAGIC)):
                 return NodeStorage._decode(self, value, subkey=subkey)
 
             if subkey is None:
@@ -39,19 +75,43 @@ class DjangoNodeStorage(NodeStorage):
     def _get_bytes(self, id):
         try:
             data = Node.objects.get(id=id).data
-            return decompress(data)
+            return _decompress(data)
         except Node.DoesNotExist:
             return None
 
+    def _get_bytes_chunk(self, id_list: list[str]) -> dict[str, bytes | None]:
+        return {n.id: _decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+
+    def _get_bytes_chunk_in_thread(self, id_list: list[str]) -> dict[str, bytes | None]:
+        try:
+            return self._get_bytes_chunk(id_list)
+        finally:
+            # Worker threads open their own connection, don't leak it.
+            connections[router.db_for_read(Node)].close()
+
     def _get_bytes_multi(self, id_list: list[str]) -> dict[str, bytes | None]:
-        return {n.id: decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+        chunks = list(chunked(id_list, self.multi_get_chunk_size))
+        concurrency = min(self.multi_get_concurrency, len(chunks))
+
+        rv: dict[str, bytes | None] = {}
+        with metrics.timer("nodestore.get_multi.duration", tags={"backend": "django"}):
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    for result in executor.map(self._get_bytes_chunk_in_thread, chunks):
+                        rv.update(result)
+            else:
+                for chunk in chunks:
+                    rv.update(self._get_bytes_chunk(chunk))
+
+        metrics.distribution("nodestore.get_multi.chunks", len(chunks), tags={"backend": "django"})
+        return rv
 
     def delete_multi(self, id_list):
         Node.objects.filter(id__in=id_list).delete()
         self._delete_cache_items(id_list)
 
     def _set_bytes(self, id, data, ttl=None):
-        create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
+        create_or_update(Node, id=id, values={"data": _compress(data), "timestamp": timezone.now()})
 
     def cleanup(self, cutoff_timestamp):
         from sentry.db.deletion import BulkDeleteQuery
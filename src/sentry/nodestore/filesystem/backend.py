@@ -1,20 +1,29 @@
+from __future__ import annotations
+
 import datetime
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timezone
 
 from django.conf import settings
 
 from sentry.nodestore.base import NodeStorage
+from sentry.utils import metrics
 
 
 class FileSystemNodeStorage(NodeStorage):
     """
     A simple backend that saves each node as a file. Only appropriate for
     debugging and development!
+
+    :param multi_get_concurrency: Maximum number of files read in parallel in
+        `get_multi`.
     """
 
-    def __init__(self, path=None):
+    def __init__(self, path=None, multi_get_concurrency=8):
         self.path: str = ""
+        assert multi_get_concurrency > 0
+        self.multi_get_concurrency = multi_get_concurrency
 
         if not settings.DEBUG:
             raise ValueError("FileSystemNodeStorage should only be used in development!")
@@ -27,6 +36,21 @@ class FileSystemNodeStorage(NodeStorage):
         with open(self.node_path(id), "rb") as file:
             return file.read()
 
+    def _get_bytes_or_none(self, id: str) -> bytes | None:
+        try:
+            return self._get_bytes(id)
+        except FileNotFoundError:
+            return None
+
+    def _get_bytes_multi(self, id_list: list[str]) -> dict[str, bytes | None]:
+        concurrency = min(self.multi_get_concurrency, len(id_list))
+
+        with metrics.timer("nodestore.get_multi.duration", tags={"backend": "filesystem"}):
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    return dict(zip(id_list, executor.map(self._get_bytes_or_none, id_list)))
+            return {id: self._get_bytes_or_none(id) for id in id_list}
+
     def _set_bytes(self, id: str, data: bytes, ttl=0):
         with open(self.node_path(id), "wb") as file:
             file.write(data)
@@ -102,6 +102,21 @@ register(
 )
 register("redis.options", type=Dict, flags=FLAG_NOSTORE)
 
+# Buffers
+# Flush pending buffer keys in bulk: pipelined reads and one multi-row UPDATE per model.
+register(
+    "buffer.bulk-flush.enabled",
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Number of pending keys handed to a single `process_incr` task in bulk flush mode.
+register(
+    "buffer.bulk-flush.batch-size",
+    type=Int,
+    default=500,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Processing worker caches
 register(
     "dsym.cache-path",
@@ -273,6 +288,28 @@ register(
 # Beacon
 register("beacon.anonymous", type=Bool, flags=FLAG_REQUIRED)
 
+# Nodestore
+# Write nodestore payloads with the subkey-indexed encoding. Only enable once
+# every reader understands it.
+register(
+    "nodestore.indexed-encoding",
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Compress nodestore payloads with zstd, using the per-platform dictionaries
+# from SENTRY_NODESTORE_COMPRESSION_DICTIONARIES when available.
+register(
+    "nodestore.compression",
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "nodestore.compression-level",
+    type=Int,
+    default=3,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Filestore (default)
 register("filestore.backend", default="filesystem", flags=FLAG_NOSTORE)
 register("filestore.options", default={"location": "/tmp/sentry-files"}, flags=FLAG_NOSTORE)
@@ -495,10 +532,16 @@ register(
 )
 register("snuba.search.min-pre-snuba-candidates", default=500, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.search.max-pre-snuba-candidates", default=5000, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("snuba.search.max-intersect-candidates", default=50000, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.search.chunk-growth-rate", default=1.5, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.search.max-chunk-size", default=2000, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.search.hits-sample-size", default=100, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds the first page of issue searches is cached for, 0 disables the cache.
+register("snuba.search.result-cache-ttl", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds after which cached issue searches sorted by date are refreshed with
+# the issues seen since, 0 disables refreshing.
+register("snuba.search.result-cache-refresh-interval", default=10, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("snuba.track-outcomes-sample-rate", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
@@ -615,6 +658,10 @@ register(
 register(
     "post-process.error-hook-sample-rate", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE
 )  # unused
+# Seconds for which a process shares loaded rules and rule statuses of a
+# project between the post-process tasks of its events. 0 shares them only
+# between the group jobs of one event.
+register("post-process.rule-batch-window", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
 # Transaction events
 # True => kill switch to disable ingestion of transaction events for internal project.
@@ -1,9 +1,17 @@
-from time import time
+from __future__ import annotations
+
+import threading
+import weakref
+from dataclasses import dataclass
+from time import monotonic, time
+from typing import Any, Sequence
 
 import sentry_sdk
+from django.db.models.signals import post_delete, post_save
 
 from sentry.constants import DataCategory
 from sentry.quotas.base import NotRateLimited, Quota, QuotaConfig, QuotaScope, RateLimited
+from sentry.utils import metrics
 from sentry.utils.redis import (
     get_dynamic_cluster_from_options,
     load_script,
@@ -13,6 +21,125 @@ from sentry.utils.redis import (
 is_rate_limited = load_script("quotas/is_rate_limited.lua")
 
 
+class QuotaConfigCache:
+    """
+    A process-local cache of the quotas that `RedisQuota.get_quotas` computes
+    for a project and its keys. Entries expire after `ttl` seconds and are
+    dropped as soon as an option or key of their organization or project is
+    saved or deleted in this process. Changes made in other processes and
+    changes to global options are picked up once entries expire.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # (project ID, key IDs) -> (expiry, organization ID, quotas)
+        self._data: dict[tuple[int, tuple[int, ...]], tuple[float, int, list[QuotaConfig]]] = {}
+        _connect_invalidation_receivers()
+        _config_caches.add(self)
+
+    def get(self, project_id: int, key_ids: tuple[int, ...]) -> list[QuotaConfig] | None:
+        with self._lock:
+            item = self._data.get((project_id, key_ids))
+            if item is not None and item[0] <= monotonic():
+                del self._data[project_id, key_ids]
+                item = None
+
+        metrics.incr("quotas.redis.config_cache", tags={"hit": item is not None}, sample_rate=0.1)
+        return list(item[2]) if item is not None else None
+
+    def set(
+        self,
+        project_id: int,
+        organization_id: int,
+        key_ids: tuple[int, ...],
+        quotas: list[QuotaConfig],
+    ) -> None:
+        with self._lock:
+            self._data.pop((project_id, key_ids), None)
+            while len(self._data) >= self.max_entries:
+                # Dicts preserve insertion order, so this evicts the oldest entry.
+                del self._data[next(iter(self._data))]
+            self._data[project_id, key_ids] = (monotonic() + self.ttl, organization_id, quotas)
+
+    def invalidate(
+        self,
+        organization_id: int | None = None,
+        project_id: int | None = None,
+        key_id: int | None = None,
+    ) -> None:
+        with self._lock:
+            for cache_key, (_, entry_organization_id, _) in list(self._data.items()):
+                entry_project_id, entry_key_ids = cache_key
+                if (
+                    entry_organization_id == organization_id
+                    or entry_project_id == project_id
+                    or key_id in entry_key_ids
+                ):
+                    del self._data[cache_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_config_caches: weakref.WeakSet[QuotaConfigCache] = weakref.WeakSet()
+
+
+def _invalidate_organization_option(instance: Any, **kwargs: Any) -> None:
+    for config_cache in list(_config_caches):
+        config_cache.invalidate(organization_id=instance.organization_id)
+
+
+def _invalidate_project_option(instance: Any, **kwargs: Any) -> None:
+    for config_cache in list(_config_caches):
+        config_cache.invalidate(project_id=instance.project_id)
+
+
+def _invalidate_project_key(instance: Any, **kwargs: Any) -> None:
+    for config_cache in list(_config_caches):
+        config_cache.invalidate(project_id=instance.project_id, key_id=instance.id)
+
+
+def _connect_invalidation_receivers() -> None:
+    from sentry.models.options.organization_option import OrganizationOption
+    from sentry.models.options.project_option import ProjectOption
+    from sentry.models.projectkey import ProjectKey
+
+    for signal in (post_save, post_delete):
+        for sender, receiver in (
+            (OrganizationOption, _invalidate_organization_option),
+            (ProjectOption, _invalidate_project_option),
+            (ProjectKey, _invalidate_project_key),
+        ):
+            signal.connect(
+                receiver,
+                sender=sender,
+                dispatch_uid=f"quotas.redis.{receiver.__name__}.{signal is post_save}",
+                weak=False,
+            )
+
+
+@dataclass
+class FastPathEntry:
+    """
+    Admissions that `RedisQuota.is_rate_limited` may grant without calling
+    into Redis, and the admissions granted so far that have not been counted
+    in Redis yet.
+    """
+
+    #: The counter keys of the quotas at the time the entry was created.
+    keys: Sequence[str]
+    #: The expiry of the counters.
+    expiries: Sequence[int]
+    #: Admissions left, or `None` if none of the quotas have a limit.
+    remaining: int | None
+    #: Admissions granted locally, to be added to the counters.
+    pending: int
+    expires_at: float
+
+
 class RedisQuota(Quota):
     #: The ``grace`` period allows accommodating for clock drift in TTL
     #: calculation since the clock on the Redis instance used to store quota
@@ -20,9 +147,31 @@ class RedisQuota(Quota):
     grace = 60
 
     def __init__(self, **options):
+        """
+        In addition to the cluster options, accepts:
+
+        :param config_cache_ttl: Cache the quotas of a project and its keys in
+            memory for this many seconds. `0` disables the cache.
+        :param fast_path_fraction: After Redis has accepted an event, let this
+            fraction of the headroom left in the tightest quota through without
+            calling into Redis. Those events are added to the counters with
+            the next call. Every process does this on its own, so the fraction
+            should be well below the inverse of the number of processes.
+            Events that have been let through locally are not counted if the
+            process exits before its next call. `0` disables the fast path.
+        :param fast_path_ttl: The number of seconds a process may keep letting
+            events through on its own before checking with Redis again.
+        """
         self.is_redis_cluster, self.cluster, options = get_dynamic_cluster_from_options(
             "SENTRY_QUOTA_OPTIONS", options
         )
+        config_cache_ttl = options.pop("config_cache_ttl", 0)
+        self.config_cache = QuotaConfigCache(config_cache_ttl) if config_cache_ttl > 0 else None
+        self.fast_path_fraction = options.pop("fast_path_fraction", 0)
+        self.fast_path_ttl = options.pop("fast_path_ttl", 1.0)
+        self._fast_path_lock = threading.Lock()
+        # (organization ID, quota IDs) -> FastPathEntry
+        self._fast_path: dict[tuple[Any, ...], FastPathEntry] = {}
 
         # Based on the `is_redis_cluster` flag, self.cluster is set two one of
         # the following two objects:
@@ -53,6 +202,17 @@ class RedisQuota(Quota):
         if key:
             key.project = project
 
+        if self.config_cache is None:
+            return self._get_quotas(project, key=key, keys=keys)
+
+        key_ids = tuple(k.id for k in (keys or ([key] if key else [])))
+        results = self.config_cache.get(project.id, key_ids)
+        if results is None:
+            results = self._get_quotas(project, key=key, keys=keys)
+            self.config_cache.set(project.id, project.organization_id, key_ids, results)
+        return results
+
+    def _get_quotas(self, project, key=None, keys=None):
         results = [*self.get_project_abuse_quotas(project.organization)]
 
         with sentry_sdk.start_span(op="redis.get_quotas.get_project_quota") as span:
@@ -237,7 +397,12 @@ class RedisQuota(Quota):
             return NotRateLimited()
 
         client = self.__get_redis_client(str(project.organization_id))
-        rejections = is_rate_limited(client, keys, args)
+        if self.fast_path_fraction > 0:
+            rejections = self.__is_rate_limited_with_fast_path(
+                client, project.organization_id, quotas, keys, args
+            )
+        else:
+            rejections = is_rate_limited(client, keys, args)
 
         if not any(rejections):
             return NotRateLimited()
@@ -253,3 +418,88 @@ class RedisQuota(Quota):
                 worst_case = (delay, quota.reason_code)
 
         return RateLimited(retry_after=worst_case[0], reason_code=worst_case[1])
+
+    def __is_rate_limited_with_fast_path(self, client, organization_id, quotas, keys, args):
+        """
+        Lets the event through locally if a previous call left enough headroom
+        in all quotas. Otherwise adds the events let through since then to the
+        counters, runs the rate limit script and reads back the counters to
+        determine the headroom, all in a single round trip.
+        """
+        fast_path_key = (organization_id, *((q.id, q.scope, q.scope_id) for q in quotas))
+        lock = self._fast_path_lock
+        with lock:
+            entry = self._fast_path.get(fast_path_key)
+            if (
+                entry is not None
+                and entry.keys == keys
+                and entry.expires_at > monotonic()
+                and (entry.remaining is None or entry.remaining > 0)
+            ):
+                if entry.remaining is not None:
+                    entry.remaining -= 1
+                entry.pending += 1
+                metrics.incr("quotas.redis.fast_path", tags={"hit": True}, sample_rate=0.1)
+                return [False] * len(quotas)
+
+            self._fast_path.pop(fast_path_key, None)
+            if len(self._fast_path) >= 10000:
+                # Drop expired entries that have nothing left to count.
+                now = monotonic()
+                for stale_key, stale_entry in list(self._fast_path.items()):
+                    if stale_entry.pending == 0 and stale_entry.expires_at <= now:
+                        del self._fast_path[stale_key]
+
+        metrics.incr("quotas.redis.fast_path", tags={"hit": False}, sample_rate=0.1)
+
+        try:
+            # Scripts cannot be pipelined on a Redis Cluster client.
+            pipe = client if self.is_redis_cluster else client.pipeline(transaction=False)
+            if entry is not None and entry.pending:
+                for counter_key, expiry in zip(entry.keys[::2], entry.expiries):
+                    pipe.incrby(counter_key, entry.pending)
+                    pipe.expireat(counter_key, expiry)
+            rejections = is_rate_limited(pipe, keys, args)
+            values = pipe.mget(keys)
+            if not self.is_redis_cluster:
+                *_, rejections, values = pipe.execute()
+        except Exception:
+            if entry is not None and entry.pending:
+                # The events let through on the popped entry haven't been
+                # counted, hand them to the next call.
+                with lock:
+                    current = self._fast_path.get(fast_path_key)
+                    if current is not None and current.keys == entry.keys:
+                        current.pending += entry.pending
+                    elif current is None:
+                        entry.expires_at = 0
+                        self._fast_path[fast_path_key] = entry
+            raise
+
+        if any(rejections):
+            return rejections
+
+        remaining = None
+        for i, limit in enumerate(args[::2]):
+            if limit < 0:
+                continue
+            used = int(values[2 * i] or 0) - int(values[2 * i + 1] or 0)
+            headroom = int((limit - used) * self.fast_path_fraction)
+            remaining = headroom if remaining is None else min(remaining, headroom)
+
+        if remaining is None or remaining > 0:
+            with lock:
+                current = self._fast_path.get(fast_path_key)
+                if current is not None and current.pending:
+                    # Another thread has let events through on an entry it
+                    # created in the meantime, which still need to be counted.
+                    return rejections
+                self._fast_path[fast_path_key] = FastPathEntry(
+                    keys=keys,
+                    expiries=args[1::2],
+                    remaining=remaining,
+                    pending=0,
+                    expires_at=monotonic() + self.fast_path_ttl,
+                )
+
+        return rejections
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import logging
+import threading
+from dataclasses import dataclass
 from time import time
 from typing import TYPE_CHECKING, Any
 
@@ -28,10 +30,37 @@ def _bucket_start_time(bucket_number: int, window: int) -> int:
     return bucket_number * window
 
 
+@dataclass
+class Lease:
+    """A block of quota of one rate limit window, leased from Redis."""
+
+    # Number of requests this process may still let through.
+    remaining: int
+    # Estimated number of requests counted in the window so far.
+    count: int
+    # Whether the limit was reached when the lease was taken, in which case
+    # requests are rejected locally once `remaining` runs out.
+    exhausted: bool
+    expires_at: float
+    window_end: int
+
+
 class RedisRateLimiter(RateLimiter):
-    def __init__(self, **options: Any) -> None:
+    def __init__(self, lease_size: int = 0, lease_ttl: float = 1.0, **options: Any) -> None:
+        """
+        :param lease_size: When greater than 1, each process leases blocks of
+            (at most) this many requests from Redis and counts requests against
+            its lease locally, only going back to Redis once the lease is used
+            up or older than `lease_ttl` seconds. Requests leased but not used
+            by one process are not available to others until the lease is
+            renewed, so smaller leases are more accurate.
+        """
         cluster_key = settings.SENTRY_RATE_LIMIT_REDIS_CLUSTER
         self.client = redis.redis_clusters.get(cluster_key)
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self._leases: dict[str, Lease] = {}
+        self._leases_lock = threading.Lock()
 
     def _construct_redis_key(
         self,
@@ -105,6 +134,13 @@ class RedisRateLimiter(RateLimiter):
         expiration = window - int(request_time % window)
         # Reset Time = next time bucket's start time
         reset_time = _bucket_start_time(_time_bucket(request_time, window) + 1, window)
+
+        lease_size = min(self.lease_size, limit)
+        if lease_size > 1:
+            return self._is_limited_with_lease(
+                redis_key, limit, lease_size, request_time, expiration, reset_time
+            )
+
         try:
             result = self.client.incr(redis_key)
             self.client.expire(redis_key, expiration)
@@ -115,3 +151,65 @@ class RedisRateLimiter(RateLimiter):
             return False, 0, reset_time
 
         return result > limit, result, reset_time
+
+    def _is_limited_with_lease(
+        self,
+        redis_key: str,
+        limit: int,
+        lease_size: int,
+        request_time: float,
+        expiration: int,
+        reset_time: int,
+    ) -> tuple[bool, int, int]:
+        held = 0
+        with self._leases_lock:
+            lease = self._leases.get(redis_key)
+            if lease is not None:
+                if request_time < lease.expires_at:
+                    if lease.remaining > 0:
+                        lease.remaining -= 1
+                        lease.count += 1
+                        return False, lease.count, reset_time
+                    if lease.exhausted:
+                        return True, max(lease.count, limit) + 1, reset_time
+                # Take over the requests left in the expired lease so no other
+                # thread hands them out while this one renews it.
+                held = lease.remaining
+                lease.remaining = 0
+
+        # Top up the lease to `lease_size` requests. Requests that are left
+        # over from the previous lease are still counted in Redis. Threads
+        # racing to renew the same lease both count their lease in Redis,
+        # which errs on the side of limiting.
+        try:
+            result = self.client.incrby(redis_key, lease_size - held)
+            self.client.expire(redis_key, expiration)
+        except RedisError:
+            logger.exception("Failed to retrieve current value from redis")
+            return False, 0, reset_time
+
+        # The lease covers the last `lease_size` requests counted in Redis,
+        # only the ones within the limit can be used.
+        count = result - lease_size
+        available = max(0, min(lease_size, limit - count))
+        lease = Lease(
+            remaining=available,
+            count=count,
+            exhausted=available < lease_size,
+            expires_at=request_time + self.lease_ttl,
+            window_end=reset_time,
+        )
+
+        with self._leases_lock:
+            if redis_key not in self._leases and len(self._leases) >= 10000:
+                # Forget the leases of windows that have ended.
+                for key, other in list(self._leases.items()):
+                    if other.window_end <= request_time:
+                        del self._leases[key]
+            self._leases[redis_key] = lease
+
+            if lease.remaining > 0:
+                lease.remaining -= 1
+                lease.count += 1
+                return False, lease.count, reset_time
+            return True, max(lease.count, limit) + 1, reset_time
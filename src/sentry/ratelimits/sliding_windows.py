@@ -1,4 +1,9 @@
-from typing import Any, Optional, Sequence, Tuple
+from __future__ import annotations
+
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, List, MutableMapping, Optional, Sequence, Tuple
 
 from sentry_redis_tools.clients import RedisCluster, StrictRedis
 from sentry_redis_tools.sliding_windows_rate_limiter import GrantedQuota, Quota
@@ -11,6 +16,8 @@ from sentry.exceptions import InvalidConfiguration
 from sentry.utils import redis
 from sentry.utils.services import Service
 
+sliding_windows = redis.load_script("ratelimits/sliding_windows.lua")
+
 __all__ = ["Quota", "GrantedQuota", "RequestedQuota", "Timestamp"]
 
 
@@ -116,13 +123,187 @@ class SlidingWindowRateLimiter(Service):
         return grants
 
 
+class RedisScriptSlidingWindowRateLimiter:
+    """
+    An implementation of the sliding window rate limiter that checks and
+    consumes quotas with a Lua script (`sliding_windows.lua`), which sums up
+    the granules of each window and evaluates a whole batch of requests
+    server-side.
+
+    The counters of a quota's window share a hash tag, which is derived from
+    the quota's prefix and spread over `shards` virtual shards. Each step
+    therefore takes one script call per virtual shard touched by the batch.
+    On a single Redis server there are no restrictions on which keys a script
+    may access, so `check_and_use_quotas` checks and consumes the whole batch
+    atomically in a single call. On a cluster it checks and then consumes, in
+    one call per shard each.
+
+    Counters are not shared with `RedisSlidingWindowRateLimiterImpl`, so
+    switching between the two (or changing `shards`) starts with fresh quotas.
+    """
+
+    def __init__(self, client: StrictRedis[bytes] | RedisCluster[bytes], shards: int) -> None:
+        self.client = client
+        self.shards = shards
+
+    def _get_shard(self, prefix: str) -> int:
+        return zlib.crc32(prefix.encode("utf-8")) % self.shards
+
+    def _build_redis_key(self, request: RequestedQuota, quota: Quota, granule: int) -> str:
+        prefix = quota.prefix_override or request.prefix
+        return "sliding-window-rate-limit:{%s}:%s:%s:%s:%s" % (
+            self._get_shard(prefix),
+            prefix,
+            quota.window_seconds,
+            quota.granularity_seconds,
+            granule,
+        )
+
+    def _call(
+        self,
+        mode: str,
+        requests: Sequence[Tuple[int, RequestedQuota, Sequence[Quota]]],
+        timestamp: Timestamp,
+    ) -> Sequence[Tuple[int, int, Sequence[int]]]:
+        """
+        Runs the script for `(amount, request, quotas)` tuples, where `quotas`
+        is the subset of the request's quotas to check or use. Returns the
+        granted amount and the remaining quota of each of `quotas` for every
+        request.
+        """
+        keys: List[str] = []
+        args: List[Any] = [mode]
+        for amount, request, quotas in requests:
+            args += [amount, len(quotas)]
+            for quota in quotas:
+                current = int(timestamp) // quota.granularity_seconds
+                num_granules = (
+                    1 if mode == "use" else quota.window_seconds // quota.granularity_seconds
+                )
+                keys += [
+                    self._build_redis_key(request, quota, current - i) for i in range(num_granules)
+                ]
+                args += [
+                    quota.limit,
+                    quota.window_seconds + quota.granularity_seconds,
+                    num_granules,
+                ]
+
+        return [
+            (granted, remaining) for granted, remaining in sliding_windows(self.client, keys, args)
+        ]
+
+    def _call_per_shard(
+        self,
+        mode: str,
+        requests: Sequence[RequestedQuota],
+        amounts: Sequence[int],
+        timestamp: Timestamp,
+    ) -> Sequence[List[Optional[int]]]:
+        """
+        Splits the requests by the virtual shard of their quotas and runs the
+        script once per shard. Returns the remaining quota of every quota of
+        every request.
+        """
+        # shard -> [(request index, quota indexes)]
+        by_shard: MutableMapping[int, List[Tuple[int, List[int]]]] = defaultdict(list)
+        for index, (request, amount) in enumerate(zip(requests, amounts)):
+            if mode == "use" and amount <= 0:
+                continue
+            quotas_by_shard: MutableMapping[int, List[int]] = defaultdict(list)
+            for quota_index, quota in enumerate(request.quotas):
+                shard = self._get_shard(quota.prefix_override or request.prefix)
+                quotas_by_shard[shard].append(quota_index)
+            for shard, quota_indexes in quotas_by_shard.items():
+                by_shard[shard].append((index, quota_indexes))
+
+        remaining: List[List[Optional[int]]] = [[None] * len(r.quotas) for r in requests]
+        for entries in by_shard.values():
+            results = self._call(
+                mode,
+                [
+                    (amounts[index], requests[index], [requests[index].quotas[i] for i in indexes])
+                    for index, indexes in entries
+                ],
+                timestamp,
+            )
+            for (index, indexes), (_, quota_remaining) in zip(entries, results):
+                for quota_index, left in zip(indexes, quota_remaining):
+                    remaining[index][quota_index] = left
+
+        return remaining
+
+    def _build_grants(
+        self, requests: Sequence[RequestedQuota], remaining: Sequence[Sequence[Optional[int]]]
+    ) -> Sequence[GrantedQuota]:
+        grants = []
+        for request, quota_remaining in zip(requests, remaining):
+            granted = request.requested
+            reached_quotas = []
+            for quota, left in zip(request.quotas, quota_remaining):
+                left = left or 0
+                if left < request.requested:
+                    reached_quotas.append(quota)
+                granted = min(granted, max(left, 0))
+            grants.append(
+                GrantedQuota(prefix=request.prefix, granted=granted, reached_quotas=reached_quotas)
+            )
+        return grants
+
+    def check_within_quotas(
+        self, requests: Sequence[RequestedQuota], timestamp: Optional[Timestamp] = None
+    ) -> Tuple[Timestamp, Sequence[GrantedQuota]]:
+        if timestamp is None:
+            timestamp = int(time.time())
+        remaining = self._call_per_shard(
+            "check", requests, [request.requested for request in requests], timestamp
+        )
+        return timestamp, self._build_grants(requests, remaining)
+
+    def use_quotas(
+        self,
+        requests: Sequence[RequestedQuota],
+        grants: Sequence[GrantedQuota],
+        timestamp: Timestamp,
+    ) -> None:
+        self._call_per_shard("use", requests, [grant.granted for grant in grants], timestamp)
+
+    def check_and_use_quotas(
+        self, requests: Sequence[RequestedQuota], timestamp: Optional[Timestamp] = None
+    ) -> Sequence[GrantedQuota]:
+        if isinstance(self.client, RedisCluster):
+            timestamp, grants = self.check_within_quotas(requests, timestamp)
+            self.use_quotas(requests, grants, timestamp)
+            return grants
+
+        if timestamp is None:
+            timestamp = int(time.time())
+        results = self._call(
+            "check_and_use",
+            [(request.requested, request, request.quotas) for request in requests],
+            timestamp,
+        )
+        return self._build_grants(requests, [remaining for _, remaining in results])
+
+
 class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
     def __init__(self, **options: Any) -> None:
+        """
+        :param cluster: The Redis cluster to store quotas in.
+        :param use_script: Use `RedisScriptSlidingWindowRateLimiter` instead
+            of the implementation from `sentry_redis_tools`.
+        :param shards: The number of virtual shards quotas are spread over
+            when `use_script` is set.
+        """
         cluster_key = options.get("cluster", "default")
         client = redis.redis_clusters.get(cluster_key)
         assert isinstance(client, (StrictRedis, RedisCluster)), client
         self.client = client
-        self.impl = RedisSlidingWindowRateLimiterImpl(self.client)
+        self.impl: RedisSlidingWindowRateLimiterImpl | RedisScriptSlidingWindowRateLimiter
+        if options.get("use_script", False):
+            self.impl = RedisScriptSlidingWindowRateLimiter(self.client, options.get("shards", 16))
+        else:
+            self.impl = RedisSlidingWindowRateLimiterImpl(self.client)
         super().__init__(**options)
 
     def validate(self) -> None:
@@ -144,3 +325,10 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
         timestamp: Timestamp,
     ) -> None:
         return self.impl.use_quotas(requests, grants, timestamp)
+
+    def check_and_use_quotas(
+        self, requests: Sequence[RequestedQuota], timestamp: Optional[Timestamp] = None
+    ) -> Sequence[GrantedQuota]:
+        if isinstance(self.impl, RedisScriptSlidingWindowRateLimiter):
+            return self.impl.check_and_use_quotas(requests, timestamp)
+        return super().check_and_use_quotas(requests, timestamp)
@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import uuid
 from datetime import datetime, timezone
@@ -450,6 +451,71 @@ def _get_project_config(
     return ProjectConfig(project, **cfg)
 
 
+def _get_full_config_metric_extraction(project: Project) -> Optional[Mapping[str, Any]]:
+    # Mirrors the condition under which `_get_project_config` adds metric extraction.
+    if not _should_extract_transaction_metrics(project):
+        return None
+    return get_metric_extraction_config(project)
+
+
+#: Sections of the full project config that can be recomputed on their own,
+#: mapped to the function computing them. These are the most expensive parts
+#: of the config, see `get_project_config_sections`.
+PROJECT_CONFIG_SECTIONS: Mapping[str, Callable[[Project], Any]] = {
+    "dynamicSampling": get_dynamic_sampling_config,
+    "metricExtraction": _get_full_config_metric_extraction,
+}
+
+
+def get_project_config_sections(
+    project: Project, sections: Sequence[str]
+) -> MutableMapping[str, Any]:
+    """Computes only the given sections of the full config of an active project.
+
+    :returns: A dict mapping each section to its value, or to ``None`` if the full
+        config would not contain the section.
+    """
+    result: MutableMapping[str, Any] = {}
+    with sentry_sdk.push_scope() as scope:
+        scope.set_tag("project", project.id)
+        for section in sections:
+            with metrics.timer(
+                "relay.config.get_project_config_sections.duration", tags={"section": section}
+            ):
+                config: MutableMapping[str, Any] = {}
+                add_experimental_config(config, section, PROJECT_CONFIG_SECTIONS[section], project)
+                result[section] = config.get(section)
+    return result
+
+
+def get_section_hash(value: Any) -> str:
+    """Returns a hash identifying the version of a config section."""
+    return hashlib.md5(utils.json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def merge_project_config_sections(
+    config: Mapping[str, Any], sections: Mapping[str, Any]
+) -> Optional[MutableMapping[str, Any]]:
+    """Replaces sections of a serialized full project config, as stored in the cache.
+
+    Sections are compared by their hashes, see :func:`get_section_hash`.
+
+    :returns: The merged config, or ``None`` if none of the sections changed.
+    """
+    merged = dict(config)
+    merged["config"] = inner = dict(config["config"])
+    changed = False
+    for section, value in sections.items():
+        if get_section_hash(inner.get(section)) == get_section_hash(value):
+            continue
+        changed = True
+        if value is None:
+            del inner[section]
+        else:
+            inner[section] = value
+    return merged if changed else None
+
+
 class _ConfigBase:
     """
     Base class for configuration objects
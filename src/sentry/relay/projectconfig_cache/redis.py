@@ -41,7 +41,8 @@ class RedisProjectConfigCache(ProjectConfigCache):
 
             p.setex(self.__get_redis_key(public_key), REDIS_CACHE_TIMEOUT, compressed)
 
-        p.execute()
+        with metrics.timer("relay.projectconfig_cache.write.duration"):
+            p.execute()
 
     def delete_many(self, public_keys):
         # Note: Those are multiple pipelines, one per cluster node
@@ -54,8 +55,7 @@ class RedisProjectConfigCache(ProjectConfigCache):
             "relay.projectconfig_cache.write", amount=sum(return_values), tags={"action": "delete"}
         )
 
-    def get(self, public_key):
-        rv = self.cluster_read.get(self.__get_redis_key(public_key))
+    def __decode(self, rv):
         if rv is not None:
             try:
                 rv = zstandard.decompress(rv).decode()
@@ -64,3 +64,15 @@ class RedisProjectConfigCache(ProjectConfigCache):
                 pass
             return json.loads(rv)
         return None
+
+    def get(self, public_key):
+        return self.__decode(self.cluster_read.get(self.__get_redis_key(public_key)))
+
+    def get_many(self, public_keys):
+        # Note: Those are multiple pipelines, one per cluster node
+        with self.cluster_read.pipeline() as p:
+            for public_key in public_keys:
+                p.get(self.__get_redis_key(public_key))
+            return_values = p.execute()
+
+        return {public_key: self.__decode(rv) for public_key, rv in zip(public_keys, return_values)}
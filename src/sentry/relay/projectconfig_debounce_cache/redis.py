@@ -15,15 +15,18 @@ class RedisProjectConfigDebounceCache(ProjectConfigDebounceCache):
 
         super().__init__(**options)
 
-    def _get_redis_key(self, public_key, project_id, organization_id):
+    def _get_redis_key(self, public_key, project_id, organization_id, trigger=None):
         if organization_id:
-            return f"{self._key_prefix}:o:{organization_id}"
+            key = f"{self._key_prefix}:o:{organization_id}"
         elif project_id:
-            return f"{self._key_prefix}:p:{project_id}"
+            key = f"{self._key_prefix}:p:{project_id}"
         elif public_key:
-            return f"{self._key_prefix}:k:{public_key}"
+            key = f"{self._key_prefix}:k:{public_key}"
         else:
             raise ValueError()
+        if trigger:
+            key = f"{key}:t:{trigger}"
+        return key
 
     def validate(self):
         validate_dynamic_cluster(self.is_redis_cluster, self.cluster)
@@ -34,34 +37,38 @@ class RedisProjectConfigDebounceCache(ProjectConfigDebounceCache):
         else:
             return self.cluster.get_local_client_for_key(routing_key)
 
-    def is_debounced(self, *, public_key, project_id, organization_id):
+    def is_debounced(self, *, public_key, project_id, organization_id, trigger=None):
         if organization_id:
             key = self._get_redis_key(
-                public_key=None, project_id=None, organization_id=organization_id
+                public_key=None, project_id=None, organization_id=organization_id, trigger=trigger
             )
             client = self._get_redis_client(key)
             if client.get(key):
                 return True
         if project_id:
-            key = self._get_redis_key(public_key=None, project_id=project_id, organization_id=None)
+            key = self._get_redis_key(
+                public_key=None, project_id=project_id, organization_id=None, trigger=trigger
+            )
             client = self._get_redis_client(key)
             if client.get(key):
                 return True
         if public_key:
-            key = self._get_redis_key(public_key=public_key, project_id=None, organization_id=None)
+            key = self._get_redis_key(
+                public_key=public_key, project_id=None, organization_id=None, trigger=trigger
+            )
             client = self._get_redis_client(key)
             if client.get(key):
                 return True
         return False
 
-    def debounce(self, *, public_key, project_id, organization_id):
-        key = self._get_redis_key(public_key, project_id, organization_id)
+    def debounce(self, *, public_key, project_id, organization_id, trigger=None):
+        key = self._get_redis_key(public_key, project_id, organization_id, trigger)
         client = self._get_redis_client(key)
         client.setex(key, self._debounce_ttl, 1)
         metrics.incr("relay.projectconfig_debounce_cache.debounce")
 
-    def mark_task_done(self, *, public_key, project_id, organization_id):
-        key = self._get_redis_key(public_key, project_id, organization_id)
+    def mark_task_done(self, *, public_key, project_id, organization_id, trigger=None):
+        key = self._get_redis_key(public_key, project_id, organization_id, trigger)
         client = self._get_redis_client(key)
         ret = client.delete(key)
         metrics.incr("relay.projectconfig_debounce_cache.task_done")
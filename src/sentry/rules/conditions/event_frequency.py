@@ -4,8 +4,9 @@ import abc
 import contextlib
 import logging
 import re
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, Mapping, Tuple
+from typing import Any, Callable, Dict, List, Mapping, MutableMapping, NamedTuple, Set, Tuple
 
 from django import forms
 from django.core.cache import cache
@@ -17,6 +18,7 @@ from sentry.issues.constants import get_issue_tsdb_group_model, get_issue_tsdb_u
 from sentry.receivers.rules import DEFAULT_RULE_LABEL
 from sentry.rules import EventState
 from sentry.rules.conditions.base import EventCondition
+from sentry.tsdb.base import BaseTSDB, TSDBModel
 from sentry.types.condition_activity import (
     FREQUENCY_CONDITION_BUCKET_SIZE,
     ConditionActivity,
@@ -88,12 +90,99 @@ class EventFrequencyForm(forms.Form):
         return cleaned_data
 
 
+class FrequencyQuery(NamedTuple):
+    """
+    A tsdb query made by a frequency condition, for any group. `method` is the
+    name of the method to call on the condition's `tsdb`.
+    """
+
+    tsdb: BaseTSDB
+    method: str
+    model: TSDBModel
+    start: datetime
+    end: datetime
+    environment_id: int | None
+    organization_id: int
+    referrer_suffix: str
+
+
+class FrequencyQueryPlanner:
+    """
+    Deduplicates and batches the tsdb queries of frequency conditions.
+
+    All conditions that use a planner share its `now`, so that conditions with
+    the same interval make the same query. The first time a condition asks
+    for a result that hasn't been fetched yet, `plan` is called to register
+    the queries that the other conditions will likely make, and then all
+    pending queries are run, one tsdb call for each distinct query with every
+    group that needs it as a key. Results are kept for the lifetime of the
+    planner, which is scoped to the rule processing of an event, and the tsdb
+    calls are made with `use_cache=True` so that bursts of events of the same
+    group share results across processes too.
+    """
+
+    def __init__(
+        self,
+        plan: Callable[[FrequencyQueryPlanner], None] | None = None,
+        now: datetime | None = None,
+    ) -> None:
+        self.now = now or timezone.now()
+        self._plan = plan
+        self._pending: MutableMapping[FrequencyQuery, Set[int]] = defaultdict(set)
+        self._results: MutableMapping[Tuple[FrequencyQuery, int], int] = {}
+
+    def add(self, query: FrequencyQuery, group_id: int) -> None:
+        if (query, group_id) not in self._results:
+            self._pending[query].add(group_id)
+
+    def get(self, query: FrequencyQuery, group_id: int) -> int:
+        if (query, group_id) not in self._results:
+            if self._plan is not None:
+                plan, self._plan = self._plan, None
+                plan(self)
+            self.add(query, group_id)
+            self.execute()
+        return self._results[query, group_id]
+
+    def execute(self) -> None:
+        pending, self._pending = self._pending, defaultdict(set)
+        for query, group_ids in pending.items():
+            keys = sorted(group_ids)
+            # For queries with intervals >= 1 hour we don't need to worry about read your writes
+            # consistency. Disable it so that we can scale to more nodes.
+            option_override_cm = contextlib.nullcontext()
+            if query.end - query.start >= timedelta(hours=1):
+                option_override_cm = options_override({"consistent": False})
+            with option_override_cm:
+                results: Mapping[int, int] = getattr(query.tsdb, query.method)(
+                    model=query.model,
+                    keys=keys,
+                    start=query.start,
+                    end=query.end,
+                    environment_id=query.environment_id,
+                    use_cache=True,
+                    jitter_value=keys[0],
+                    tenant_ids={"organization_id": query.organization_id},
+                    referrer_suffix=query.referrer_suffix,
+                )
+            for group_id in keys:
+                self._results[query, group_id] = results[group_id]
+
+        if pending:
+            metrics.incr("rules.conditions.frequency_planner.queries", amount=len(pending))
+            metrics.incr(
+                "rules.conditions.frequency_planner.keys",
+                amount=sum(len(group_ids) for group_ids in pending.values()),
+            )
+
+
 class BaseEventFrequencyCondition(EventCondition, abc.ABC):
     intervals = standard_intervals
     form_cls = EventFrequencyForm
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.tsdb = kwargs.pop("tsdb", tsdb)
+        self.query_planner: FrequencyQueryPlanner | None = None
         self.form_fields = {
             "value": {"type": "number", "placeholder": 100},
             "interval": {
@@ -178,25 +267,78 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         """ """
         raise NotImplementedError  # subclass must implement
 
+    def get_frequency_query(
+        self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
+    ) -> FrequencyQuery | None:
+        """
+        Returns the tsdb query `query_hook` makes, if it only makes one
+        `FrequencyQuery` (for `event.group_id`) and can be planned ahead.
+        """
+        return None
+
+    def run_frequency_query(self, event: GroupEvent, query: FrequencyQuery) -> int:
+        if self.query_planner is not None:
+            return self.query_planner.get(query, event.group_id)
+
+        results: Mapping[int, int] = getattr(query.tsdb, query.method)(
+            model=query.model,
+            keys=[event.group_id],
+            start=query.start,
+            end=query.end,
+            environment_id=query.environment_id,
+            use_cache=True,
+            jitter_value=event.group_id,
+            tenant_ids={"organization_id": query.organization_id},
+            referrer_suffix=query.referrer_suffix,
+        )
+        return results[event.group_id]
+
+    def _get_query_windows(self, interval: str, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """
+        Returns the (start, end) windows to query, the second one being the
+        comparison window of percent comparisons.
+        """
+        _, duration = self.intervals[interval]
+        windows = [(end - duration, end)]
+        if self.get_option("comparisonType", COMPARISON_TYPE_COUNT) == COMPARISON_TYPE_PERCENT:
+            comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
+            comparison_end = end - comparison_interval
+            windows.append((comparison_end - duration, comparison_end))
+        return windows
+
+    def plan_frequency_queries(self, event: GroupEvent, planner: FrequencyQueryPlanner) -> None:
+        """
+        Registers the queries `passes` would make for `event` with `planner`.
+        """
+        interval, value = self._get_options()
+        if not (interval and value is not None):
+            return
+
+        if self.rule is None:
+            return
+
+        for start, end in self._get_query_windows(interval, planner.now):
+            query = self.get_frequency_query(event, start, end, self.rule.environment_id)
+            if query is not None:
+                planner.add(query, event.group_id)
+
     def get_rate(self, event: GroupEvent, interval: str, environment_id: str) -> int:
         _, duration = self.intervals[interval]
-        end = timezone.now()
+        end = self.query_planner.now if self.query_planner is not None else timezone.now()
         # For conditions with interval >= 1 hour we don't need to worry about read your writes
         # consistency. Disable it so that we can scale to more nodes.
         option_override_cm = contextlib.nullcontext()
         if duration >= timedelta(hours=1):
             option_override_cm = options_override({"consistent": False})
         with option_override_cm:
-            result: int = self.query(event, end - duration, end, environment_id=environment_id)
-            comparison_type = self.get_option("comparisonType", COMPARISON_TYPE_COUNT)
-            if comparison_type == COMPARISON_TYPE_PERCENT:
-                comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
-                comparison_end = end - comparison_interval
+            (start, end), *comparison_windows = self._get_query_windows(interval, end)
+            result: int = self.query(event, start, end, environment_id=environment_id)
+            for comparison_start, comparison_end in comparison_windows:
                 # TODO: Figure out if there's a way we can do this less frequently. All queries are
                 # automatically cached for 10s. We could consider trying to cache this and the main
                 # query for 20s to reduce the load.
                 comparison_result = self.query(
-                    event, comparison_end - duration, comparison_end, environment_id=environment_id
+                    event, comparison_start, comparison_end, environment_id=environment_id
                 )
                 result = percent_increase(result, comparison_result)
 
@@ -226,18 +368,23 @@ class EventFrequencyCondition(BaseEventFrequencyCondition):
     def query_hook(
         self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
     ) -> int:
-        sums: Mapping[int, int] = self.tsdb.get_sums(
+        return self.run_frequency_query(
+            event, self.get_frequency_query(event, start, end, environment_id)
+        )
+
+    def get_frequency_query(
+        self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
+    ) -> FrequencyQuery:
+        return FrequencyQuery(
+            tsdb=self.tsdb,
+            method="get_sums",
             model=get_issue_tsdb_group_model(event.group.issue_category),
-            keys=[event.group_id],
             start=start,
             end=end,
             environment_id=environment_id,
-            use_cache=True,
-            jitter_value=event.group_id,
-            tenant_ids={"organization_id": event.group.project.organization_id},
+            organization_id=event.group.project.organization_id,
             referrer_suffix="alert_event_frequency",
         )
-        return sums[event.group_id]
 
     def get_preview_aggregate(self) -> Tuple[str, str]:
         return "count", "roundedTime"
@@ -250,18 +397,23 @@ class EventUniqueUserFrequencyCondition(BaseEventFrequencyCondition):
     def query_hook(
         self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
     ) -> int:
-        totals: Mapping[int, int] = self.tsdb.get_distinct_counts_totals(
+        return self.run_frequency_query(
+            event, self.get_frequency_query(event, start, end, environment_id)
+        )
+
+    def get_frequency_query(
+        self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
+    ) -> FrequencyQuery:
+        return FrequencyQuery(
+            tsdb=self.tsdb,
+            method="get_distinct_counts_totals",
             model=get_issue_tsdb_user_group_model(event.group.issue_category),
-            keys=[event.group_id],
             start=start,
             end=end,
             environment_id=environment_id,
-            use_cache=True,
-            jitter_value=event.group_id,
-            tenant_ids={"organization_id": event.group.project.organization_id},
+            organization_id=event.group.project.organization_id,
             referrer_suffix="alert_event_uniq_user_frequency",
         )
-        return totals[event.group_id]
 
     def get_preview_aggregate(self) -> Tuple[str, str]:
         return "uniq", "user"
@@ -359,17 +511,21 @@ class EventFrequencyPercentCondition(BaseEventFrequencyCondition):
             )
             avg_sessions_in_interval = session_count_last_hour / (60 / interval_in_minutes)
 
-            issue_count = self.tsdb.get_sums(
-                model=get_issue_tsdb_group_model(event.group.issue_category),
-                keys=[event.group_id],
-                start=start,
-                end=end,
-                environment_id=environment_id,
-                use_cache=True,
-                jitter_value=event.group_id,
-                tenant_ids={"organization_id": event.group.project.organization_id},
-                referrer_suffix="alert_event_frequency_percent",
-            )[event.group_id]
+            # Not planned ahead (see `get_frequency_query`), as it is only
+            # needed for projects with enough sessions.
+            issue_count = self.run_frequency_query(
+                event,
+                FrequencyQuery(
+                    tsdb=self.tsdb,
+                    method="get_sums",
+                    model=get_issue_tsdb_group_model(event.group.issue_category),
+                    start=start,
+                    end=end,
+                    environment_id=environment_id,
+                    organization_id=event.group.project.organization_id,
+                    referrer_suffix="alert_event_frequency_percent",
+                ),
+            )
             if issue_count > avg_sessions_in_interval:
                 # We want to better understand when and why this is happening, so we're logging it for now
                 self.logger.info(
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
 import uuid
-from datetime import timedelta
+from datetime import datetime, timedelta
 from random import randrange
 from typing import (
     Any,
@@ -20,15 +22,21 @@ from typing import (
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import analytics
+from sentry import analytics, options
 from sentry.eventstore.models import GroupEvent
 from sentry.models.environment import Environment
+from sentry.models.group import Group
 from sentry.models.grouprulestatus import GroupRuleStatus
+from sentry.models.project import Project
 from sentry.models.rule import Rule
 from sentry.models.rulesnooze import RuleSnooze
 from sentry.rules import EventState, history, rules
 from sentry.rules.actions.base import EventAction
 from sentry.rules.conditions.base import EventCondition
+from sentry.rules.conditions.event_frequency import (
+    BaseEventFrequencyCondition,
+    FrequencyQueryPlanner,
+)
 from sentry.rules.filters.base import EventFilter
 from sentry.types.rules import RuleFuture
 from sentry.utils.hashlib import hash_values
@@ -54,6 +62,173 @@ def is_condition_slow(condition: Mapping[str, str]) -> bool:
     return False
 
 
+def _build_rule_status_cache_key(group_id: int, rule_id: int) -> str:
+    return "grouprulestatus:1:%s" % hash_values([group_id, rule_id])
+
+
+def bulk_get_rule_statuses(
+    project: Project, groups: Sequence[Group], rules: Sequence[Rule]
+) -> Mapping[int, Mapping[int, GroupRuleStatus]]:
+    """
+    Returns the `GroupRuleStatus` of every rule for each of `groups`, keyed by
+    group ID and rule ID, and creates the ones that don't exist yet.
+    """
+    rule_statuses: MutableMapping[int, MutableMapping[int, GroupRuleStatus]] = {
+        group.id: {} for group in groups
+    }
+    keys = {
+        _build_rule_status_cache_key(group.id, rule.id): (group.id, rule.id)
+        for group in groups
+        for rule in rules
+    }
+    cache_results: Mapping[str, GroupRuleStatus] = cache.get_many(list(keys))
+    missing: Set[Tuple[int, int]] = set()
+    for key, (group_id, rule_id) in keys.items():
+        rule_status = cache_results.get(key)
+        if not rule_status:
+            missing.add((group_id, rule_id))
+        else:
+            rule_statuses[group_id][rule_id] = rule_status
+
+    def fetch_missing() -> List[GroupRuleStatus]:
+        statuses = GroupRuleStatus.objects.filter(
+            group_id__in={group_id for group_id, _ in missing},
+            rule_id__in={rule_id for _, rule_id in missing},
+        )
+        fetched = []
+        for status in statuses:
+            if (status.group_id, status.rule_id) in missing:
+                rule_statuses[status.group_id][status.rule_id] = status
+                missing.remove((status.group_id, status.rule_id))
+                fetched.append(status)
+        return fetched
+
+    if missing:
+        # If not cached, attempt to fetch status from the database
+        to_cache = fetch_missing()
+
+        # We might need to create some statuses if they don't already exist
+        if missing:
+            # We use `ignore_conflicts=True` here to avoid race conditions where the statuses
+            # might be created between when we queried above and attempt to create the rows now.
+            GroupRuleStatus.objects.bulk_create(
+                [
+                    GroupRuleStatus(rule_id=rule_id, group_id=group_id, project=project)
+                    for group_id, rule_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+            # Using `ignore_conflicts=True` prevents the pk from being set on the model
+            # instances. Re-query the database to fetch the rows, they should all exist at this
+            # point.
+            to_cache.extend(fetch_missing())
+
+            if missing:
+                # Shouldn't happen, but log just in case
+                RuleProcessor.logger.error(
+                    "Failed to fetch some GroupRuleStatuses in RuleProcessor",
+                    extra={
+                        "missing_rule_ids": {rule_id for _, rule_id in missing},
+                        "group_ids": {group_id for group_id, _ in missing},
+                    },
+                )
+        if to_cache:
+            cache.set_many(
+                {
+                    _build_rule_status_cache_key(item.group_id, item.rule_id): item
+                    for item in to_cache
+                }
+            )
+
+    return rule_statuses
+
+
+class BatchRuleProcessor:
+    """
+    Shares the rule processing state of a project between a window of events:
+    the group jobs of a post-process task and, if
+    `post-process.rule-batch-window` is set, every event of the project that
+    the process handles within that many seconds. The rules and snoozed rules
+    are loaded once per window, and the `GroupRuleStatus` rows of the groups
+    are looked up once per group, through `bulk_get_rule_statuses`.
+
+    Rules are still applied to each event through a `RuleProcessor`, so
+    actions fire as before. Frequency conditions are not shared, as their
+    counts have to be current for each event. A rule that fires marks its
+    shared status active, so that later events of the group skip it early.
+    """
+
+    def __init__(self, project: Project, expires: float | None = None) -> None:
+        self.project = project
+        # `time.monotonic()` after which the window is not reused anymore.
+        self.expires = expires
+        self._lock = threading.Lock()
+        self._rules: Sequence[Rule] | None = None
+        self._snoozed_rule_ids: Collection[int] | None = None
+        self._rule_statuses: MutableMapping[int, Mapping[int, GroupRuleStatus]] = {}
+
+    def get_rules(self) -> Sequence[Rule]:
+        with self._lock:
+            if self._rules is None:
+                self._rules = Rule.get_for_project(self.project.id)
+            return self._rules
+
+    def get_snoozed_rule_ids(self) -> Collection[int]:
+        rules = self.get_rules()
+        with self._lock:
+            if self._snoozed_rule_ids is None:
+                self._snoozed_rule_ids = set(
+                    RuleSnooze.objects.filter(rule__in=rules, user_id=None).values_list(
+                        "rule", flat=True
+                    )
+                )
+            return self._snoozed_rule_ids
+
+    def get_rule_statuses(self, group: Group) -> Mapping[int, GroupRuleStatus]:
+        rules = self.get_rules()
+        with self._lock:
+            if group.id not in self._rule_statuses:
+                self._rule_statuses.update(bulk_get_rule_statuses(self.project, [group], rules))
+            return self._rule_statuses[group.id]
+
+    def get_processor(
+        self,
+        event: GroupEvent,
+        is_new: bool,
+        is_regression: bool,
+        is_new_group_environment: bool,
+        has_reappeared: bool,
+    ) -> RuleProcessor:
+        return RuleProcessor(
+            event, is_new, is_regression, is_new_group_environment, has_reappeared, batch=self
+        )
+
+
+_batch_rule_processors: MutableMapping[int, BatchRuleProcessor] = {}
+_batch_rule_processors_lock = threading.Lock()
+
+
+def get_batch_rule_processor(project: Project) -> BatchRuleProcessor:
+    """
+    Returns the `BatchRuleProcessor` of the current window of `project`, or a
+    new one for a single post-process task if windows are disabled.
+    """
+    window: float = options.get("post-process.rule-batch-window")
+    if window <= 0:
+        return BatchRuleProcessor(project)
+
+    now = time.monotonic()
+    with _batch_rule_processors_lock:
+        batch = _batch_rule_processors.get(project.id)
+        if batch is None or batch.expires is None or batch.expires <= now:
+            for project_id, other in list(_batch_rule_processors.items()):
+                if other.expires is None or other.expires <= now:
+                    del _batch_rule_processors[project_id]
+            batch = BatchRuleProcessor(project, expires=now + window)
+            _batch_rule_processors[project.id] = batch
+        return batch
+
+
 class RuleProcessor:
     logger = logging.getLogger("sentry.rules")
 
@@ -64,6 +239,7 @@ class RuleProcessor:
         is_regression: bool,
         is_new_group_environment: bool,
         has_reappeared: bool,
+        batch: BatchRuleProcessor | None = None,
     ) -> None:
         self.event = event
         self.group = event.group
@@ -73,6 +249,12 @@ class RuleProcessor:
         self.is_regression = is_regression
         self.is_new_group_environment = is_new_group_environment
         self.has_reappeared = has_reappeared
+        self.batch = batch
+        self.frequency_planner: FrequencyQueryPlanner | None = None
+        # Results of fast conditions and filters, keyed by rule ID and the
+        # position of the predicate in the rule, so that they are evaluated
+        # only once between planning frequency queries and applying rules.
+        self.predicate_results: MutableMapping[Tuple[int, int], bool | None] = {}
 
         self.grouped_futures: MutableMapping[
             str, Tuple[Callable[[GroupEvent, Sequence[RuleFuture]], None], List[RuleFuture]]
@@ -80,69 +262,34 @@ class RuleProcessor:
 
     def get_rules(self) -> Sequence[Rule]:
         """Get all of the rules for this project from the DB (or cache)."""
+        if self.batch is not None:
+            return self.batch.get_rules()
         rules_: Sequence[Rule] = Rule.get_for_project(self.project.id)
         return rules_
 
-    def _build_rule_status_cache_key(self, rule_id: int) -> str:
-        return "grouprulestatus:1:%s" % hash_values([self.group.id, rule_id])
+    def get_snoozed_rule_ids(self, rules: Sequence[Rule]) -> Collection[int]:
+        if self.batch is not None:
+            return self.batch.get_snoozed_rule_ids()
+        snoozed_rule_ids: Collection[int] = RuleSnooze.objects.filter(
+            rule__in=rules, user_id=None
+        ).values_list("rule", flat=True)
+        return snoozed_rule_ids
 
     def bulk_get_rule_status(self, rules: Sequence[Rule]) -> Mapping[int, GroupRuleStatus]:
-        keys = [self._build_rule_status_cache_key(rule.id) for rule in rules]
-        cache_results: Mapping[str, GroupRuleStatus] = cache.get_many(keys)
-        missing_rule_ids: Set[int] = set()
-        rule_statuses: MutableMapping[int, GroupRuleStatus] = {}
-        for key, rule in zip(keys, rules):
-            rule_status = cache_results.get(key)
-            if not rule_status:
-                missing_rule_ids.add(rule.id)
-            else:
-                rule_statuses[rule.id] = rule_status
+        if self.batch is not None:
+            return self.batch.get_rule_statuses(self.group)
+        return bulk_get_rule_statuses(self.project, [self.group], rules)[self.group.id]
 
-        if missing_rule_ids:
-            # If not cached, attempt to fetch status from the database
-            statuses = GroupRuleStatus.objects.filter(
-                group=self.group, rule_id__in=missing_rule_ids
-            )
-            to_cache: List[GroupRuleStatus] = list()
-            for status in statuses:
-                rule_statuses[status.rule_id] = status
-                missing_rule_ids.remove(status.rule_id)
-                to_cache.append(status)
-
-            # We might need to create some statuses if they don't already exist
-            if missing_rule_ids:
-                # We use `ignore_conflicts=True` here to avoid race conditions where the statuses
-                # might be created between when we queried above and attempt to create the rows now.
-                GroupRuleStatus.objects.bulk_create(
-                    [
-                        GroupRuleStatus(rule_id=rule_id, group=self.group, project=self.project)
-                        for rule_id in missing_rule_ids
-                    ],
-                    ignore_conflicts=True,
-                )
-                # Using `ignore_conflicts=True` prevents the pk from being set on the model
-                # instances. Re-query the database to fetch the rows, they should all exist at this
-                # point.
-                statuses = GroupRuleStatus.objects.filter(
-                    group=self.group, rule_id__in=missing_rule_ids
-                )
-                for status in statuses:
-                    rule_statuses[status.rule_id] = status
-                    missing_rule_ids.remove(status.rule_id)
-                    to_cache.append(status)
-
-                if missing_rule_ids:
-                    # Shouldn't happen, but log just in case
-                    self.logger.error(
-                        "Failed to fetch some GroupRuleStatuses in RuleProcessor",
-                        extra={"missing_rule_ids": missing_rule_ids, "group_id": self.group.id},
-                    )
-            if to_cache:
-                cache.set_many(
-                    {self._build_rule_status_cache_key(item.rule_id): item for item in to_cache}
-                )
+    def predicate_matches(
+        self, index: int, condition: dict[str, Any], state: EventState, rule: Rule
+    ) -> bool | None:
+        if is_condition_slow(condition):
+            return self.condition_matches(condition, state, rule)
 
-        return rule_statuses
+        key = (rule.id, index)
+        if key not in self.predicate_results:
+            self.predicate_results[key] = self.condition_matches(condition, state, rule)
+        return self.predicate_results[key]
 
     def condition_matches(
         self, condition: dict[str, Any], state: EventState, rule: Rule
@@ -156,6 +303,8 @@ class RuleProcessor:
         if not isinstance(condition_inst, (EventCondition, EventFilter)):
             self.logger.warning("Unregistered condition %r", condition["id"])
             return None
+        if isinstance(condition_inst, BaseEventFrequencyCondition):
+            condition_inst.query_planner = self.frequency_planner
         passes: bool = safe_execute(
             condition_inst.passes,
             self.event,
@@ -181,6 +330,104 @@ class RuleProcessor:
             has_reappeared=self.has_reappeared,
         )
 
+    def is_rule_applicable(self, rule: Rule, status: GroupRuleStatus, now: datetime) -> bool:
+        """
+        Whether `rule` applies to the environment of the event and hasn't fired
+        for the group within its frequency.
+        """
+        try:
+            environment = self.event.get_environment()
+        except Environment.DoesNotExist:
+            return False
+
+        if rule.environment_id is not None and environment.id != rule.environment_id:
+            return False
+
+        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+        freq_offset = now - timedelta(minutes=frequency)
+        return not (status.last_active and status.last_active > freq_offset)
+
+    def get_predicates(
+        self, rule: Rule
+    ) -> Tuple[List[Tuple[int, dict[str, Any]]], List[Tuple[int, dict[str, Any]]]]:
+        """
+        Splits the conditions of `rule` into filters and conditions, each paired
+        with its position in the rule.
+        """
+        condition_list = []
+        filter_list = []
+        for index, rule_cond in enumerate(rule.data.get("conditions", ())):
+            if self.get_rule_type(rule_cond) == "condition/event":
+                condition_list.append((index, rule_cond))
+            else:
+                filter_list.append((index, rule_cond))
+
+        # Sort `condition_list` so that most expensive conditions run last.
+        condition_list.sort(key=lambda item: is_condition_slow(item[1]))
+        return filter_list, condition_list
+
+    def plan_frequency_queries(
+        self,
+        planner: FrequencyQueryPlanner,
+        project_rules: Sequence[Rule],
+        snoozed_rule_ids: Collection[int],
+        rule_statuses: Mapping[int, GroupRuleStatus],
+    ) -> None:
+        """
+        Registers the queries of the frequency conditions that `apply_rule`
+        would evaluate with `planner`. Rules that don't apply to the event, or
+        whose filters and fast conditions already decide the outcome, are
+        skipped.
+        """
+        state = self.get_state()
+        for rule in project_rules:
+            if rule.id in snoozed_rule_ids or not self.is_rule_applicable(
+                rule, rule_statuses[rule.id], planner.now
+            ):
+                continue
+
+            filter_list, condition_list = self.get_predicates(rule)
+            filter_func = get_match_function(
+                rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH
+            )
+            if filter_list and (
+                filter_func is None
+                or not filter_func(
+                    self.predicate_matches(index, f, state, rule) for index, f in filter_list
+                )
+            ):
+                continue
+
+            # Slow conditions run last, so they are only evaluated if the fast
+            # ones didn't short-circuit the match.
+            condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
+            fast_matches = (
+                self.predicate_matches(index, c, state, rule)
+                for index, c in condition_list
+                if not is_condition_slow(c)
+            )
+            if condition_match == "all":
+                reaches_slow_conditions = all(fast_matches)
+            elif condition_match in ("any", "none"):
+                reaches_slow_conditions = not any(fast_matches)
+            else:
+                reaches_slow_conditions = False
+            if not reaches_slow_conditions:
+                continue
+
+            for _, condition in condition_list:
+                condition_cls = rules.get(condition["id"])
+                if condition_cls is None or not issubclass(
+                    condition_cls, BaseEventFrequencyCondition
+                ):
+                    continue
+                safe_execute(
+                    condition_cls(self.project, data=condition, rule=rule).plan_frequency_queries,
+                    self.event,
+                    planner,
+                    _with_transaction=False,
+                )
+
     def apply_rule(self, rule: Rule, status: GroupRuleStatus) -> None:
         """
         If all conditions and filters pass, execute every action.
@@ -201,33 +448,15 @@ class RuleProcessor:
 
         condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
         filter_match = rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH
-        rule_condition_list = rule.data.get("conditions", ())
         frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
-        try:
-            environment = self.event.get_environment()
-        except Environment.DoesNotExist:
-            return
-
-        if rule.environment_id is not None and environment.id != rule.environment_id:
-            return
 
         now = timezone.now()
         freq_offset = now - timedelta(minutes=frequency)
-        if status.last_active and status.last_active > freq_offset:
+        if not self.is_rule_applicable(rule, status, now):
             return
 
         state = self.get_state()
-
-        condition_list = []
-        filter_list = []
-        for rule_cond in rule_condition_list:
-            if self.get_rule_type(rule_cond) == "condition/event":
-                condition_list.append(rule_cond)
-            else:
-                filter_list.append(rule_cond)
-
-        # Sort `condition_list` so that most expensive conditions run last.
-        condition_list.sort(key=lambda condition: is_condition_slow(condition))
+        filter_list, condition_list = self.get_predicates(rule)
 
         for predicate_list, match, name in (
             (filter_list, filter_match, "filter"),
@@ -235,7 +464,9 @@ class RuleProcessor:
         ):
             if not predicate_list:
                 continue
-            predicate_iter = (self.condition_matches(f, state, rule) for f in predicate_list)
+            predicate_iter = (
+                self.predicate_matches(index, f, state, rule) for index, f in predicate_list
+            )
             predicate_func = get_match_function(match)
             if predicate_func:
                 if not predicate_func(predicate_iter):
@@ -258,6 +489,9 @@ class RuleProcessor:
         if not updated:
             return
 
+        # Let later events that share the status skip the rule early.
+        status.last_active = now
+
         if randrange(10) == 0:
             analytics.record(
                 "issue_alert.fired",
@@ -314,11 +548,17 @@ class RuleProcessor:
             return {}.values()
 
         self.grouped_futures.clear()
+        self.predicate_results.clear()
         rules = self.get_rules()
-        snoozed_rules = RuleSnooze.objects.filter(rule__in=rules, user_id=None).values_list(
-            "rule", flat=True
-        )
+        snoozed_rules = self.get_snoozed_rule_ids(rules)
         rule_statuses = self.bulk_get_rule_status(rules)
+
+        self.frequency_planner = FrequencyQueryPlanner(
+            plan=lambda planner: self.plan_frequency_queries(
+                planner, rules, snoozed_rules, rule_statuses
+            )
+        )
+
         for rule in rules:
             if rule.id not in snoozed_rules:
                 self.apply_rule(rule, rule_statuses[rule.id])
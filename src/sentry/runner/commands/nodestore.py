@@ -0,0 +1,78 @@
+import os
+
+import click
+
+from sentry.runner.decorators import configuration
+
+
+@click.group()
+def nodestore():
+    "Tools for interacting with nodestore."
+
+
+def _iter_sample_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".json"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+@nodestore.command("train-dictionary")
+@click.argument("outfile", type=click.File("wb"), required=True)
+@click.argument("samples", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--platform",
+    default=None,
+    help="Only train on events whose platform maps to the same dictionary as this platform.",
+)
+@click.option(
+    "--size", default=112640, show_default=True, help="Maximum size of the dictionary in bytes."
+)
+@configuration
+def train_dictionary(outfile, samples, platform, size):
+    """
+    Train a zstd dictionary for nodestore compression from sample events.
+
+    SAMPLES are event JSON files, or directories containing them. The events are
+    encoded the same way nodestore encodes them before they are used for
+    training:
+
+        sentry nodestore train-dictionary --platform native ./native.dict ./events/
+
+    Add the dictionary to `SENTRY_NODESTORE_COMPRESSION_DICTIONARIES` (keyed by
+    the dictionary name printed at the end) on every reader before enabling
+    `nodestore.compression`.
+    """
+    from sentry.nodestore.base import NodeStorage
+    from sentry.nodestore.compression import get_dictionary_name, train_dictionary
+    from sentry.utils import json
+
+    name = get_dictionary_name(platform) if platform else None
+    ns = NodeStorage()
+
+    encoded = []
+    for path in _iter_sample_paths(samples):
+        with open(path, "rb") as f:
+            event = json.loads(f.read())
+        if name is not None and get_dictionary_name(event.get("platform")) != name:
+            continue
+        encoded.append(ns._encode({None: event}))
+
+    if not encoded:
+        raise click.ClickException("No matching sample events found.")
+
+    click.echo(f"Training dictionary from {len(encoded)} events...", err=True)
+    try:
+        dictionary = train_dictionary(encoded, size)
+    except Exception as e:
+        raise click.ClickException(f"Failed to train dictionary: {e}")
+
+    outfile.write(dictionary.as_bytes())
+    click.echo(
+        f"Wrote dictionary {name or 'default'!r} with id {dictionary.dict_id()} "
+        f"({len(dictionary)} bytes)",
+        err=True,
+    )
@@ -84,6 +84,18 @@ local function variadic_argument_parser(argument_parser)
     end
 end
 
+local function counted_argument_parser(argument_parser)
+    return function (cursor, arguments)
+        local count = tonumber(arguments[cursor])
+        cursor = cursor + 1
+        local results = {}
+        for i = 1, count do
+            cursor, results[i] = argument_parser(cursor, arguments)
+        end
+        return cursor, results
+    end
+end
+
 local function multiple_argument_parser(...)
     local parsers = {...}
     return function (cursor, arguments)
@@ -346,6 +358,49 @@ local function delete_timeline(configuration, timeline_id)
     redis.call('ZREM', configuration:get_schedule_waiting_key(), timeline_id)
 end
 
+local function get_timeline_lock_key(configuration, lock, timeline_id)
+    -- This must match the key used by the lock backend for timeline locks.
+    return lock.prefix .. configuration:get_timeline_key(timeline_id)
+end
+
+local function open_digests(configuration, lock, timeline_capacity, timeline_ids)
+    -- Locks and digests every timeline that is in the ready state and not
+    -- locked already, and reports why the others were skipped.
+    local results = {}
+    for i, timeline_id in ipairs(timeline_ids) do
+        local lock_key = get_timeline_lock_key(configuration, lock, timeline_id)
+        if redis.call('SET', lock_key, lock.value, 'EX', lock.duration, 'NX') == false then
+            results[i] = {timeline_id, 'locked', {}}
+        elseif redis.call('ZSCORE', configuration:get_schedule_ready_key(), timeline_id) == false then
+            redis.call('DEL', lock_key)
+            results[i] = {timeline_id, 'invalid_state', {}}
+        else
+            results[i] = {timeline_id, 'ok', digest_timeline(configuration, timeline_id, timeline_capacity)}
+        end
+    end
+    return results
+end
+
+local function close_digests(configuration, lock, digests)
+    -- A negative minimum delay only releases the lock, leaving the digest in
+    -- place for the next attempt. Digests whose lock expired in the meantime
+    -- are left untouched, since another process may have opened them again,
+    -- and are returned.
+    local expired = {}
+    for _, digest in ipairs(digests) do
+        local lock_key = get_timeline_lock_key(configuration, lock, digest.timeline_id)
+        if redis.call('GET', lock_key) ~= lock.value then
+            table.insert(expired, digest.timeline_id)
+        else
+            if digest.delay_minimum >= 0 then
+                close_digest(configuration, digest.timeline_id, digest.delay_minimum, digest.record_ids)
+            end
+            redis.call('DEL', lock_key)
+        end
+    end
+    return expired
+end
+
 
 -- Command Execution
 
@@ -383,6 +438,12 @@ local configuration_argument_parser = object_argument_parser({
     return configuration
 end)
 
+local lock_argument_parser = object_argument_parser({
+    {"prefix", argument_parser()},
+    {"value", argument_parser()},
+    {"duration", argument_parser(tonumber)},
+})
+
 local commands = {
     SCHEDULE = function (cursor, arguments)
         local cursor, configuration, deadline = multiple_argument_parser(
@@ -448,6 +509,29 @@ local commands = {
         )(cursor, arguments)
         return close_digest(configuration, timeline_id, delay_minimum, record_ids)
     end,
+    DIGEST_OPEN_MANY = function (cursor, arguments)
+        local cursor, configuration, lock, timeline_capacity, timeline_ids = multiple_argument_parser(
+            configuration_argument_parser,
+            lock_argument_parser,
+            argument_parser(tonumber),
+            variadic_argument_parser(argument_parser())
+        )(cursor, arguments)
+        return open_digests(configuration, lock, timeline_capacity, timeline_ids)
+    end,
+    DIGEST_CLOSE_MANY = function (cursor, arguments)
+        local cursor, configuration, lock, digests = multiple_argument_parser(
+            configuration_argument_parser,
+            lock_argument_parser,
+            variadic_argument_parser(
+                object_argument_parser({
+                    {"timeline_id", argument_parser()},
+                    {"delay_minimum", argument_parser(tonumber)},
+                    {"record_ids", counted_argument_parser(argument_parser())},
+                })
+            )
+        )(cursor, arguments)
+        return close_digests(configuration, lock, digests)
+    end,
 }
 
 local cursor, command = argument_parser(
@@ -0,0 +1,70 @@
+-- Checks and/or consumes a batch of sliding window quota requests, see
+-- `sentry.ratelimits.sliding_windows.RedisScriptSlidingWindowRateLimiter`.
+--
+-- Input:
+-- keys:
+--  for every quota of every request (in order), the counter keys of all
+--  granules of the quota's window, newest (current) granule first. In "use"
+--  mode only the current granule is passed.
+-- args:
+--  mode ("check", "use" or "check_and_use"),
+--  then for every request: requested, number of quotas,
+--  then for every quota of that request: limit, ttl, number of keys
+--
+-- Requests are processed in order, so in "check_and_use" mode later requests
+-- see the quota consumed by earlier ones. In "use" mode, the requested amount
+-- is consumed without checking any limits.
+--
+-- Output:
+-- for every request: {granted, {remaining quota of every quota before any was consumed}}
+local mode = ARGV[1]
+local check = mode ~= "use"
+local use = mode ~= "check"
+
+local results = {}
+local arg = 2
+local key = 1
+
+while arg <= #ARGV do
+  local requested = tonumber(ARGV[arg])
+  local num_quotas = tonumber(ARGV[arg + 1])
+  arg = arg + 2
+
+  local granted = requested
+  local remaining = {}
+  local current_keys = {}
+
+  for quota = 1, num_quotas do
+    local limit = tonumber(ARGV[arg])
+    local ttl = tonumber(ARGV[arg + 1])
+    local num_keys = tonumber(ARGV[arg + 2])
+    arg = arg + 3
+
+    local left = 0
+    if check then
+      local used = 0
+      for granule = key, key + num_keys - 1 do
+        used = used + (tonumber(redis.call("GET", KEYS[granule])) or 0)
+      end
+      left = limit - used
+      if left < granted then
+        granted = math.max(left, 0)
+      end
+    end
+
+    remaining[quota] = left
+    current_keys[quota] = {KEYS[key], ttl}
+    key = key + num_keys
+  end
+
+  if use and granted > 0 then
+    for _, current in ipairs(current_keys) do
+      redis.call("INCRBY", current[1], granted)
+      redis.call("EXPIRE", current[1], current[2])
+    end
+  end
+
+  results[#results + 1] = {granted, remaining}
+end
+
+return results
@@ -3,17 +3,20 @@ from __future__ import annotations
 import atexit
 import functools
 import logging
+import math
+import time
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
 
+from django.core.cache import cache
 from django.db.models import Q, QuerySet
 from django.utils import timezone
 from django.utils.functional import SimpleLazyObject
 
-from sentry import features, quotas
+from sentry import features, options, quotas
 from sentry.api.event_search import SearchFilter
 from sentry.db.models import BaseQuerySet
 from sentry.exceptions import InvalidSearchQuery
@@ -40,11 +43,15 @@ from sentry.search.snuba.executors import (
     PostgresSnubaQueryExecutor,
     PrioritySortWeights,
 )
+from sentry.search.snuba.result_cache import dump_cursor, get_result_cache_key, load_cursor
 from sentry.utils import metrics
 from sentry.utils.cursors import Cursor, CursorResult
+from sentry.utils.dates import to_datetime
 
 logger = logging.getLogger(__name__)
 
+RESULT_CACHE_REFRESH_OVERLAP = timedelta(minutes=1)
+
 
 def assigned_to_filter(
     actors: Sequence[User | Team | None], projects: Sequence[Project], field_filter: str = "id"
@@ -483,8 +490,173 @@ class SnubaSearchBackendBase(SearchBackend, metaclass=ABCMeta):
         actor: Optional[Any] = None,
         aggregate_kwargs: Optional[PrioritySortWeights] = None,
     ) -> CursorResult[Group]:
-
         search_filters = search_filters if search_filters is not None else []
+        query_kwargs: Dict[str, Any] = dict(
+            projects=projects,
+            environments=environments,
+            sort_by=sort_by,
+            limit=limit,
+            cursor=cursor,
+            count_hits=count_hits,
+            paginator_options=paginator_options,
+            search_filters=search_filters,
+            date_from=date_from,
+            date_to=date_to,
+            max_hits=max_hits,
+            referrer=referrer,
+            actor=actor,
+            aggregate_kwargs=aggregate_kwargs,
+        )
+
+        # Only the first page of searches over a relative date range is
+        # cached, which is what the issue stream keeps asking for.
+        if (
+            cursor is not None
+            or date_to is not None
+            or paginator_options
+            or options.get("snuba.search.result-cache-ttl") <= 0
+        ):
+            return self._query(**query_kwargs)
+
+        cache_key = get_result_cache_key(
+            type(self).__name__,
+            projects=projects,
+            environments=environments,
+            sort_by=sort_by,
+            limit=limit,
+            count_hits=count_hits,
+            search_filters=search_filters,
+            date_from=date_from,
+            max_hits=max_hits,
+            referrer=referrer,
+            actor=actor,
+            aggregate_kwargs=aggregate_kwargs,
+        )
+        return self._query_with_result_cache(cache_key, query_kwargs)
+
+    def _query_with_result_cache(
+        self, cache_key: str, query_kwargs: Dict[str, Any]
+    ) -> CursorResult[Group]:
+        """
+        Serves the first page of a search from the result cache.
+
+        Entries are kept for `snuba.search.result-cache-ttl` seconds. Results
+        sorted by date are additionally refreshed every
+        `snuba.search.result-cache-refresh-interval` seconds by only searching
+        for issues with events since the last refresh: those are the only ones
+        that can have moved, and they all sort before the cached ones. Entries
+        that can't be refreshed that way are dropped, and the search runs again.
+        """
+        now = time.time()
+        entry = cache.get(cache_key)
+
+        if entry is None:
+            metrics.incr("snuba.search.result_cache", tags={"result": "miss"})
+            results = self._query(**query_kwargs)
+            entry = {
+                "created_at": now,
+                "refreshed_at": now,
+                "group_ids": [group.id for group in results.results],
+                "prev": dump_cursor(results.prev),
+                "next": dump_cursor(results.next),
+                "hits": results.hits,
+                "max_hits": results.max_hits,
+            }
+            cache.set(cache_key, entry, options.get("snuba.search.result-cache-ttl"))
+            return results
+
+        refresh_interval = options.get("snuba.search.result-cache-refresh-interval")
+        if (
+            query_kwargs["sort_by"] == "date"
+            and refresh_interval > 0
+            and now - entry["refreshed_at"] >= refresh_interval
+        ):
+            ttl = entry["created_at"] + options.get("snuba.search.result-cache-ttl") - now
+            if ttl <= 0:
+                cache.delete(cache_key)
+                return self._query_with_result_cache(cache_key, query_kwargs)
+
+            refreshed = self._refresh_cached_results(entry, query_kwargs)
+            if refreshed is None:
+                metrics.incr("snuba.search.result_cache", tags={"result": "refresh_dropped"})
+                cache.delete(cache_key)
+                return self._query_with_result_cache(cache_key, query_kwargs)
+
+            metrics.incr("snuba.search.result_cache", tags={"result": "refresh"})
+            groups = refreshed
+            entry["refreshed_at"] = now
+            cache.set(cache_key, entry, int(math.ceil(ttl)))
+        else:
+            metrics.incr("snuba.search.result_cache", tags={"result": "hit"})
+            groups_by_id = Group.objects.in_bulk(entry["group_ids"])
+            groups = [groups_by_id[id] for id in entry["group_ids"] if id in groups_by_id]
+
+        return CursorResult(
+            groups,
+            prev=load_cursor(entry["prev"]),
+            next=load_cursor(entry["next"]),
+            hits=entry["hits"],
+            max_hits=entry["max_hits"],
+        )
+
+    def _refresh_cached_results(
+        self, entry: Dict[str, Any], query_kwargs: Dict[str, Any]
+    ) -> Optional[List[Group]]:
+        """
+        Searches for the issues that were seen since the cached results were
+        last refreshed, updating `entry` in place. If there are none, the
+        cached page is still current. If they fill a whole page, they are the
+        new page, along with the cursors Snuba returned for them. Otherwise the
+        cursor to the next page would have to point into the cached issues,
+        whose Snuba scores aren't known, and `None` is returned. The hit count
+        is left as is, and is only recomputed once the entry expires.
+        """
+        refresh_from = to_datetime(entry["refreshed_at"])
+        # Events are not searchable the moment they are received, so look a
+        # bit further back to pick up late ones.
+        refresh_from -= RESULT_CACHE_REFRESH_OVERLAP
+        if query_kwargs["date_from"] is not None:
+            refresh_from = max(refresh_from, query_kwargs["date_from"])
+
+        recent = self._query(**{**query_kwargs, "date_from": refresh_from, "count_hits": False})
+        if not recent.results:
+            groups_by_id = Group.objects.in_bulk(entry["group_ids"])
+            return [groups_by_id[id] for id in entry["group_ids"] if id in groups_by_id]
+
+        if len(recent.results) < query_kwargs["limit"]:
+            return None
+
+        recent_ids = [group.id for group in recent.results]
+        # Issues that were only seen before the refresh come after this page.
+        has_more = (
+            recent.next.has_results
+            or load_cursor(entry["next"]).has_results
+            or not set(entry["group_ids"]) <= set(recent_ids)
+        )
+        entry["group_ids"] = recent_ids
+        entry["prev"] = dump_cursor(recent.prev)
+        entry["next"] = dump_cursor(
+            Cursor(recent.next.value, recent.next.offset, is_prev=False, has_results=has_more)
+        )
+        return list(recent.results)
+
+    def _query(
+        self,
+        projects: Sequence[Project],
+        environments: Optional[Sequence[Environment]],
+        sort_by: str,
+        limit: int,
+        cursor: Optional[Cursor],
+        count_hits: bool,
+        paginator_options: Optional[Mapping[str, Any]],
+        search_filters: Sequence[SearchFilter],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        max_hits: Optional[int],
+        referrer: Optional[str],
+        actor: Optional[Any],
+        aggregate_kwargs: Optional[PrioritySortWeights],
+    ) -> CursorResult[Group]:
         # ensure projects are from same org
         if len({p.organization_id for p in projects}) != 1:
             raise RuntimeError("Cross organization search not supported")
@@ -6,11 +6,13 @@ import time
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
+from enum import Enum
 from hashlib import md5
 from math import floor
 from typing import Any, List, Mapping, Optional, Sequence, Set, Tuple, TypedDict, cast
 
 import sentry_sdk
+from django.core.cache import cache
 from django.db.models import Q
 from django.utils import timezone
 from snuba_sdk import (
@@ -686,6 +688,23 @@ def priority_aggregation_impl(
             ]
 
 
+class CandidateStrategy(Enum):
+    PREFILTER = "prefilter"
+    INTERSECT = "intersect"
+    POSTFILTER = "postfilter"
+
+
+@dataclass
+class CandidatePlan:
+    strategy: CandidateStrategy
+    # Group ids passed down to Snuba, only when pre-filtering.
+    group_ids: Sequence[int]
+    # Group ids matching the Postgres filters, only when intersecting.
+    candidates: Optional[Set[int]] = None
+    # The chunk size the chunked search grows from.
+    chunk_limit: int = 0
+
+
 class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
     ISSUE_FIELD_NAME = "group_id"
 
@@ -837,40 +856,18 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             )
             return results
 
-        # Here we check if all the django filters reduce the set of groups down
-        # to something that we can send down to Snuba in a `group_id IN (...)`
-        # clause.
-        max_candidates = options.get("snuba.search.max-pre-snuba-candidates")
-
-        with sentry_sdk.start_span(op="snuba_group_query") as span:
-            group_ids = list(
-                group_queryset.using_replica().values_list("id", flat=True)[: max_candidates + 1]
-            )
-            span.set_data("Max Candidates", max_candidates)
-            span.set_data("Result Size", len(group_ids))
-        metrics.timing("snuba.search.num_candidates", len(group_ids))
-        too_many_candidates = False
-        if not group_ids:
+        plan = self.plan_candidate_search(projects, group_queryset, limit)
+        if plan is None:
             # no matches could possibly be found from this point on
             metrics.incr("snuba.search.no_candidates", skip_internal=False)
             return self.empty_result
-        elif len(group_ids) > max_candidates:
-            # If the pre-filter query didn't include anything to significantly
-            # filter down the number of results (from 'first_release', 'status',
-            # 'bookmarked_by', 'assigned_to', 'unassigned', or 'subscribed_by')
-            # then it might have surpassed the `max_candidates`. In this case,
-            # we *don't* want to pass candidates down to Snuba, and instead we
-            # want Snuba to do all the filtering/sorting it can and *then* apply
-            # this queryset to the results from Snuba, which we call
-            # post-filtering.
-            metrics.incr("snuba.search.too_many_candidates", skip_internal=False)
-            too_many_candidates = True
-            group_ids = []
+        group_ids = plan.group_ids
+        too_many_candidates = plan.strategy != CandidateStrategy.PREFILTER
 
         sort_field = self.sort_strategies[sort_by]
         chunk_growth = options.get("snuba.search.chunk-growth-rate")
         max_chunk_size = options.get("snuba.search.max-chunk-size")
-        chunk_limit = limit
+        chunk_limit = plan.chunk_limit
         offset = 0
         num_chunks = 0
         hits = self.calculate_hits(
@@ -953,10 +950,14 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
                     hits = len(snuba_groups)
             else:
                 # pre-filtered candidates were *not* passed down to Snuba,
-                # so we need to do post-filtering to verify Sentry DB predicates
-                filtered_group_ids = group_queryset.filter(
-                    id__in=[gid for gid, _ in snuba_groups]
-                ).values_list("id", flat=True)
+                # so we need to do post-filtering to verify Sentry DB predicates,
+                # either against the candidates we already have or in Postgres
+                if plan.candidates is not None:
+                    filtered_group_ids = [gid for gid, _ in snuba_groups if gid in plan.candidates]
+                else:
+                    filtered_group_ids = group_queryset.filter(
+                        id__in=[gid for gid, _ in snuba_groups]
+                    ).values_list("id", flat=True)
 
                 group_to_score = dict(snuba_groups)
                 for group_id in filtered_group_ids:
@@ -1003,7 +1004,14 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             # more results.
             paginator_results.prev.has_results = True
 
-        metrics.timing("snuba.search.num_chunks", num_chunks)
+        metrics.timing(
+            "snuba.search.num_chunks", num_chunks, tags={"strategy": plan.strategy.value}
+        )
+        metrics.timing(
+            "snuba.search.plan.cost",
+            time.time() - time_start,
+            tags={"strategy": plan.strategy.value},
+        )
 
         groups = Group.objects.in_bulk(paginator_results.results)
         paginator_results.results = [groups[k] for k in paginator_results.results if k in groups]
@@ -1015,6 +1023,100 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         )
         return paginator_results
 
+    def plan_candidate_search(
+        self, projects: Sequence[Project], group_queryset: BaseQuerySet, limit: int
+    ) -> Optional[CandidatePlan]:
+        """
+        Decides how the Postgres side of the search is combined with Snuba,
+        based on how many groups match the Postgres filters. Returns `None` if
+        no groups match at all.
+
+        - If the candidates can be sent to Snuba in a `group_id IN (...)`
+          clause, Snuba only searches those groups (pre-filtering).
+        - Otherwise, if the planner is enabled and the candidates are both few
+          enough to hold in memory and a small enough share of the projects'
+          groups, the chunks returned by Snuba are intersected with the
+          candidates in memory. Knowing the share lets the first chunk be big
+          enough to find a full page of results.
+        - Otherwise the chunks returned by Snuba are filtered in Postgres
+          (post-filtering).
+        """
+        max_candidates = options.get("snuba.search.max-pre-snuba-candidates")
+        planner_enabled = options.get("snuba.search.pre-snuba-candidates-optimizer")
+        max_intersect_candidates = (
+            max(options.get("snuba.search.max-intersect-candidates"), max_candidates)
+            if planner_enabled
+            else max_candidates
+        )
+
+        with sentry_sdk.start_span(op="snuba_group_query") as span:
+            group_ids = list(
+                group_queryset.using_replica().values_list("id", flat=True)[
+                    : max_intersect_candidates + 1
+                ]
+            )
+            span.set_data("Max Candidates", max_intersect_candidates)
+            span.set_data("Result Size", len(group_ids))
+        metrics.timing("snuba.search.num_candidates", len(group_ids))
+
+        if not group_ids:
+            return None
+
+        if len(group_ids) <= max_candidates:
+            plan = CandidatePlan(CandidateStrategy.PREFILTER, group_ids, chunk_limit=limit)
+        elif len(group_ids) > max_intersect_candidates:
+            # If the pre-filter query didn't include anything to significantly
+            # filter down the number of results (from 'first_release', 'status',
+            # 'bookmarked_by', 'assigned_to', 'unassigned', or 'subscribed_by')
+            # then it might have surpassed the `max_candidates`. In this case,
+            # we *don't* want to pass candidates down to Snuba, and instead we
+            # want Snuba to do all the filtering/sorting it can and *then* apply
+            # this queryset to the results from Snuba, which we call
+            # post-filtering.
+            metrics.incr("snuba.search.too_many_candidates", skip_internal=False)
+            plan = CandidatePlan(CandidateStrategy.POSTFILTER, [], chunk_limit=limit)
+        else:
+            metrics.incr("snuba.search.too_many_candidates", skip_internal=False)
+            group_count = self._get_project_group_count(projects)
+            selectivity = min(len(group_ids) / max(group_count, 1), 1.0)
+            metrics.timing("snuba.search.plan.selectivity", selectivity)
+
+            if selectivity > options.get("snuba.search.pre-snuba-candidates-percentage"):
+                # Most groups pass the Postgres filters anyway, post-filtering
+                # the first few chunks is cheaper than holding all candidates.
+                plan = CandidatePlan(CandidateStrategy.POSTFILTER, [], chunk_limit=limit)
+            else:
+                # Assuming both sides are independent, Snuba has to return
+                # `limit / selectivity` groups for `limit` of them to match.
+                plan = CandidatePlan(
+                    CandidateStrategy.INTERSECT,
+                    [],
+                    candidates=set(group_ids),
+                    chunk_limit=min(
+                        int(limit / selectivity), options.get("snuba.search.max-chunk-size")
+                    ),
+                )
+
+        metrics.incr(
+            "snuba.search.plan", tags={"strategy": plan.strategy.value}, skip_internal=False
+        )
+        return plan
+
+    def _get_project_group_count(self, projects: Sequence[Project]) -> int:
+        project_ids = sorted(p.id for p in projects)
+        cache_key = "snuba.search.project-group-count:{}".format(
+            md5(",".join(map(str, project_ids)).encode("utf-8")).hexdigest()
+        )
+        group_count = cache.get(cache_key)
+        if group_count is None:
+            group_count = Group.objects.filter(project_id__in=project_ids).using_replica().count()
+            cache.set(
+                cache_key,
+                group_count,
+                options.get("snuba.search.project-group-count-cache-time"),
+            )
+        return group_count
+
     def calculate_hits(
         self,
         group_ids: Sequence[int],
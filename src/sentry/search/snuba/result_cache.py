@@ -0,0 +1,127 @@
+"""
+A cache for the first page of issue search results.
+
+The issue stream runs the same search (same projects, environments, query and
+sort) over and over again, across users and through auto refresh. Results are
+cached under a key derived from the normalized search parameters, plus a
+per-project version that is bumped whenever the status of an issue of the
+project changes, so that resolving or ignoring an issue is reflected
+immediately.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Iterable, Mapping, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from sentry.api.event_search import SearchFilter
+from sentry.models.environment import Environment
+from sentry.models.project import Project
+from sentry.utils import json
+from sentry.utils.cursors import Cursor
+from sentry.utils.hashlib import md5_text
+
+# Filters whose values depend on the user running the search, e.g. through
+# `me` or `my_teams`. Searches using any of them are not shared across users.
+USER_DEPENDENT_FILTERS = frozenset(
+    ["assigned_to", "assigned_or_suggested", "bookmarked_by", "subscribed_by"]
+)
+
+# Versions only need to outlive the cached results keyed by them.
+VERSION_TTL = 60 * 60
+
+
+def _get_version_key(project_id: int) -> str:
+    return f"search:results:version:{project_id}"
+
+
+def _normalize_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(item) for item in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    # Search values of e.g. `assigned_to` are resolved to models.
+    if getattr(value, "id", None) is not None:
+        return f"{type(value).__name__}:{value.id}"
+    return repr(value)
+
+
+def get_result_cache_key(
+    namespace: str,
+    projects: Sequence[Project],
+    environments: Optional[Sequence[Environment]],
+    sort_by: str,
+    limit: int,
+    count_hits: bool,
+    search_filters: Sequence[SearchFilter],
+    date_from: Optional[datetime],
+    max_hits: Optional[int],
+    referrer: Optional[str],
+    actor: Optional[Any],
+    aggregate_kwargs: Optional[Mapping[str, Any]],
+) -> str:
+    """
+    Returns the cache key of a search. Relative date ranges are keyed by their
+    length in minutes, so that the same search made a few seconds later maps
+    to the same key.
+    """
+    filters = sorted(
+        json.dumps(
+            [
+                search_filter.key.name,
+                search_filter.operator,
+                _normalize_value(search_filter.value.raw_value),
+            ]
+        )
+        for search_filter in search_filters
+    )
+    user_dependent = any(
+        search_filter.key.name in USER_DEPENDENT_FILTERS for search_filter in search_filters
+    )
+    period = None
+    if date_from is not None:
+        period = round((timezone.now() - date_from).total_seconds() / 60)
+
+    project_ids = sorted(project.id for project in projects)
+    versions = cache.get_many([_get_version_key(project_id) for project_id in project_ids])
+
+    params = {
+        "projects": project_ids,
+        "versions": [versions.get(_get_version_key(project_id)) for project_id in project_ids],
+        "environments": sorted(environment.id for environment in environments or ()),
+        "filters": filters,
+        "sort_by": sort_by,
+        "limit": limit,
+        "count_hits": count_hits,
+        "max_hits": max_hits,
+        "period": period,
+        "referrer": referrer,
+        "actor": getattr(actor, "id", None) if user_dependent else None,
+        "aggregate_kwargs": aggregate_kwargs,
+    }
+    return "search:results:{}:{}".format(
+        namespace, md5_text(json.dumps(params, sort_keys=True)).hexdigest()
+    )
+
+
+def invalidate_result_cache(project_ids: Iterable[int]) -> None:
+    """
+    Invalidates all cached search results involving any of the given projects.
+    """
+    version = uuid4().hex
+    cache.set_many(
+        {_get_version_key(project_id): version for project_id in set(project_ids)}, VERSION_TTL
+    )
+
+
+def dump_cursor(cursor: Cursor) -> Tuple[Any, int, bool, Optional[bool]]:
+    return (cursor.value, cursor.offset, cursor.is_prev, cursor.has_results)
+
+
+def load_cursor(data: Sequence[Any]) -> Cursor:
+    return Cursor(*data)
@@ -603,9 +603,6 @@ class Referrer(Enum):
     SERIALIZERS_GROUPSERIALIZERSNUBA__EXECUTE_ERROR_SEEN_STATS_QUERY = (
         "serializers.GroupSerializerSnuba._execute_error_seen_stats_query"
     )
-    SERIALIZERS_GROUPSERIALIZERSNUBA__EXECUTE_PERF_SEEN_STATS_QUERY = (
-        "serializers.GroupSerializerSnuba._execute_perf_seen_stats_query"
-    )
     SERIALIZERS_GROUPSERIALIZERSNUBA__EXECUTE_GENERIC_SEEN_STATS_QUERY = (
         "serializers.GroupSerializerSnuba._execute_generic_seen_stats_query"
     )
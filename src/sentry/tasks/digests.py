@@ -1,6 +1,8 @@
 import logging
 import time
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.conf import settings
 
 from sentry.digests import Record, get_option_key
 from sentry.digests.backends.base import InvalidState
@@ -9,7 +11,8 @@ from sentry.models.options.project_option import ProjectOption
 from sentry.models.project import Project
 from sentry.silo import SiloMode
 from sentry.tasks.base import instrumented_task
-from sentry.utils import snuba
+from sentry.utils import metrics, snuba
+from sentry.utils.iterators import chunked
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +38,14 @@ def schedule_digests():
     timeout = 300
     digests.maintenance(deadline - timeout)
 
-    for entry in digests.schedule(deadline):
-        deliver_digest.delay(entry.key, entry.timestamp)
+    batch_size = settings.SENTRY_DIGESTS_DELIVERY_BATCH_SIZE
+    if batch_size <= 1:
+        for entry in digests.schedule(deadline):
+            deliver_digest.delay(entry.key, entry.timestamp)
+        return
+
+    for entries in chunked(digests.schedule(deadline), batch_size):
+        deliver_digests.delay([(entry.key, entry.timestamp) for entry in entries])
 
 
 @instrumented_task(
@@ -46,7 +55,6 @@ def schedule_digests():
 )
 def deliver_digest(key, schedule_timestamp=None, notification_uuid: Optional[str] = None):
     from sentry import digests
-    from sentry.mail import mail_adapter
 
     try:
         project, target_type, target_identifier, fallthrough_choice = split_key(key)
@@ -55,6 +63,9 @@ def deliver_digest(key, schedule_timestamp=None, notification_uuid: Optional[str
         digests.delete(key)
         return
 
+    if schedule_timestamp is not None:
+        metrics.timing("digests.delivery.backlog_age", time.time() - schedule_timestamp)
+
     minimum_delay = ProjectOption.objects.get_value(
         project, get_option_key("mail", "minimum_delay")
     )
@@ -70,26 +81,112 @@ def deliver_digest(key, schedule_timestamp=None, notification_uuid: Optional[str
             logger.info(f"Skipped digest delivery: {error}", exc_info=True)
             return
 
-        if digest:
-            mail_adapter.notify_digest(
-                project,
-                digest,
-                target_type,
-                target_identifier,
-                fallthrough_choice=fallthrough_choice,
-                notification_uuid=notification_uuid,
-            )
-        else:
-            logger.info(
-                "Skipped digest delivery due to empty digest",
-                extra={
-                    "project": project.id,
-                    "target_type": target_type.value,
-                    "target_identifier": target_identifier,
-                    "build_digest_logs": logs,
-                    "fallthrough_choice": fallthrough_choice.value if fallthrough_choice else None,
-                },
-            )
+        _notify_digest(
+            project,
+            target_type,
+            target_identifier,
+            fallthrough_choice,
+            digest,
+            logs,
+            notification_uuid,
+        )
+
+
+@instrumented_task(
+    name="sentry.tasks.digests.deliver_digests",
+    queue="digests.delivery",
+    silo_mode=SiloMode.REGION,
+)
+def deliver_digests(entries: Sequence[Tuple[str, Optional[float]]]):
+    """
+    Delivers a batch of timelines, claiming and draining all of them with
+    ``digests.digest_many`` instead of one ``deliver_digest`` task each.
+    """
+    from sentry import digests
+
+    now = time.time()
+    targets = {}
+    for key, schedule_timestamp in entries:
+        if schedule_timestamp is not None:
+            metrics.timing("digests.delivery.backlog_age", now - schedule_timestamp)
+        try:
+            targets[key] = split_key(key)
+        except Project.DoesNotExist as error:
+            logger.info(f"Cannot deliver digest {key} due to error: {error}")
+            digests.delete(key)
+
+    # Timelines of the same project share its minimum delay.
+    projects = {project.id: project for project, _, _, _ in targets.values()}
+    minimum_delay_option = get_option_key("mail", "minimum_delay")
+    project_minimum_delays = {
+        project_id: ProjectOption.objects.get_value(project, minimum_delay_option)
+        for project_id, project in projects.items()
+    }
+    minimum_delays = {key: project_minimum_delays[target[0].id] for key, target in targets.items()}
+
+    built: List[Tuple[str, Any, Sequence[str], Optional[str]]] = []
+    with snuba.options_override({"consistent": True}):
+        with metrics.timer("digests.deliver_digests.drain"), digests.digest_many(
+            list(targets), minimum_delays=minimum_delays
+        ) as timelines:
+            for key, records in list(timelines.items()):
+                try:
+                    digest, logs = build_digest(targets[key][0], records)
+                except Exception:
+                    # Leave the timeline to be retried, like a failing
+                    # `deliver_digest` would.
+                    logger.exception("Failed to build digest", extra={"key": key})
+                    del timelines[key]
+                    continue
+                built.append((key, digest, logs, get_notification_uuid_from_records(records)))
+
+        metrics.incr("digests.deliver_digests.timelines", amount=len(timelines))
+        metrics.incr(
+            "digests.deliver_digests.records",
+            amount=sum(len(records) for records in timelines.values()),
+        )
+
+        for key, digest, logs, notification_uuid in built:
+            project, target_type, target_identifier, fallthrough_choice = targets[key]
+            try:
+                _notify_digest(
+                    project,
+                    target_type,
+                    target_identifier,
+                    fallthrough_choice,
+                    digest,
+                    logs,
+                    notification_uuid,
+                )
+            except Exception:
+                logger.exception("Failed to deliver digest", extra={"key": key})
+
+
+def _notify_digest(
+    project, target_type, target_identifier, fallthrough_choice, digest, logs, notification_uuid
+):
+    from sentry.mail import mail_adapter
+
+    if digest:
+        mail_adapter.notify_digest(
+            project,
+            digest,
+            target_type,
+            target_identifier,
+            fallthrough_choice=fallthrough_choice,
+            notification_uuid=notification_uuid,
+        )
+    else:
+        logger.info(
+            "Skipped digest delivery due to empty digest",
+            extra={
+                "project": project.id,
+                "target_type": target_type.value,
+                "target_identifier": target_identifier,
+                "build_digest_logs": logs,
+                "fallthrough_choice": fallthrough_choice.value if fallthrough_choice else None,
+            },
+        )
 
 
 def get_notification_uuid_from_records(records: List[Record]) -> Optional[str]:
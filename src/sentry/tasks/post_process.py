@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+import functools
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from time import time
-from typing import TYPE_CHECKING, List, Mapping, Optional, Sequence, Tuple, TypedDict, Union
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 import sentry_sdk
 from django.conf import settings
+from django.db import close_old_connections
 from django.db.models.signals import post_save
 from django.utils import timezone
 from google.api_core.exceptions import ServiceUnavailable
@@ -40,6 +55,7 @@ from sentry.utils.services import build_instance_from_options
 if TYPE_CHECKING:
     from sentry.eventstore.models import Event, GroupEvent
     from sentry.eventstream.base import GroupState, GroupStates
+    from sentry.rules.processor import BatchRuleProcessor
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +70,12 @@ class PostProcessJob(TypedDict, total=False):
     is_reprocessed: bool
     has_reappeared: bool
     has_alert: bool
+    # Shared by the jobs of one event (and possibly of later events of the
+    # project), so that rules and rule statuses are only loaded once.
+    rule_processor: BatchRuleProcessor
+
+
+PipelineStep = Callable[[PostProcessJob], None]
 
 
 def _get_service_hooks(project_id):
@@ -490,6 +512,7 @@ def post_process_group(
         from sentry.models.organization import Organization
         from sentry.models.project import Project
         from sentry.reprocessing2 import is_reprocessed_event
+        from sentry.rules.processor import get_batch_rule_processor
 
         if occurrence_id is None:
             # We use the data being present/missing in the processing store
@@ -619,6 +642,8 @@ def post_process_group(
             if gs.get("id") is not None
         ]
 
+        rule_processor = get_batch_rule_processor(event.project)
+
         group_jobs: Sequence[PostProcessJob] = [
             {
                 "event": ge,
@@ -626,6 +651,7 @@ def post_process_group(
                 "is_reprocessed": is_reprocessed,
                 "has_reappeared": bool(not gs["is_new"]),
                 "has_alert": False,
+                "rule_processor": rule_processor,
             }
             for ge, gs in multi_groups
         ]
@@ -656,32 +682,124 @@ def run_post_process_job(job: PostProcessJob):
         # specific pipelines for issue types
         pipeline = GROUP_CATEGORY_POST_PROCESS_PIPELINE[issue_category]
 
-    for pipeline_step in pipeline:
-        try:
-            with sentry_sdk.start_span(op=f"tasks.post_process_group.{pipeline_step.__name__}"):
-                pipeline_step(job)
-        except Exception:
+    concurrency = settings.SENTRY_POST_PROCESS_PIPELINE_CONCURRENCY
+    if concurrency > 1:
+        run_pipeline_concurrently(job, pipeline, issue_category_metric, concurrency)
+    else:
+        for pipeline_step in pipeline:
+            run_pipeline_step(job, pipeline_step, issue_category_metric)
+
+
+def _get_pipeline_step_deadline(pipeline_step: PipelineStep) -> float:
+    return settings.SENTRY_POST_PROCESS_PIPELINE_DEADLINES.get(
+        pipeline_step.__name__, settings.SENTRY_POST_PROCESS_PIPELINE_DEFAULT_DEADLINE
+    )
+
+
+def run_pipeline_step(
+    job: PostProcessJob, pipeline_step: PipelineStep, issue_category_metric: Optional[str]
+) -> None:
+    group_event = job["event"]
+    tags = {"issue_category": issue_category_metric, "pipeline": pipeline_step.__name__}
+    start = time()
+    try:
+        with sentry_sdk.start_span(op=f"tasks.post_process_group.{pipeline_step.__name__}"):
+            pipeline_step(job)
+    except Exception:
+        metrics.incr("sentry.tasks.post_process.post_process_group.exception", tags=tags)
+        logger.exception(
+            f"Failed to process pipeline step {pipeline_step.__name__}",
+            extra={"event": group_event, "group": group_event.group},
+        )
+    else:
+        metrics.incr("sentry.tasks.post_process.post_process_group.completed", tags=tags)
+    finally:
+        duration = time() - start
+        metrics.timing("sentry.tasks.post_process.post_process_group.duration", duration, tags=tags)
+        if duration > _get_pipeline_step_deadline(pipeline_step):
             metrics.incr(
-                "sentry.tasks.post_process.post_process_group.exception",
-                tags={
-                    "issue_category": issue_category_metric,
-                    "pipeline": pipeline_step.__name__,
-                },
-            )
-            logger.exception(
-                f"Failed to process pipeline step {pipeline_step.__name__}",
-                extra={"event": group_event, "group": group_event.group},
-            )
-        else:
-            metrics.incr(
-                "sentry.tasks.post_process.post_process_group.completed",
-                tags={
-                    "issue_category": issue_category_metric,
-                    "pipeline": pipeline_step.__name__,
-                },
+                "sentry.tasks.post_process.post_process_group.deadline_exceeded", tags=tags
             )
 
 
+def _run_pipeline_step_in_thread(
+    hub: sentry_sdk.Hub,
+    job: PostProcessJob,
+    pipeline_step: PipelineStep,
+    issue_category_metric: Optional[str],
+) -> None:
+    try:
+        with sentry_sdk.Hub(hub):
+            run_pipeline_step(job, pipeline_step, issue_category_metric)
+    finally:
+        close_old_connections()
+
+
+# (max workers, executor)
+_pipeline_executor: Optional[Tuple[int, ThreadPoolExecutor]] = None
+
+
+def _get_pipeline_executor(concurrency: int) -> ThreadPoolExecutor:
+    global _pipeline_executor
+    if _pipeline_executor is None or _pipeline_executor[0] != concurrency:
+        if _pipeline_executor is not None:
+            _pipeline_executor[1].shutdown(wait=False)
+        _pipeline_executor = (
+            concurrency,
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="post-process-pipeline"),
+        )
+    return _pipeline_executor[1]
+
+
+def run_pipeline_concurrently(
+    job: PostProcessJob,
+    pipeline: Sequence[PipelineStep],
+    issue_category_metric: Optional[str],
+    concurrency: int,
+) -> None:
+    """
+    Runs the steps of `pipeline` listed in `POST_PROCESS_PIPELINE_STEP_DEPENDENCIES`
+    on a thread pool, each as soon as the steps it depends on have finished,
+    while the other steps run in order on the calling thread. Returns once
+    every step has finished.
+    """
+    executor = _get_pipeline_executor(concurrency)
+    hub = sentry_sdk.Hub.current
+    step_names = {pipeline_step.__name__ for pipeline_step in pipeline}
+    waiting = [
+        pipeline_step
+        for pipeline_step in pipeline
+        if pipeline_step.__name__ in POST_PROCESS_PIPELINE_STEP_DEPENDENCIES
+    ]
+    finished: Set[str] = set()
+    futures = []
+
+    def submit_ready_steps() -> None:
+        for pipeline_step in list(waiting):
+            dependencies = POST_PROCESS_PIPELINE_STEP_DEPENDENCIES[pipeline_step.__name__]
+            if dependencies & step_names <= finished:
+                waiting.remove(pipeline_step)
+                futures.append(
+                    executor.submit(
+                        _run_pipeline_step_in_thread,
+                        hub,
+                        job,
+                        pipeline_step,
+                        issue_category_metric,
+                    )
+                )
+
+    try:
+        submit_ready_steps()
+        for pipeline_step in pipeline:
+            if pipeline_step.__name__ not in POST_PROCESS_PIPELINE_STEP_DEPENDENCIES:
+                run_pipeline_step(job, pipeline_step, issue_category_metric)
+                finished.add(pipeline_step.__name__)
+                submit_ready_steps()
+    finally:
+        wait(futures)
+
+
 def process_event(data: dict, group_id: Optional[int]) -> Event:
     from sentry.eventstore.models import Event
     from sentry.models.event import EventDict
@@ -934,9 +1052,15 @@ def process_rules(job: PostProcessJob) -> None:
     has_alert = False
 
     with metrics.timer("post_process.process_rules.duration"):
-        rp = RuleProcessor(
-            group_event, is_new, is_regression, is_new_group_environment, has_reappeared
-        )
+        batch = job.get("rule_processor")
+        if batch is not None:
+            rp = batch.get_processor(
+                group_event, is_new, is_regression, is_new_group_environment, has_reappeared
+            )
+        else:
+            rp = RuleProcessor(
+                group_event, is_new, is_regression, is_new_group_environment, has_reappeared
+            )
         with sentry_sdk.start_span(op="tasks.post_process_group.rule_processor_callbacks"):
             # TODO(dcramer): ideally this would fanout, but serializing giant
             # objects back and forth isn't super efficient
@@ -1219,6 +1343,7 @@ def plugin_post_process_group(plugin_slug, event, **kwargs):
 
 
 def feedback_filter_decorator(func):
+    @functools.wraps(func)
     def wrapper(job):
         if not should_postprocess_feedback(job):
             return
@@ -1270,3 +1395,21 @@ GENERIC_POST_PROCESS_PIPELINE = [
     process_inbox_adds,
     process_rules,
 ]
+
+# Pipeline steps that run on a thread pool when the steps of a job run
+# concurrently (see `SENTRY_POST_PROCESS_PIPELINE_CONCURRENCY`), with the steps
+# they have to run after. They only read the `event`, `group_state` and
+# `is_reprocessed` of the job, which no step changes, don't send signals and
+# don't query Snuba, since `snuba.options_override` is process-global and not
+# thread-safe. Dependencies have to be steps that aren't listed here, every
+# such step runs in pipeline order on the task's own thread.
+POST_PROCESS_PIPELINE_STEP_DEPENDENCIES: Mapping[str, FrozenSet[str]] = {
+    # The `Group` webhooks serialize the group with its assignee.
+    "process_resource_change_bounds": frozenset(
+        ["handle_owner_assignment", "handle_auto_assignment"]
+    ),
+    "process_code_mappings": frozenset(),
+    "process_similarity": frozenset(),
+    "update_existing_attachments": frozenset(),
+    "process_replay_link": frozenset(),
+}
@@ -1,8 +1,9 @@
 import logging
 import time
+from contextlib import ExitStack, contextmanager
 
 import sentry_sdk
-from django.db import router, transaction
+from django.db import connections, router, transaction
 
 from sentry.models.organization import Organization
 from sentry.relay import projectconfig_cache, projectconfig_debounce_cache
@@ -13,6 +14,20 @@ from sentry.utils.sdk import set_current_event_project
 
 logger = logging.getLogger(__name__)
 
+#: Invalidation triggers that only affect some sections of the project config, see
+#: ``sentry.relay.config.PROJECT_CONFIG_SECTIONS``.  Invalidations for these triggers
+#: recompute the affected sections and merge them into the cached configs.  Any other
+#: trigger recomputes the full config.
+PARTIAL_INVALIDATION_TRIGGERS = {
+    "alerts:create-on-demand-metric": ("metricExtraction",),
+    "dashboards:create-on-demand-metric": ("metricExtraction",),
+    "dynamic_sampling:boost_release": ("dynamicSampling",),
+    "dynamic_sampling:custom_rule_upsert": ("dynamicSampling",),
+    "dynamic_sampling_boost_low_volume_projects": ("dynamicSampling",),
+    "dynamic_sampling_boost_low_volume_transactions": ("dynamicSampling",),
+    "dynamic_sampling_sliding_window": ("dynamicSampling",),
+}
+
 
 # TODO(hybrid-cloud): Add silo_mode for region once testing is adjusted
 # The time_limit here should match the `debounce_ttl` of the projectconfig_debounce_cache
@@ -103,11 +118,14 @@ def validate_args(organization_id=None, project_id=None, public_key=None):
         raise TypeError("Must provide exactly one of organzation_id, project_id or public_key")
 
 
-def compute_configs(organization_id=None, project_id=None, public_key=None):
+def compute_configs(organization_id=None, project_id=None, public_key=None, sections=None):
     """Computes all configs for the org, project or single public key.
 
     You must only provide one single argument, not all.
 
+    If ``sections`` is given, only those sections of the configs of an org or project are
+    recomputed and merged into the cached configs.
+
     :returns: A dict mapping all affected public keys to their config.  The dict will not
        contain keys which should be retained in the cache unchanged.
     """
@@ -125,38 +143,19 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
         # it could be possible that refrequent invalidations cause the task to take excessive time
         # to complete.
         for organization in Organization.objects.filter(id=organization_id):
-            for project in Project.objects.filter(organization_id=organization_id):
+            projects = list(Project.objects.filter(organization_id=organization_id))
+            for project in projects:
                 project.set_cached_field_value("organization", organization)
-                for key in ProjectKey.objects.filter(project_id=project.id):
-                    key.set_cached_field_value("project", project)
-                    # If we find the config in the cache it means it was active.  As such we want to
-                    # recalculate it.  If the config was not there at all, we leave it and avoid the
-                    # cost of re-computation.
-                    if projectconfig_cache.backend.get(key.public_key) is not None:
-                        configs[key.public_key] = compute_projectkey_config(key)
-                        action = "recompute"
-                    else:
-                        action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "organization"},
-                    )
+            configs.update(
+                compute_cached_configs_for_projects(
+                    projects, scope="organization", sections=sections
+                )
+            )
     elif project_id:
-        for project in Project.objects.filter(id=project_id):
-            for key in ProjectKey.objects.filter(project_id=project_id):
-                key.set_cached_field_value("project", project)
-                # If we find the config in the cache it means it was active.  As such we want to
-                # recalculate it.  If the config was not there at all, we leave it and avoid the
-                # cost of re-computation.
-                if projectconfig_cache.backend.get(key.public_key) is not None:
-                    configs[key.public_key] = compute_projectkey_config(key)
-                    action = "recompute"
-                else:
-                    action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "project"},
-                    )
+        projects = list(Project.objects.filter(id=project_id))
+        configs.update(
+            compute_cached_configs_for_projects(projects, scope="project", sections=sections)
+        )
     elif public_key:
         try:
             key = ProjectKey.objects.get(public_key=public_key)
@@ -179,6 +178,110 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
     return configs
 
 
+@contextmanager
+def _count_queries():
+    """Counts the database queries executed on any connection within the block."""
+    counter = [0]
+
+    def count(execute, sql, params, many, context):
+        counter[0] += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(count))
+        yield counter
+
+
+def compute_cached_configs_for_projects(projects, scope, sections=None):
+    """Re-computes the configs of all project keys of the given projects that are cached.
+
+    If ``sections`` is given, only those sections are computed, once per project, and
+    merged into the cached configs.  Configs whose sections did not change are left out
+    of the result.
+
+    Keys whose config is not in the cache are skipped to avoid the cost of computing
+    configs that are not in use.  Instead of querying project keys and project options
+    project by project, they are fetched for all projects up front with a fixed number of
+    queries, and the cache is checked for all keys with a single pipeline.
+
+    :returns: A dict mapping the public keys of all cached configs to their new config.
+    """
+    from sentry.models.options.project_option import ProjectOption
+    from sentry.models.projectkey import ProjectKey
+    from sentry.relay.config import get_project_config_sections, merge_project_config_sections
+
+    configs = {}
+    with _count_queries() as queries:
+        projects_by_id = {project.id: project for project in projects}
+        keys = list(ProjectKey.objects.filter(project_id__in=list(projects_by_id)))
+        cached = projectconfig_cache.backend.get_many([key.public_key for key in keys])
+
+        # If we find the config in the cache it means it was active.  As such we want to
+        # recalculate it.  If the config was not there at all, we leave it and avoid the
+        # cost of re-computation.
+        active_keys = [key for key in keys if cached.get(key.public_key) is not None]
+        ProjectOption.objects.get_all_values_bulk([key.project_id for key in active_keys])
+
+        for key in keys:
+            metrics.incr(
+                "relay.projectconfig_cache.invalidation.recompute",
+                tags={
+                    "action": "recompute"
+                    if cached.get(key.public_key) is not None
+                    else "not-cached",
+                    "scope": scope,
+                },
+            )
+
+        computed_sections = {}
+        for key in active_keys:
+            key.set_cached_field_value("project", projects_by_id[key.project_id])
+            cached_config = cached[key.public_key]
+            if not sections or not _can_merge_sections(key, cached_config):
+                with metrics.timer(
+                    "relay.projectconfig_cache.invalidation.build", tags={"scope": scope}
+                ):
+                    configs[key.public_key] = compute_projectkey_config(key)
+                continue
+
+            if key.project_id not in computed_sections:
+                with metrics.timer(
+                    "relay.projectconfig_cache.invalidation.build_sections", tags={"scope": scope}
+                ):
+                    computed_sections[key.project_id] = get_project_config_sections(
+                        projects_by_id[key.project_id], sections
+                    )
+            merged = merge_project_config_sections(cached_config, computed_sections[key.project_id])
+            metrics.incr(
+                "relay.projectconfig_cache.invalidation.sections",
+                tags={"changed": merged is not None, "scope": scope},
+            )
+            if merged is not None:
+                configs[key.public_key] = merged
+
+    metrics.timing(
+        "relay.projectconfig_cache.invalidation.batch_queries", queries[0], tags={"scope": scope}
+    )
+    metrics.timing(
+        "relay.projectconfig_cache.invalidation.batch_size", len(active_keys), tags={"scope": scope}
+    )
+    return configs
+
+
+def _can_merge_sections(key, cached_config):
+    """Whether sections of the key's current config can be merged into its cached config."""
+    from sentry.constants import ObjectStatus
+    from sentry.models.projectkey import ProjectKeyStatus
+
+    return (
+        key.status == ProjectKeyStatus.ACTIVE
+        and key.project.status == ObjectStatus.ACTIVE
+        and not cached_config.get("disabled")
+        and "config" in cached_config
+    )
+
+
 def compute_projectkey_config(key):
     """Computes a single config for the given :class:`ProjectKey`.
 
@@ -224,8 +327,13 @@ def invalidate_project_config(
     """
     # Make sure we start by deleting the deduplication key so that new invalidation triggers
     # can schedule a new message while we already started computing the project config.
+    # Partial invalidations are debounced per trigger, see `_schedule_invalidate_project_config`.
+    sections = PARTIAL_INVALIDATION_TRIGGERS.get(trigger)
     projectconfig_debounce_cache.invalidation.mark_task_done(
-        organization_id=organization_id, project_id=project_id, public_key=public_key
+        organization_id=organization_id,
+        project_id=project_id,
+        public_key=public_key,
+        trigger=trigger if sections is not None else None,
     )
 
     if project_id:
@@ -240,7 +348,10 @@ def invalidate_project_config(
     sentry_sdk.set_context("kwargs", kwargs)
 
     updated_configs = compute_configs(
-        organization_id=organization_id, project_id=project_id, public_key=public_key
+        organization_id=organization_id,
+        project_id=project_id,
+        public_key=public_key,
+        sections=sections,
     )
     projectconfig_cache.backend.set_many(updated_configs)
 
@@ -356,7 +467,17 @@ def _schedule_invalidate_project_config(
         else:
             check_debounce_keys["organization_id"] = org_id
 
-    if projectconfig_debounce_cache.invalidation.is_debounced(**check_debounce_keys):
+    # Partial invalidations are debounced under keys scoped to their trigger, so that a
+    # pending partial invalidation never swallows a full one.  A pending full invalidation
+    # recomputes every section, so it does swallow partial ones.
+    partial = trigger in PARTIAL_INVALIDATION_TRIGGERS
+
+    if projectconfig_debounce_cache.invalidation.is_debounced(**check_debounce_keys) or (
+        partial
+        and projectconfig_debounce_cache.invalidation.is_debounced(
+            **check_debounce_keys, trigger=trigger
+        )
+    ):
         # If this task is already in the queue, do not schedule another task.
         metrics.incr(
             "relay.projectconfig_cache.skipped",
@@ -381,5 +502,8 @@ def _schedule_invalidate_project_config(
 
     # Use the original arguments to this function to set the debounce key.
     projectconfig_debounce_cache.invalidation.debounce(
-        organization_id=organization_id, project_id=project_id, public_key=public_key
+        organization_id=organization_id,
+        project_id=project_id,
+        public_key=public_key,
+        trigger=trigger if partial else None,
     )
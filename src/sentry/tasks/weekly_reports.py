@@ -41,7 +41,7 @@ from sentry.utils.dates import floor_to_utc_day, to_datetime, to_timestamp
 from sentry.utils.email import MessageBuilder
 from sentry.utils.outcomes import Outcome
 from sentry.utils.query import RangeQuerySetWrapper
-from sentry.utils.snuba import parse_snuba_datetime, raw_snql_query
+from sentry.utils.snuba import parse_snuba_datetime, raw_snql_query, stream_raw_snql_query
 
 ONE_DAY = int(timedelta(days=1).total_seconds())
 date_format = partial(dateformat.format, format_string="F jS, Y")
@@ -276,7 +276,9 @@ def project_event_counts_for_organization(ctx):
         orderby=[OrderBy(Column("time"), Direction.ASC)],
     )
     request = Request(dataset=Dataset.Outcomes.value, app_id="reports", query=query)
-    data = raw_snql_query(request, referrer="weekly_reports.outcomes")["data"]
+    # Large organizations have many rows, which are only needed one at a time.
+    # The stream releases its connection once the loop below has consumed it.
+    data = stream_raw_snql_query(request, referrer="weekly_reports.outcomes")
 
     for dat in data:
         project_id = dat["project_id"]
@@ -347,6 +347,14 @@ def pytest_runtest_teardown(item: pytest.Item) -> None:
     for model in (OrganizationOption, ProjectOption, UserOption):
         model.objects.clear_local_cache()
 
+    from sentry.grouping.enhancer import _stacktrace_cache
+
+    _stacktrace_cache.clear_local()
+
+    from sentry.event_manager import _grouping_hashes_cache
+
+    _grouping_hashes_cache.clear()
+
     Hub.main.bind_client(None)
 
 
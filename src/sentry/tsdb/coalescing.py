@@ -0,0 +1,271 @@
+"""
+Process-local write coalescing for TSDB counters.
+
+Every saved event increments a handful of counters and records the user in a
+couple of distinct counters. Written one event at a time, that is a separate
+HINCRBY/PFADD (per rollup and environment) for each of them. `CoalescingWriter`
+collects those writes in memory and writes them out in aggregate, either
+periodically from a background thread or as soon as enough writes are pending.
+
+Timestamps are normalized to the smallest rollup of the backend before writes
+are aggregated. Larger rollups are multiples of the smallest one, so the writes
+end up in the same buckets as if they had been written directly.
+
+Writes are delivered at least once: pending writes are flushed when the
+process exits, and writes that fail to flush are put back and retried with the
+next flush. Writes that are still pending when a process is forked are only
+flushed by the parent.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterable, MutableMapping, Sequence, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from sentry.tsdb.base import BaseTSDB, TSDBModel
+from sentry.utils import metrics
+from sentry.utils.dates import to_datetime, to_timestamp
+
+logger = logging.getLogger(__name__)
+
+# (environment ID, normalized timestamp)
+Bucket = Tuple[Any, int]
+Counters = MutableMapping[Bucket, MutableMapping[Tuple[TSDBModel, Any], int]]
+Records = MutableMapping[Bucket, MutableMapping[Tuple[TSDBModel, Any], set]]
+
+
+def _new_counters() -> Counters:
+    return defaultdict(lambda: defaultdict(int))
+
+
+def _new_records() -> Records:
+    return defaultdict(lambda: defaultdict(set))
+
+
+class CoalescingWriter:
+    """
+    Buffers `incr_multi` and `record_multi` calls for `backend`. The methods
+    accept the same arguments as the ones on `BaseTSDB`.
+    """
+
+    def __init__(
+        self, backend: BaseTSDB, flush_interval: float = 1.0, max_pending: int = 10000
+    ) -> None:
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._counters = _new_counters()
+        self._records = _new_records()
+        self._pending = 0
+
+        self._pid: int | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _validate_arguments(self, models: Iterable[TSDBModel], environment_id: Any) -> None:
+        # Mirrors `BaseTSDB.validate_arguments`, which the service wrapper does
+        # not expose, so that invalid writes fail at the call site rather than
+        # when flushing.
+        if environment_id is not None:
+            if set(models) - self.backend.models_with_environment_support:
+                raise ValueError("not all models support environment parameters")
+
+    def _get_bucket(self, timestamp: datetime | None, environment_id: Any) -> Bucket:
+        if timestamp is None:
+            timestamp = timezone.now()
+        resolution = min(self.backend.get_rollups())
+        epoch = int(to_timestamp(timestamp))
+        return environment_id, epoch - epoch % resolution
+
+    def incr_multi(
+        self,
+        items: Sequence[tuple[Any, ...]],
+        timestamp: datetime | None = None,
+        count: int = 1,
+        environment_id: Any = None,
+    ) -> None:
+        self._validate_arguments([item[0] for item in items], environment_id)
+
+        with self._lock:
+            self._reset_after_fork()
+            for item in items:
+                if len(item) == 2:
+                    model, key = item
+                    options = {}
+                else:
+                    model, key, options = item
+
+                bucket = self._get_bucket(options.get("timestamp", timestamp), environment_id)
+                counters = self._counters[bucket]
+                if (model, key) not in counters:
+                    self._pending += 1
+                counters[model, key] += options.get("count", count)
+
+        self._maybe_flush()
+
+    def record_multi(
+        self,
+        items: Sequence[tuple[TSDBModel, Any, Iterable[Any]]],
+        timestamp: datetime | None = None,
+        environment_id: Any = None,
+    ) -> None:
+        self._validate_arguments([model for model, key, values in items], environment_id)
+
+        with self._lock:
+            self._reset_after_fork()
+            bucket = self._get_bucket(timestamp, environment_id)
+            records = self._records[bucket]
+            for model, key, values in items:
+                members = records[model, key]
+                size = len(members)
+                members.update(values)
+                self._pending += len(members) - size
+
+        self._maybe_flush()
+
+    def _reset_after_fork(self) -> None:
+        # Must be called with `_lock` held. Anything buffered before a fork
+        # belongs to the parent process and would be written twice otherwise.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        if self._pid is not None:
+            self._counters = _new_counters()
+            self._records = _new_records()
+            self._pending = 0
+            self._stopped = threading.Event()
+
+        self._pid = pid
+        if self.flush_interval > 0:
+            self._thread = threading.Thread(
+                target=self._run, name="tsdb-coalescing-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        stopped = self._stopped
+        while not stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Failed writes have been put back already, try again later.
+                logger.exception("Failed to flush coalesced TSDB writes")
+
+    def _maybe_flush(self) -> None:
+        if self._pending >= self.max_pending:
+            metrics.incr("tsdb.coalescing.flush_on_size")
+            try:
+                self.flush()
+            except Exception:
+                # Failed writes have been put back already. This runs as part
+                # of saving an event, which must not fail because of it.
+                logger.exception("Failed to flush coalesced TSDB writes")
+
+    def flush(self) -> None:
+        """
+        Writes all pending increments and records to the backend. If writing
+        fails, the writes that have not been written yet are kept for the next
+        flush and the exception is re-raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                counters, self._counters = self._counters, _new_counters()
+                records, self._records = self._records, _new_records()
+                pending, self._pending = self._pending, 0
+
+            if not pending:
+                return
+
+            with metrics.timer("tsdb.coalescing.flush"):
+                metrics.incr("tsdb.coalescing.flushed_counters", amount=pending)
+                try:
+                    while counters:
+                        (environment_id, epoch), increments = counters.popitem()
+                        try:
+                            self.backend.incr_multi(
+                                [
+                                    (model, key, {"count": count})
+                                    for (model, key), count in increments.items()
+                                ],
+                                timestamp=to_datetime(epoch),
+                                environment_id=environment_id,
+                            )
+                        except Exception:
+                            counters[environment_id, epoch] = increments
+                            raise
+
+                    while records:
+                        (environment_id, epoch), members = records.popitem()
+                        try:
+                            self.backend.record_multi(
+                                [(model, key, values) for (model, key), values in members.items()],
+                                timestamp=to_datetime(epoch),
+                                environment_id=environment_id,
+                            )
+                        except Exception:
+                            records[environment_id, epoch] = members
+                            raise
+                except Exception:
+                    metrics.incr("tsdb.coalescing.flush_failed")
+                    self._requeue(counters, records)
+                    raise
+
+    def _requeue(self, counters: Counters, records: Records) -> None:
+        with self._lock:
+            for bucket, increments in counters.items():
+                target = self._counters[bucket]
+                for item, count in increments.items():
+                    if item not in target:
+                        self._pending += 1
+                    target[item] += count
+
+            for bucket, members in records.items():
+                target_records = self._records[bucket]
+                for item, values in members.items():
+                    target_members = target_records[item]
+                    size = len(target_members)
+                    target_members.update(values)
+                    self._pending += len(target_members) - size
+
+    def close(self) -> None:
+        """
+        Stops the background flush and writes out everything that is pending.
+        """
+        self._stopped.set()
+        self.flush()
+
+
+_writer: CoalescingWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> Any:
+    """
+    Returns the object that counters of saved events should be written
+    through: a process-wide `CoalescingWriter` wrapping `tsdb.backend` if
+    `SENTRY_TSDB_COALESCE_WRITES` is enabled, otherwise `tsdb.backend` itself.
+    """
+    from sentry import tsdb
+
+    if not settings.SENTRY_TSDB_COALESCE_WRITES:
+        return tsdb.backend
+
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = CoalescingWriter(tsdb.backend)
+            atexit.register(_writer.close)
+        _writer.flush_interval = settings.SENTRY_TSDB_COALESCE_FLUSH_INTERVAL
+        _writer.max_pending = settings.SENTRY_TSDB_COALESCE_MAX_PENDING
+    return _writer
@@ -2,6 +2,7 @@ import itertools
 import logging
 import random
 import uuid
+from array import array
 from collections import defaultdict, namedtuple
 from functools import reduce
 from hashlib import md5
@@ -168,21 +169,22 @@ class RedisTSDB(BaseTSDB):
         """
         model_key = self.get_model_key(key)
 
-        if isinstance(model_key, int):
-            vnode = model_key % self.vnodes
-        else:
-            vnode = crc32(force_bytes(model_key)) % self.vnodes
-
         return (
             "{prefix}{model}:{epoch}:{vnode}".format(
                 prefix=self.prefix,
                 model=model.value,
                 epoch=self.normalize_to_rollup(timestamp, rollup),
-                vnode=vnode,
+                vnode=self.get_vnode(model_key),
             ),
             self.add_environment_parameter(model_key, environment_id),
         )
 
+    def get_vnode(self, model_key):
+        if isinstance(model_key, int):
+            return model_key % self.vnodes
+        else:
+            return crc32(force_bytes(model_key)) % self.vnodes
+
     def get_model_key(self, key):
         # We specialize integers so that a pure int-map can be optimized by
         # Redis, whereas long strings (say tag values) will store in a more
@@ -288,30 +290,75 @@ class RedisTSDB(BaseTSDB):
             raise NotImplementedError
         environment_id = environment_ids[0] if environment_ids else None
 
+        epochs, counts = self.get_range_arrays(model, keys, start, end, rollup, environment_id)
+        timestamps = [to_timestamp(to_datetime(epoch)) for epoch in epochs]
+        return {key: list(zip(timestamps, values)) for key, values in counts.items()}
+
+    def get_range_arrays(
+        self, model, keys, start, end, rollup=None, environment_id=None, tenant_ids=None
+    ):
+        """
+        Counters of all keys that share a hash (same model, rollup bucket and
+        vnode) are read with a single ``HMGET`` and all commands are pipelined
+        per host, rather than issuing one ``HGET`` for every key and bucket.
+
+        >>> epochs, counts = get_range_arrays(TimeSeriesModel.group, [1, 2, 3],
+        >>>                                   start=now - timedelta(days=1),
+        >>>                                   end=now)
+        >>> sum(counts[1])
+        """
         self.validate_arguments([model], [environment_id])
 
-        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
-        series = [to_datetime(item) for item in series]
+        rollup, epochs = self.get_optimal_rollup_series(start, end, rollup)
+
+        # hash key -> [(key, bucket index)], in the same order as the fields
+        # passed to HMGET
+        requests = defaultdict(list)
+        fields = defaultdict(list)
+        for key in keys:
+            model_key = self.get_model_key(key)
+            vnode = self.get_vnode(model_key)
+            hash_field = self.add_environment_parameter(model_key, environment_id)
+            for index, epoch in enumerate(epochs):
+                hash_key = "{prefix}{model}:{epoch}:{vnode}".format(
+                    prefix=self.prefix,
+                    model=model.value,
+                    epoch=self.normalize_ts_to_rollup(epoch, rollup),
+                    vnode=vnode,
+                )
+                requests[hash_key].append((key, index))
+                fields[hash_key].append(hash_field)
 
-        results = []
         cluster, _ = self.get_cluster(environment_id)
         with cluster.map() as client:
-            for key in keys:
-                for timestamp in series:
-                    hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append(
-                        (to_timestamp(timestamp), key, client.hget(hash_key, hash_field))
-                    )
+            promises = {
+                hash_key: client.hmget(hash_key, hash_fields)
+                for hash_key, hash_fields in fields.items()
+            }
 
-        results_by_key = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+        counts = {key: array("q", bytes(8 * len(epochs))) for key in keys}
+        for hash_key, promise in promises.items():
+            for (key, index), value in zip(requests[hash_key], promise.value):
+                if value is not None:
+                    counts[key][index] = int(value)
 
-        for key, points in results_by_key.items():
-            results_by_key[key] = sorted(points.items())
-        return dict(results_by_key)
+        return epochs, counts
+
+    def get_sums(
+        self,
+        model,
+        keys,
+        start,
+        end,
+        rollup=None,
+        environment_id=None,
+        use_cache=False,
+        jitter_value=None,
+        tenant_ids=None,
+        referrer_suffix=None,
+    ):
+        _, counts = self.get_range_arrays(model, keys, start, end, rollup, environment_id)
+        return {key: sum(values) for key, values in counts.items()}
 
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
@@ -423,27 +470,35 @@ class RedisTSDB(BaseTSDB):
         """
         Fetch counts of distinct items for each rollup interval within the range.
         """
+        epochs, counts = self.get_distinct_counts_arrays(
+            model, keys, start, end, rollup, environment_id
+        )
+        return {key: list(zip(epochs, values)) for key, values in counts.items()}
+
+    def get_distinct_counts_arrays(
+        self, model, keys, start, end=None, rollup=None, environment_id=None, tenant_ids=None
+    ):
+        """
+        All ``PFCOUNT`` commands are pipelined per host, and the results are
+        decoded straight into arrays.
+        """
         self.validate_arguments([model], [environment_id])
 
-        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        rollup, epochs = self.get_optimal_rollup_series(start, end, rollup)
 
         responses = {}
         cluster, _ = self.get_cluster(environment_id)
         with cluster.fanout() as client:
             for key in keys:
                 c = client.target_key(key)
-                r = responses[key] = []
-                for timestamp in series:
-                    r.append(
-                        (
-                            timestamp,
-                            c.pfcount(self.make_key(model, rollup, timestamp, key, environment_id)),
-                        )
-                    )
-
-        return {
-            key: [(timestamp, promise.value) for timestamp, promise in value]
-            for key, value in responses.items()
+                responses[key] = [
+                    c.pfcount(self.make_key(model, rollup, epoch, key, environment_id))
+                    for epoch in epochs
+                ]
+
+        return epochs, {
+            key: array("q", [promise.value for promise in promises])
+            for key, promises in responses.items()
         }
 
     def get_distinct_counts_totals(
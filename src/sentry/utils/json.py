@@ -2,12 +2,25 @@
 
 from __future__ import annotations
 
+import codecs
 import datetime
 import decimal
+import re
 import uuid
 from contextlib import nullcontext
 from enum import Enum
-from typing import IO, TYPE_CHECKING, Any, Generator, Mapping, NoReturn, TypeVar, overload
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Generator,
+    Iterable,
+    Mapping,
+    MutableMapping,
+    NoReturn,
+    TypeVar,
+    overload,
+)
 
 import rapidjson
 import sentry_sdk
@@ -141,6 +154,121 @@ def loads(
             return _default_decoder.decode(value)
 
 
+class _ChunkedBuffer:
+    """
+    The text decoded so far from a stream of UTF-8 encoded chunks, from the
+    current position on.
+    """
+
+    _whitespace = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        """
+        Appends the next chunk to the buffer and drops everything before the
+        current position. Returns `False` once there are no more chunks.
+        """
+        if self.exhausted:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.exhausted = True
+            self.text = self.text[self.pos :] + self._decoder.decode(b"", final=True)
+            self.pos = 0
+            return False
+        self.text = self.text[self.pos :] + self._decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character, or an empty string at
+        the end of the stream.
+        """
+        while True:
+            match = self._whitespace.match(self.text, self.pos)
+            assert match is not None
+            self.pos = match.end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise JSONDecodeError(f"Expecting {char!r}, found {found!r}", self.text, self.pos)
+        self.pos += 1
+
+    def value(self) -> JSONData:
+        self.peek()
+        while True:
+            try:
+                value, end = _default_decoder.raw_decode(self.text, self.pos)
+            except JSONDecodeError:
+                # Most likely the value continues in the next chunk.
+                if not self.fill():
+                    raise
+                continue
+            # Numbers and literals at the very end of the buffer may have been
+            # cut off by the end of the chunk.
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iterload_array(
+    chunks: Iterable[bytes], key: str, body: MutableMapping[str, JSONData]
+) -> Generator[JSONData, None, None]:
+    """
+    Decodes a JSON object from a stream of UTF-8 encoded chunks, yielding the
+    items of the array at `key` one by one as soon as they are complete. All
+    other values of the object are stored in `body`, so they are only all
+    there once the generator is exhausted.
+
+    This keeps only a chunk and a single item of the array in memory, instead
+    of the whole document and the decoded array.
+    """
+    buffer = _ChunkedBuffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        buffer.pos += 1
+        return
+
+    while True:
+        name = buffer.value()
+        if not isinstance(name, str):
+            raise JSONDecodeError("Expecting property name", buffer.text, buffer.pos)
+        buffer.expect(":")
+
+        if name == key and buffer.peek() == "[":
+            buffer.pos += 1
+            if buffer.peek() == "]":
+                buffer.pos += 1
+            else:
+                while True:
+                    yield buffer.value()
+                    if buffer.peek() == "]":
+                        buffer.pos += 1
+                        break
+                    buffer.expect(",")
+        else:
+            body[name] = buffer.value()
+
+        if buffer.peek() == "}":
+            buffer.pos += 1
+            return
+        buffer.expect(",")
+
+
 def dumps_htmlsafe(value: object) -> SafeString:
     return mark_safe(_default_escaped_encoder.encode(value))
 
@@ -179,6 +307,7 @@ __all__ = (
     "dump",
     "dumps",
     "dumps_htmlsafe",
+    "iterload_array",
     "load",
     "loads",
     "prune_empty_keys",
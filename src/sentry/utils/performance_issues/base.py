@@ -6,7 +6,7 @@ import re
 from abc import ABC, abstractmethod
 from datetime import timedelta
 from enum import Enum
-from typing import Any, ClassVar, Dict, List, Optional, Union, cast
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union, cast
 from urllib.parse import parse_qs, urlparse
 
 from sentry import options
@@ -27,6 +27,7 @@ from sentry.issues.grouptype import (
 from sentry.models.organization import Organization
 from sentry.models.project import Project
 
+from .span_columns import SpanColumns
 from .types import PerformanceProblemsMap, Span
 
 
@@ -129,6 +130,31 @@ class PerformanceDetector(ABC):
     def visit_span(self, span: Span) -> None:
         raise NotImplementedError
 
+    def span_op_prefixes(self) -> Optional[Tuple[str, ...]]:
+        """
+        Detectors that ignore every span whose op does not start with one of
+        the returned prefixes (ignoring case) only get to visit the matching
+        spans. Detectors that need to see all spans, e.g. because other spans
+        break up a sequence, return `None`.
+        """
+        return None
+
+    def visit_spans(self, columns: SpanColumns) -> None:
+        """
+        Visits all relevant spans of the event in order. Detectors can
+        override this to skip spans based on the columns, as long as
+        `visit_span` would have ignored them.
+        """
+        prefixes = self.span_op_prefixes()
+        if prefixes is None:
+            for span in columns.spans:
+                self.visit_span(span)
+            return
+
+        spans = columns.spans
+        for index in columns.indexes_with_op_prefix(prefixes):
+            self.visit_span(spans[index])
+
     def on_complete(self) -> None:
         pass
 
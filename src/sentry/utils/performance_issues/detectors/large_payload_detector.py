@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 from datetime import timedelta
+from typing import Optional, Tuple
 
 from sentry import features
 from sentry.issues.grouptype import PerformanceLargeHTTPPayloadGroupType
@@ -37,6 +38,9 @@ class LargeHTTPPayloadDetector(PerformanceDetector):
         self.stored_problems: dict[str, PerformanceProblem] = {}
         self.consecutive_http_spans: list[Span] = []
 
+    def span_op_prefixes(self) -> Optional[Tuple[str, ...]]:
+        return ("http",)
+
     def visit_span(self, span: Span) -> None:
         if not LargeHTTPPayloadDetector._is_span_eligible(span):
             return
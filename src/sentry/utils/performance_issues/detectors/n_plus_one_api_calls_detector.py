@@ -4,7 +4,7 @@ import hashlib
 import os
 from collections import defaultdict
 from datetime import timedelta
-from typing import List, Mapping, Optional, Sequence
+from typing import List, Mapping, Optional, Sequence, Tuple
 from urllib.parse import parse_qs, urlparse
 
 from django.utils.encoding import force_bytes
@@ -54,6 +54,9 @@ class NPlusOneAPICallsDetector(PerformanceDetector):
         self.spans: list[Span] = []
         self.span_hashes = {}
 
+    def span_op_prefixes(self) -> Optional[Tuple[str, ...]]:
+        return tuple(self.settings.get("allowed_span_ops", []))
+
     def visit_span(self, span: Span) -> None:
         if not NPlusOneAPICallsDetector.is_span_eligible(span):
             return
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import hashlib
-from typing import Optional
+from collections import Counter
+from typing import List, Optional, Sequence
 
 from sentry.issues.grouptype import PerformanceNPlusOneGroupType
 from sentry.issues.issue_occurrence import IssueEvidence
@@ -18,6 +19,7 @@ from ..base import (
     total_span_time,
 )
 from ..performance_problem import PerformanceProblem
+from ..span_columns import SpanColumns
 from ..types import Span
 
 
@@ -113,6 +115,39 @@ class NPlusOneDBSpanDetector(PerformanceDetector):
                 self.source_span = None
                 self._maybe_use_as_source(span)
 
+    def visit_spans(self, columns: SpanColumns) -> None:
+        # Every span that isn't a DB span ends the N+1 being tracked, so DB
+        # spans form runs that are detected on independently. Runs are walked
+        # span by span only if they can hold a problem, see `_visit_db_run`.
+        # Spans without an id or op are ignored by `visit_span`.
+        spans, ops, span_ids = columns.spans, columns.ops, columns.span_ids
+        run: List[int] = []
+        for index, op in enumerate(ops):
+            if not op or not span_ids[index]:
+                continue
+            if self._is_db_op(op):
+                run.append(index)
+                continue
+            self._visit_db_run(columns, run)
+            run = []
+            self.visit_span(spans[index])
+        self._visit_db_run(columns, run)
+
+    def _visit_db_run(self, columns: SpanColumns, run: Sequence[int]) -> None:
+        # The repeating spans of a problem share their parent and hash, and
+        # follow the source span. Runs without `count` such spans can't hold
+        # one, and skipping them leaves the detection state as it was.
+        count = max(self.settings.get("count"), 1)
+        if len(run) <= count:
+            return
+        parent_ids, hashes = columns.parent_ids, columns.hashes
+        repeats = Counter((parent_ids[index], hashes[index]) for index in run)
+        if max(repeats.values()) < count:
+            return
+        spans = columns.spans
+        for index in run:
+            self.visit_span(spans[index])
+
     def on_complete(self) -> None:
         self._maybe_store_problem()
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import timedelta
-from typing import Any, Mapping, Optional
+from typing import Any, Mapping, Optional, Tuple
 
 from sentry import features
 from sentry.issues.grouptype import PerformanceRenderBlockingAssetSpanGroupType
@@ -62,6 +62,9 @@ class RenderBlockingAssetSpanDetector(PerformanceDetector):
     def is_creation_allowed_for_project(self, project: Project) -> bool:
         return self.settings["detection_enabled"]
 
+    def span_op_prefixes(self) -> Optional[Tuple[str, ...]]:
+        return ("resource.link", "resource.script")
+
     def visit_span(self, span: Span):
         if not self.fcp:
             return
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import hashlib
 from datetime import timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from sentry import features
 from sentry.issues.grouptype import PerformanceSlowDBQueryGroupType
@@ -19,6 +19,7 @@ from ..base import (
     get_span_evidence_value,
 )
 from ..performance_problem import PerformanceProblem
+from ..span_columns import SpanColumns
 from ..types import Span
 
 
@@ -35,6 +36,32 @@ class SlowDBQueryDetector(PerformanceDetector):
     def init(self):
         self.stored_problems = {}
 
+    def span_op_prefixes(self) -> Optional[Tuple[str, ...]]:
+        prefixes = []
+        for setting in self.settings:
+            allowed_span_ops = setting.get("allowed_span_ops", [])
+            if not allowed_span_ops:
+                return None
+            prefixes.extend(allowed_span_ops)
+        return tuple(prefixes)
+
+    def visit_spans(self, columns: SpanColumns) -> None:
+        # Most spans are nowhere near slow enough, so skip them based on the
+        # timestamp columns and leave the exact check to `visit_span`. The
+        # margin accounts for `get_span_duration` rounding to microseconds.
+        if not self.settings:
+            return
+        min_duration = min(setting.get("duration_threshold") for setting in self.settings) - 1
+
+        prefixes = self.span_op_prefixes()
+        indexes = (
+            range(len(columns)) if prefixes is None else columns.indexes_with_op_prefix(prefixes)
+        )
+        spans, starts, ends = columns.spans, columns.starts, columns.ends
+        for index in indexes:
+            if (ends[index] - starts[index]) * 1000 >= min_duration:
+                self.visit_span(spans[index])
+
     def visit_span(self, span: Span):
         settings_for_span = self.settings_for_span(span)
         if not settings_for_span:
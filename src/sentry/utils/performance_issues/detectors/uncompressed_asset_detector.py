@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from typing import Optional, Tuple
 
 from sentry import features
 from sentry.issues.grouptype import PerformanceUncompressedAssetsGroupType
@@ -37,6 +38,9 @@ class UncompressedAssetSpanDetector(PerformanceDetector):
         self.stored_problems = {}
         self.any_compression = False
 
+    def span_op_prefixes(self) -> Optional[Tuple[str, ...]]:
+        return tuple(self.settings.get("allowed_span_ops"))
+
     def visit_span(self, span: Span) -> None:
         op = span.get("op", None)
         description = span.get("description", "")
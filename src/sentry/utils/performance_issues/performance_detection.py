@@ -3,7 +3,7 @@ from __future__ import annotations
 import hashlib
 import logging
 import random
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
 import sentry_sdk
 
@@ -34,6 +34,7 @@ from .detectors.render_blocking_asset_span_detector import RenderBlockingAssetSp
 from .detectors.slow_db_query_detector import SlowDBQueryDetector
 from .detectors.uncompressed_asset_detector import UncompressedAssetSpanDetector
 from .performance_problem import PerformanceProblem
+from .span_columns import SpanColumns
 
 PERFORMANCE_GROUP_COUNT_LIMIT = 10
 INTEGRATIONS_OF_INTEREST = [
@@ -306,6 +307,23 @@ def get_detection_settings(project_id: Optional[int] = None) -> Dict[DetectorTyp
     }
 
 
+DETECTOR_CLASSES: Sequence[Type[PerformanceDetector]] = (
+    ConsecutiveDBSpanDetector,
+    ConsecutiveHTTPSpanDetector,
+    DBMainThreadDetector,
+    SlowDBQueryDetector,
+    RenderBlockingAssetSpanDetector,
+    NPlusOneDBSpanDetector,
+    NPlusOneDBSpanDetectorExtended,
+    FileIOMainThreadDetector,
+    NPlusOneAPICallsDetector,
+    MNPlusOneDBSpanDetector,
+    UncompressedAssetSpanDetector,
+    LargeHTTPPayloadDetector,
+    HTTPOverheadDetector,
+)
+
+
 def _detect_performance_problems(
     data: dict[str, Any], sdk_span: Any, project: Project
 ) -> List[PerformanceProblem]:
@@ -313,23 +331,16 @@ def _detect_performance_problems(
 
     detection_settings = get_detection_settings(project.id)
     detectors: List[PerformanceDetector] = [
-        ConsecutiveDBSpanDetector(detection_settings, data),
-        ConsecutiveHTTPSpanDetector(detection_settings, data),
-        DBMainThreadDetector(detection_settings, data),
-        SlowDBQueryDetector(detection_settings, data),
-        RenderBlockingAssetSpanDetector(detection_settings, data),
-        NPlusOneDBSpanDetector(detection_settings, data),
-        NPlusOneDBSpanDetectorExtended(detection_settings, data),
-        FileIOMainThreadDetector(detection_settings, data),
-        NPlusOneAPICallsDetector(detection_settings, data),
-        MNPlusOneDBSpanDetector(detection_settings, data),
-        UncompressedAssetSpanDetector(detection_settings, data),
-        LargeHTTPPayloadDetector(detection_settings, data),
-        HTTPOverheadDetector(detection_settings, data),
+        detector_class(detection_settings, data) for detector_class in DETECTOR_CLASSES
     ]
 
+    # Spans are parsed once and shared by all detectors.
+    with metrics.timer("performance.detect_performance_issue.parse_spans"):
+        columns = SpanColumns(data.get("spans", []))
+    metrics.timing("performance.detect_performance_issue.spans", len(columns))
+
     for detector in detectors:
-        run_detector_on_data(detector, data)
+        run_detector_on_data(detector, data, columns)
 
     # Metrics reporting only for detection, not created issues.
     report_metrics_for_detectors(data, event_id, detectors, sdk_span, project.organization)
@@ -370,13 +381,13 @@ def _detect_performance_problems(
     return list(unique_problems)
 
 
-def run_detector_on_data(detector, data):
+def run_detector_on_data(detector, data, columns: Optional[SpanColumns] = None):
     if not detector.is_event_eligible(data):
         return
 
-    spans = data.get("spans", [])
-    for span in spans:
-        detector.visit_span(span)
+    if columns is None:
+        columns = SpanColumns(data.get("spans", []))
+    detector.visit_spans(columns)
 
     detector.on_complete()
 
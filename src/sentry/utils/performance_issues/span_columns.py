@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .types import Span
+
+
+class SpanColumns:
+    """
+    A columnar view of the spans of an event, built in a single pass over the
+    span dicts so that detectors don't have to look up the same keys over and
+    over again.
+
+    Every column has one entry per span, in the order of the spans in the
+    event:
+
+    - `ops`: the span op, or `""`.
+    - `span_ids` / `parent_ids`: `span_id` and `parent_span_id`, or `None`.
+    - `hashes`: the description hash computed during normalization, or `None`.
+    - `starts` / `ends`: `start_timestamp` and `timestamp` in seconds.
+    """
+
+    __slots__ = (
+        "spans",
+        "ops",
+        "span_ids",
+        "parent_ids",
+        "hashes",
+        "starts",
+        "ends",
+        "_op_indexes",
+    )
+
+    def __init__(self, spans: Sequence[Span]) -> None:
+        self.spans = spans
+        self.ops: List[str] = []
+        self.span_ids: List[Optional[str]] = []
+        self.parent_ids: List[Optional[str]] = []
+        self.hashes: List[Optional[str]] = []
+        self.starts = array("d")
+        self.ends = array("d")
+        self._op_indexes: Dict[Tuple[str, ...], List[int]] = {}
+
+        for span in spans:
+            self.ops.append(span.get("op") or "")
+            self.span_ids.append(span.get("span_id"))
+            self.parent_ids.append(span.get("parent_span_id"))
+            self.hashes.append(span.get("hash"))
+            self.starts.append(span.get("start_timestamp") or 0)
+            self.ends.append(span.get("timestamp") or 0)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def indexes_with_op_prefix(self, prefixes: Tuple[str, ...]) -> List[int]:
+        """
+        Returns the indexes of all spans whose op starts with one of
+        `prefixes`, ignoring case. Results are cached, since several detectors
+        are interested in the same kind of spans.
+        """
+        indexes = self._op_indexes.get(prefixes)
+        if indexes is None:
+            lowered = tuple(prefix.lower() for prefix in prefixes)
+            indexes = [index for index, op in enumerate(self.ops) if op.lower().startswith(lowered)]
+            self._op_indexes[prefixes] = indexes
+        return indexes
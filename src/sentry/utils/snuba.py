@@ -15,6 +15,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Mapping,
     MutableMapping,
@@ -405,6 +406,14 @@ _snuba_pool = connection_from_url(
     maxsize=10,
 )
 _query_thread_pool = ThreadPoolExecutor(max_workers=10)
+# Refreshes stale results of the query cache in the background.
+_query_cache_refresh_pool = ThreadPoolExecutor(max_workers=4)
+
+# How often callers waiting for another caller's query check for its result.
+QUERY_CACHE_POLL_INTERVAL = 0.05
+
+# How much of a streamed response is read at once.
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 epoch_naive = datetime(1970, 1, 1, tzinfo=None)
@@ -828,6 +837,158 @@ def bulk_snql_query(
     return _apply_cache_and_build_results(params, referrer=referrer, use_cache=use_cache)
 
 
+class SnubaResultStream:
+    """
+    The result of a query run with `stream_raw_query` or
+    `stream_raw_snql_query`.
+
+    Iterating over it yields the rows of the result as they are decoded from
+    the response, translated with the reverse translator of the query, so only
+    a single row needs to be held in memory at a time. The rest of the result
+    (`meta`, `totals`, ...) is in `body` once all rows have been consumed.
+
+    A stream can only be iterated over once. Streams that are not consumed
+    until the end must be closed, which the context manager takes care of.
+    """
+
+    def __init__(
+        self,
+        response: urllib3.response.HTTPResponse,
+        reverse: Translator,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> None:
+        self.body: MutableMapping[str, Any] = {}
+        self._response = response
+        self._reverse = reverse
+        self._chunk_size = chunk_size
+        self._consumed = False
+
+    def __iter__(self) -> Iterator[Any]:
+        chunks = self._response.stream(self._chunk_size)
+        try:
+            for row in json.iterload_array(chunks, "data", self.body):
+                yield self._reverse(row)
+        except urllib3.exceptions.HTTPError as err:
+            raise SnubaError(err)
+        except ValueError:
+            raise UnexpectedResponseError("Could not decode streamed JSON response")
+        else:
+            self._consumed = True
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if not self._consumed:
+            # Don't hand a connection with unread data back to the pool.
+            self._response.close()
+        self._response.release_conn()
+
+    def __enter__(self) -> SnubaResultStream:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def stream_raw_query(
+    dataset=None,
+    start=None,
+    end=None,
+    groupby=None,
+    conditions=None,
+    filter_keys=None,
+    aggregations=None,
+    rollup=None,
+    referrer=None,
+    is_grouprelease=False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    **kwargs,
+) -> SnubaResultStream:
+    """
+    Like `raw_query`, but streams the rows of the result instead of decoding
+    the whole response at once, see `SnubaResultStream`. Results are never
+    cached.
+    """
+    if referrer:
+        kwargs["tenant_ids"] = kwargs.get("tenant_ids") or dict()
+        kwargs["tenant_ids"]["referrer"] = referrer
+
+    snuba_params = SnubaQueryParams(
+        dataset=dataset,
+        start=start,
+        end=end,
+        groupby=groupby,
+        conditions=conditions,
+        filter_keys=filter_keys,
+        aggregations=aggregations,
+        rollup=rollup,
+        is_grouprelease=is_grouprelease,
+        **kwargs,
+    )
+    return _stream_snuba_query(
+        _prepare_query_params(snuba_params, referrer), referrer=referrer, chunk_size=chunk_size
+    )
+
+
+def stream_raw_snql_query(
+    request: Request, referrer: Optional[str] = None, chunk_size: int = STREAM_CHUNK_SIZE
+) -> SnubaResultStream:
+    """
+    Like `raw_snql_query`, but streams the rows of the result instead of
+    decoding the whole response at once, see `SnubaResultStream`.
+    """
+    metrics.incr("snql.sdk.api", tags={"referrer": referrer or "unknown"})
+    if "consistent" in OVERRIDE_OPTIONS:
+        request.flags.consistent = OVERRIDE_OPTIONS["consistent"]
+
+    if referrer:
+        request.tenant_ids = request.tenant_ids or dict()
+        request.tenant_ids["referrer"] = referrer
+
+    return _stream_snuba_query(
+        (request, lambda x: x, lambda x: x), referrer=referrer, chunk_size=chunk_size
+    )
+
+
+def _stream_snuba_query(
+    query_params: SnubaQueryBody,
+    referrer: Optional[str] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> SnubaResultStream:
+    headers = {}
+    validate_referrer(referrer)
+    if referrer:
+        headers["referer"] = referrer
+
+    query, _, reverse = query_params
+    if isinstance(query, Request):
+        request = query
+    else:
+        request = json_to_snql(query, query["dataset"])
+
+    with sentry_sdk.configure_scope() as scope:
+        if scope.transaction:
+            request.parent_api = scope.transaction.name
+
+    with sentry_sdk.start_span(op="snuba_query", description=referrer or "<unknown>") as span:
+        span.set_tag("snuba.stream", True)
+        span.set_tag("query.referrer", referrer or "<unknown>")
+        try:
+            response = _raw_snql_query(request, Hub(Hub.current), headers, preload_content=False)
+        except urllib3.exceptions.HTTPError as err:
+            raise SnubaError(err)
+
+    if response.status != 200:
+        try:
+            # Raises the matching exception for the error in the body.
+            _decode_response(response, headers)
+        finally:
+            response.release_conn()
+        raise SnubaError(f"HTTP {response.status}")
+
+    return SnubaResultStream(response, reverse, chunk_size)
+
+
 def get_cache_key(query: SnubaQuery) -> str:
     if isinstance(query, Request):
         hashable = str(query)
@@ -856,38 +1017,191 @@ def _apply_cache_and_build_results(
     validate_referrer(referrer)
     if referrer:
         headers["referer"] = referrer
-    # Store the original position of the query so that we can maintain the order
-    query_param_list = list(enumerate(snuba_param_list))
-
-    results = []
 
     if use_cache:
-        cache_keys = [get_cache_key(query_params[0]) for _, query_params in query_param_list]
-        cache_data = cache.get_many(cache_keys)
-        to_query: List[Tuple[int, SnubaQueryBody, Optional[str]]] = []
-        for (query_pos, query_params), cache_key in zip(query_param_list, cache_keys):
-            cached_result = cache_data.get(cache_key)
-            metric_tags = {"referrer": referrer} if referrer else None
-            if cached_result is None:
-                metrics.incr("snuba.query_cache.miss", tags=metric_tags)
-                to_query.append((query_pos, query_params, cache_key))
-            else:
-                metrics.incr("snuba.query_cache.hit", tags=metric_tags)
-                results.append((query_pos, json.loads(cached_result)))
+        return _cached_bulk_snuba_query(snuba_param_list, headers, referrer)
+
+    if not snuba_param_list:
+        return []
+    return _bulk_snuba_query(snuba_param_list, headers)
+
+
+def _get_query_cache_ttls(referrer: Optional[str]) -> Tuple[int, int]:
+    """
+    Returns for how long results of queries with `referrer` are fresh, and
+    for how much longer they may be served while being refreshed.
+    """
+    ttl = settings.SENTRY_SNUBA_CACHE_REFERRER_TTL_SECONDS.get(
+        referrer, settings.SENTRY_SNUBA_CACHE_TTL_SECONDS
+    )
+    return ttl, settings.SENTRY_SNUBA_CACHE_STALE_TTL_SECONDS.get(referrer, 0)
+
+
+def _lock_cached_query(cache_key: str) -> bool:
+    # The lock expires once the query would have timed out anyway.
+    return bool(cache.add(f"{cache_key}:lock", 1, settings.SENTRY_SNUBA_TIMEOUT))
+
+
+def _query_and_cache(
+    queries: Sequence[Tuple[str, SnubaQueryBody]],
+    headers: Mapping[str, str],
+    ttl: int,
+    stale_ttl: int,
+) -> MutableMapping[str, Any]:
+    query_results = _bulk_snuba_query([query_params for _, query_params in queries], headers)
+    results = {cache_key: result for (cache_key, _), result in zip(queries, query_results)}
+
+    cache.set_many(
+        {cache_key: json.dumps(result) for cache_key, result in results.items()}, ttl + stale_ttl
+    )
+    if stale_ttl:
+        cache.set_many({f"{cache_key}:fresh": 1 for cache_key in results}, ttl)
+    return results
+
+
+def _refresh_cached_queries(
+    queries: Sequence[Tuple[str, SnubaQueryBody]],
+    headers: Mapping[str, str],
+    ttl: int,
+    stale_ttl: int,
+) -> None:
+    try:
+        _query_and_cache(queries, headers, ttl, stale_ttl)
+    except Exception:
+        logger.warning("snuba.query_cache.refresh-failed", exc_info=True)
+    finally:
+        cache.delete_many([f"{cache_key}:lock" for cache_key, _ in queries])
+
+
+def _wait_for_cached_queries(cache_keys: Sequence[str], timeout: float) -> MutableMapping[str, Any]:
+    """
+    Waits for up to `timeout` seconds for other callers to cache the results
+    of the queries. Stops waiting for a query once its lock is gone, which
+    means that the query failed.
+    """
+    results = {}
+    deadline = time.monotonic() + timeout
+    pending = list(cache_keys)
+    while pending and time.monotonic() < deadline:
+        time.sleep(QUERY_CACHE_POLL_INTERVAL)
+        cache_data = cache.get_many(pending + [f"{cache_key}:lock" for cache_key in pending])
+        locked = []
+        for cache_key in pending:
+            if cache_key in cache_data:
+                results[cache_key] = json.loads(cache_data[cache_key])
+            elif f"{cache_key}:lock" in cache_data:
+                locked.append(cache_key)
+        pending = locked
+    return results
+
+
+def _cached_bulk_snuba_query(
+    snuba_param_list: Sequence[SnubaQueryBody],
+    headers: Mapping[str, str],
+    referrer: Optional[str] = None,
+) -> ResultSet:
+    """
+    Runs the queries like `_bulk_snuba_query`, caching results by
+    `get_cache_key` of the query.
+
+    Identical queries that miss the cache at the same time are coalesced: only
+    the caller that locks the cache key runs the query, everyone else waits
+    for up to `SENTRY_SNUBA_CACHE_COALESCE_TIMEOUT_SECONDS` for its result
+    before running the query themselves.
+
+    Results of referrers listed in `SENTRY_SNUBA_CACHE_STALE_TTL_SECONDS` are
+    still served for that long after they expired, while a single caller
+    refreshes them in the background.
+    """
+    ttl, stale_ttl = _get_query_cache_ttls(referrer)
+    coalesce_timeout = settings.SENTRY_SNUBA_CACHE_COALESCE_TIMEOUT_SECONDS
+    metric_tags = {"referrer": referrer} if referrer else None
+
+    cache_keys = [get_cache_key(query_params[0]) for query_params in snuba_param_list]
+    # Identical queries within a batch are only run once.
+    queries: MutableMapping[str, SnubaQueryBody] = {}
+    for cache_key, query_params in zip(cache_keys, snuba_param_list):
+        queries.setdefault(cache_key, query_params)
+
+    lookup_keys = list(queries)
+    if stale_ttl:
+        lookup_keys += [f"{cache_key}:fresh" for cache_key in queries]
+    cache_data = cache.get_many(lookup_keys)
+
+    results: MutableMapping[str, Any] = {}
+    missed = []
+    stale = []
+    for cache_key in queries:
+        cached_result = cache_data.get(cache_key)
+        if cached_result is None:
+            metrics.incr("snuba.query_cache.miss", tags=metric_tags)
+            missed.append(cache_key)
+            continue
+
+        results[cache_key] = json.loads(cached_result)
+        if stale_ttl and f"{cache_key}:fresh" not in cache_data:
+            metrics.incr("snuba.query_cache.stale", tags=metric_tags)
+            stale.append(cache_key)
+        else:
+            metrics.incr("snuba.query_cache.hit", tags=metric_tags)
+
+    to_refresh = [
+        (cache_key, queries[cache_key]) for cache_key in stale if _lock_cached_query(cache_key)
+    ]
+    if to_refresh:
+        metrics.incr("snuba.query_cache.refresh", amount=len(to_refresh), tags=metric_tags)
+        _query_cache_refresh_pool.submit(
+            _refresh_cached_queries, to_refresh, headers, ttl, stale_ttl
+        )
+
+    if coalesce_timeout > 0:
+        to_query = [cache_key for cache_key in missed if _lock_cached_query(cache_key)]
+        waiting = [cache_key for cache_key in missed if cache_key not in to_query]
     else:
-        to_query = [(query_pos, query_params, None) for query_pos, query_params in query_param_list]
+        to_query, waiting = missed, []
 
     if to_query:
-        query_results = _bulk_snuba_query([item[1] for item in to_query], headers)
-        for result, (query_pos, _, cache_key) in zip(query_results, to_query):
-            if cache_key:
-                cache.set(cache_key, json.dumps(result), settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
-            results.append((query_pos, result))
+        try:
+            results.update(
+                _query_and_cache(
+                    [(cache_key, queries[cache_key]) for cache_key in to_query],
+                    headers,
+                    ttl,
+                    stale_ttl,
+                )
+            )
+        finally:
+            if coalesce_timeout > 0:
+                cache.delete_many([f"{cache_key}:lock" for cache_key in to_query])
+
+    if waiting:
+        coalesced = _wait_for_cached_queries(waiting, coalesce_timeout)
+        metrics.incr("snuba.query_cache.coalesced", amount=len(coalesced), tags=metric_tags)
+        results.update(coalesced)
+
+        remaining = [cache_key for cache_key in waiting if cache_key not in coalesced]
+        if remaining:
+            metrics.incr(
+                "snuba.query_cache.coalesce_timeout", amount=len(remaining), tags=metric_tags
+            )
+            results.update(
+                _query_and_cache(
+                    [(cache_key, queries[cache_key]) for cache_key in remaining],
+                    headers,
+                    ttl,
+                    stale_ttl,
+                )
+            )
 
-    # Sort so that we get the results back in the original param list order
-    results.sort()
-    # Drop the sort order val
-    return [result[1] for result in results]
+    # Repeated queries get their own copy of the result, as if they had been
+    # run separately.
+    seen = set()
+    result_list = []
+    for cache_key in cache_keys:
+        result = results[cache_key]
+        result_list.append(deepcopy(result) if cache_key in seen else result)
+        seen.add(cache_key)
+    return result_list
 
 
 def _bulk_snuba_query(
@@ -933,42 +1247,7 @@ def _bulk_snuba_query(
 
     results = []
     for response, _, reverse in query_results:
-        try:
-            body = json.loads(response.data)
-            if SNUBA_INFO:
-                if "sql" in body:
-                    print(  # NOQA: only prints when an env variable is set
-                        "{}.sql:\n {}".format(
-                            headers.get("referer", "<unknown>"),
-                            sqlparse.format(body["sql"], reindent_aligned=True),
-                        )
-                    )
-                if "error" in body:
-                    print(  # NOQA: only prints when an env variable is set
-                        "{}.err: {}".format(headers.get("referer", "<unknown>"), body["error"])
-                    )
-        except ValueError:
-            if response.status != 200:
-                logger.exception("snuba.query.invalid-json", extra={"response.data": response.data})
-                raise SnubaError("Failed to parse snuba error response")
-            raise UnexpectedResponseError(f"Could not decode JSON response: {response.data!r}")
-
-        if response.status != 200:
-            if body.get("error"):
-                error = body["error"]
-                if response.status == 429:
-                    raise RateLimitExceeded(error["message"])
-                elif error["type"] == "schema":
-                    raise SchemaValidationError(error["message"])
-                elif error["type"] == "clickhouse":
-                    raise clickhouse_error_codes_map.get(error["code"], QueryExecutionError)(
-                        error["message"]
-                    )
-                else:
-                    raise SnubaError(error["message"])
-            else:
-                raise SnubaError(f"HTTP {response.status}")
-
+        body = _decode_response(response, headers)
         # Forward and reverse translation maps from model ids to snuba keys, per column
         body["data"] = [reverse(d) for d in body["data"]]
         results.append(body)
@@ -976,6 +1255,52 @@ def _bulk_snuba_query(
     return results
 
 
+def _decode_response(
+    response: urllib3.response.HTTPResponse, headers: Mapping[str, str]
+) -> MutableMapping[str, Any]:
+    """
+    Decodes the body of a Snuba response, raising the matching exception if
+    the query failed.
+    """
+    try:
+        body = json.loads(response.data)
+        if SNUBA_INFO:
+            if "sql" in body:
+                print(  # NOQA: only prints when an env variable is set
+                    "{}.sql:\n {}".format(
+                        headers.get("referer", "<unknown>"),
+                        sqlparse.format(body["sql"], reindent_aligned=True),
+                    )
+                )
+            if "error" in body:
+                print(  # NOQA: only prints when an env variable is set
+                    "{}.err: {}".format(headers.get("referer", "<unknown>"), body["error"])
+                )
+    except ValueError:
+        if response.status != 200:
+            logger.exception("snuba.query.invalid-json", extra={"response.data": response.data})
+            raise SnubaError("Failed to parse snuba error response")
+        raise UnexpectedResponseError(f"Could not decode JSON response: {response.data!r}")
+
+    if response.status != 200:
+        if body.get("error"):
+            error = body["error"]
+            if response.status == 429:
+                raise RateLimitExceeded(error["message"])
+            elif error["type"] == "schema":
+                raise SchemaValidationError(error["message"])
+            elif error["type"] == "clickhouse":
+                raise clickhouse_error_codes_map.get(error["code"], QueryExecutionError)(
+                    error["message"]
+                )
+            else:
+                raise SnubaError(error["message"])
+        else:
+            raise SnubaError(f"HTTP {response.status}")
+
+    return body
+
+
 RawResult = Tuple[urllib3.response.HTTPResponse, Callable[[Any], Any], Callable[[Any], Any]]
 
 
@@ -1013,7 +1338,7 @@ def _legacy_snql_query(params: Tuple[SnubaQuery, Hub, Mapping[str, str], str]) -
 
 
 def _raw_snql_query(
-    request: Request, thread_hub: Hub, headers: Mapping[str, str]
+    request: Request, thread_hub: Hub, headers: Mapping[str, str], preload_content: bool = True
 ) -> urllib3.response.HTTPResponse:
     # Enter hub such that http spans are properly nested
     with thread_hub, timer("snql_query"):
@@ -1033,7 +1358,11 @@ def _raw_snql_query(
         with thread_hub.start_span(op="snuba_snql.run", description=str(request)) as span:
             span.set_tag("snuba.referrer", referrer)
             return _snuba_pool.urlopen(
-                "POST", f"/{request.dataset}/snql", body=body, headers=headers
+                "POST",
+                f"/{request.dataset}/snql",
+                body=body,
+                headers=headers,
+                preload_content=preload_content,
             )
 
 
@@ -0,0 +1,28 @@
+from django.utils import timezone
+
+from sentry.buffer.bulk import bulk_update
+from sentry.models.group import Group
+from sentry.testutils.pytest.fixtures import django_db_all
+
+
+@django_db_all
+def test_bulk_update_sets_null(default_project):
+    resolved_at = timezone.now()
+    groups = [
+        Group.objects.create(project=default_project, times_seen=1, resolved_at=resolved_at)
+        for _ in range(2)
+    ]
+
+    updated = bulk_update(
+        Group,
+        {
+            groups[0].id: ({"times_seen": 1}, {"resolved_at": None}),
+            groups[1].id: ({"times_seen": 1}, {}),
+        },
+    )
+
+    assert updated == {group.id for group in groups}
+    group = Group.objects.get(id=groups[0].id)
+    assert (group.times_seen, group.resolved_at) == (2, None)
+    group = Group.objects.get(id=groups[1].id)
+    assert (group.times_seen, group.resolved_at) == (2, resolved_at)
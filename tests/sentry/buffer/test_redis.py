@@ -10,6 +10,7 @@ from sentry.buffer.redis import RedisBuffer
 from sentry.models.group import Group
 from sentry.models.project import Project
 from sentry.testutils.helpers.datetime import freeze_time
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.utils import json
 
@@ -26,6 +27,15 @@ class TestRedisBuffer:
     def setup_buffer(self, buffer):
         self.buf = buffer
 
+    @pytest.fixture(autouse=True)
+    def bulk_flush_options(self):
+        # Most of these tests run without database access, so the bulk flush
+        # options can't be looked up in the options store.
+        with override_options(
+            {"buffer.bulk-flush.enabled": False, "buffer.bulk-flush.batch-size": 500}
+        ):
+            yield
+
     def test_coerce_val_handles_foreignkeys(self):
         assert self.buf._coerce_val(Project(id=1)) == b"1"
 
@@ -120,6 +130,63 @@ class TestRedisBuffer:
         group = Group.objects.get_from_cache(id=default_group.id)
         assert group.times_seen == orig_times_seen + times_seen_incr
 
+    @mock.patch("sentry.buffer.redis.process_incr")
+    def test_process_pending_bulk_flush_batch_size(self, process_incr):
+        client = self.buf.get_routing_client()
+        client.zadd("b:p", {"foo": 1, "bar": 2, "baz": 3})
+        with override_options(
+            {"buffer.bulk-flush.enabled": True, "buffer.bulk-flush.batch-size": 3}
+        ):
+            self.buf.process_pending()
+        assert len(process_incr.apply_async.mock_calls) == 1
+        process_incr.apply_async.assert_any_call(kwargs={"batch_keys": ["foo", "bar", "baz"]})
+
+    @django_db_all
+    @freeze_time()
+    def test_bulk_flush_updates_groups(self, default_project):
+        groups = [Group.objects.create(project=default_project, times_seen=1) for _ in range(3)]
+        last_seen = timezone.now()
+        for group in groups:
+            self.buf.incr(Group, {"times_seen": 2}, {"id": group.id}, {"last_seen": last_seen})
+            self.buf.incr(Group, {"times_seen": 3}, {"id": group.id}, {"last_seen": last_seen})
+        # Same row buffered under a different filter key gets merged in memory
+        self.buf.incr(Group, {"times_seen": 1}, {"pk": groups[0].id})
+
+        keys = [self.buf._make_key(Group, {"id": group.id}) for group in groups]
+        keys.append(self.buf._make_key(Group, {"pk": groups[0].id}))
+
+        with override_options({"buffer.bulk-flush.enabled": True}), mock.patch(
+            "sentry.buffer.redis.buffer_incr_complete"
+        ) as buffer_incr_complete:
+            self.buf.process(batch_keys=keys)
+
+        assert len(buffer_incr_complete.send_robust.mock_calls) == 3
+        assert [Group.objects.get(id=group.id).times_seen for group in groups] == [7, 6, 6]
+        for group in groups:
+            group = Group.objects.get_from_cache(id=group.id)
+            assert group.last_seen == last_seen
+        # Everything was consumed from redis
+        client = self.buf.get_routing_client()
+        assert client.zrange("b:p", 0, -1) == []
+        assert all(not client.hgetall(key) for key in keys)
+
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_bulk_flush_falls_back_to_process(self, process):
+        client = self.buf.get_routing_client()
+        client.hmset(
+            "foo",
+            {
+                "f": '{"pk": ["i","1"]}',
+                "i+times_seen": "1",
+                "m": "unittest.mock.Mock",
+                "s": "1",
+            },
+        )
+        with override_options({"buffer.bulk-flush.enabled": True}):
+            self.buf.process(batch_keys=["foo"])
+        process.assert_called_once_with(mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, True)
+
     def test_get(self):
         model = mock.Mock()
         model.__name__ = "Mock"
@@ -151,3 +151,64 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_digest_many(self):
+        backend = RedisBackend()
+
+        records = {
+            key: Record(f"record:{key}", "value", time.time())
+            for key in ("timeline:1", "timeline:2", "timeline:3")
+        }
+        for key, record in records.items():
+            backend.add(key, record)
+
+        with backend.digest("timeline:3", 3600):
+            pass
+
+        with backend.digest_many(
+            ["timeline:1", "timeline:2", "timeline:3"], minimum_delays={"timeline:1": 0}
+        ) as timelines:
+            # The third timeline has been digested already and is waiting.
+            assert timelines == {
+                "timeline:1": [records["timeline:1"]],
+                "timeline:2": [records["timeline:2"]],
+            }
+            del timelines["timeline:2"]
+
+        # The first timeline was closed and is scheduled again, ...
+        assert {entry.key for entry in backend.schedule(time.time())} == {"timeline:1"}
+        with backend.digest("timeline:1", 0) as digested:
+            assert digested == []
+
+        # ...while the second one is still ready and unlocked.
+        with backend.digest("timeline:2", 0) as digested:
+            assert digested == [records["timeline:2"]]
+
+    def test_digest_many_failure(self):
+        backend = RedisBackend()
+
+        record = Record("record:1", "value", time.time())
+        backend.add("timeline", record)
+
+        with pytest.raises(Exception):
+            with backend.digest_many(["timeline"]):
+                raise Exception("This causes the digests to not be closed.")
+
+        with backend.digest("timeline", 0) as digested:
+            assert digested == [record]
+
+    def test_digest_many_lock_expired(self):
+        backend = RedisBackend()
+
+        record = Record("record:1", "value", time.time())
+        backend.add("timeline", record)
+
+        with backend.digest_many(["timeline"]) as timelines:
+            assert timelines == {"timeline": [record]}
+            # The lock expires while the digest is being delivered.
+            lock_key = f"{backend.locks.backend.prefix}{backend.namespace}:t:timeline"
+            backend._get_connection("timeline").delete(lock_key)
+
+        # The digest wasn't closed, and is delivered again.
+        with backend.digest("timeline", 0) as digested:
+            assert digested == [record]
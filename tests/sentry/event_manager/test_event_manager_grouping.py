@@ -4,7 +4,15 @@ from time import time
 from unittest import mock
 
 from sentry import tsdb
-from sentry.event_manager import EventManager
+from sentry.event_manager import (
+    EventManager,
+    _calculate_grouping_many,
+    _get_grouphashes,
+    _get_grouphashes_many,
+    _pull_out_data,
+)
+from sentry.eventstore.models import Event
+from sentry.grouping.result import CalculatedHashes
 from sentry.models.group import Group
 from sentry.models.grouphash import GroupHash
 from sentry.testutils.cases import TestCase
@@ -16,6 +24,27 @@ from sentry.tsdb.base import TSDBModel
 pytestmark = [requires_snuba]
 
 
+def make_exception_event(**kwargs):
+    return make_event(
+        platform="python",
+        exception={
+            "values": [
+                {
+                    "type": "ValueError",
+                    "value": "boom",
+                    "stacktrace": {
+                        "frames": [
+                            {"function": "main", "module": "app.main", "in_app": True},
+                            {"function": "crash", "module": "app.views", "in_app": True},
+                        ]
+                    },
+                }
+            ]
+        },
+        **kwargs,
+    )
+
+
 def make_event(**kwargs):
     result = {
         "event_id": uuid.uuid1().hex,
@@ -343,3 +372,76 @@ class EventManagerGroupingTest(TestCase):
             )[event1.group.id]
             == 1
         )
+
+    def test_get_grouphashes(self):
+        group = self.create_group(project=self.project)
+        a = GroupHash.objects.create(project=self.project, hash="a" * 32, group=group)
+        c = GroupHash.objects.create(project=self.project, hash="c" * 32)
+        GroupHash.objects.create(project=self.create_project(), hash="b" * 32)
+
+        hashes = CalculatedHashes(
+            hashes=["a" * 32, "b" * 32], hierarchical_hashes=["c" * 32, "d" * 32], tree_labels=[]
+        )
+        with self.assertNumQueries(1):
+            assert _get_grouphashes(self.project, hashes) == {"a" * 32: a, "c" * 32: c}
+
+    def _get_jobs(self, events):
+        jobs = []
+        for data in events:
+            manager = EventManager(data)
+            manager.normalize()
+            jobs.append(
+                {
+                    "data": manager.get_data(),
+                    "project_id": self.project.id,
+                    "raw": False,
+                    "start_time": time(),
+                }
+            )
+        _pull_out_data(jobs, {self.project.id: self.project})
+        return jobs
+
+    def test_calculate_grouping_many(self):
+        jobs = self._get_jobs(
+            [
+                make_exception_event(timestamp=time() - 10),
+                make_exception_event(timestamp=time() - 5),
+                make_exception_event(fingerprint=["{{ default }}", "custom"]),
+            ]
+        )
+
+        with mock.patch.object(
+            Event, "get_hashes", autospec=True, side_effect=Event.get_hashes
+        ) as get_hashes, mock.patch(
+            "sentry.event_manager._get_grouphashes_many", wraps=_get_grouphashes_many
+        ) as get_grouphashes_many:
+            _calculate_grouping_many(self.project, jobs, {})
+
+        # The second event repeats the first one and reuses its hashes.
+        assert get_hashes.call_count == 2
+        assert jobs[0]["hashes"] == jobs[1]["hashes"]
+        assert jobs[0]["hashes"] != jobs[2]["hashes"]
+        for job in jobs:
+            assert job["event"].data["hashes"] == job["hashes"].hashes
+            assert job["migrate_off_hierarchical"] is False
+        get_grouphashes_many.assert_called_once_with(self.project, [job["hashes"] for job in jobs])
+
+    def test_get_grouphashes_many(self):
+        a = GroupHash.objects.create(project=self.project, hash="a" * 32)
+        b = GroupHash.objects.create(project=self.project, hash="b" * 32)
+
+        hashes_many = [
+            CalculatedHashes(hashes=["a" * 32], hierarchical_hashes=[], tree_labels=[]),
+            CalculatedHashes(hashes=["b" * 32, "c" * 32], hierarchical_hashes=[], tree_labels=[]),
+        ]
+        with self.assertNumQueries(1):
+            assert _get_grouphashes_many(self.project, hashes_many) == {"a" * 32: a, "b" * 32: b}
+
+    def test_repeated_events_share_group(self):
+        events = [
+            EventManager(make_exception_event(timestamp=time() - offset)).save(self.project.id)
+            for offset in (10, 5)
+        ]
+
+        assert events[0].group_id == events[1].group_id
+        assert events[0].get_hashes() == events[1].get_hashes()
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import copy
 from typing import Any
+from unittest import mock
 
 import pytest
+from django.test import override_settings
 
 from sentry.grouping.component import GroupingComponent
-from sentry.grouping.enhancer import Enhancements
+from sentry.grouping.enhancer import ENHANCEMENT_BASES, Enhancements
+from sentry.grouping.enhancer.cache import LRUCache, StacktraceCache
 from sentry.grouping.enhancer.exceptions import InvalidEnhancerConfig
 from sentry.grouping.enhancer.matchers import create_match_frame
+from sentry.grouping.enhancer.program import EnhancementsProgram
+from sentry.stacktraces.processing import find_stacktraces_in_data
+from tests.sentry.grouping import with_grouping_input
 
 
 def dump_obj(obj):
@@ -448,3 +455,183 @@ def test_app_no_matches(frame):
     enhancements = Enhancements.from_config_string("app:no +app")
     enhancements.apply_modifications_to_frame([frame], "native", None)
     assert frame.get("in_app")
+
+
+def _apply_rules(rules, frames, platform, exception_data):
+    match_frames = [create_match_frame(frame, platform) for frame in frames]
+    matched = []
+    for rule in rules:
+        for idx, action in rule.get_matching_frame_actions(
+            match_frames, platform, exception_data, {}
+        ):
+            matched.append((rule, idx, action))
+            action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
+    return matched
+
+
+def _apply_program(program, frames, platform, exception_data):
+    match_frames = [create_match_frame(frame, platform) for frame in frames]
+    matched = []
+    for rule, actions in program.iter_matching_frame_actions(
+        match_frames, platform, exception_data, {}
+    ):
+        for idx, action in actions:
+            matched.append((rule, idx, action))
+            action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
+    return matched
+
+
+@pytest.mark.parametrize("base", sorted(ENHANCEMENT_BASES))
+@with_grouping_input("grouping_input")
+def test_program_matches_rules(base, grouping_input):
+    enhancements = ENHANCEMENT_BASES[base]
+    platform = grouping_input.data.get("platform") or "python"
+
+    for info in find_stacktraces_in_data(grouping_input.data):
+        for rules in (enhancements._modifier_rules, enhancements._updater_rules):
+            frames = info.get_frames()
+            expected_frames = copy.deepcopy(frames)
+            actual_frames = copy.deepcopy(frames)
+
+            expected = _apply_rules(rules, expected_frames, platform, info.container)
+            actual = _apply_program(
+                EnhancementsProgram(rules), actual_frames, platform, info.container
+            )
+
+            assert actual == expected
+            assert actual_frames == expected_frames
+
+
+def test_program_indexes_families_and_literals():
+    enhancements = Enhancements.from_config_string(
+        """
+        family:native function:abort       -app
+        family:native,javascript module:*  +app
+        function:abort* !family:native     -group
+    """
+    )
+    program = EnhancementsProgram(enhancements.rules)
+
+    assert program.rules[0].families == {b"native"}
+    assert program.rules[0].literals == [("function", b"abort")]
+    assert program.rules[1].families == {b"native", b"javascript"}
+    assert program.rules[1].literals == []
+    assert program.rules[2].families is None
+    assert program.rules[2].literals == []
+
+    frames = [
+        {"function": "main", "platform": "native"},
+        {"function": "abort", "platform": "native"},
+        {"function": "abort", "platform": "python"},
+    ]
+    matched = _apply_program(program, frames, "native", {})
+    assert [(idx, str(action)) for _, idx, action in matched] == [
+        (1, "-app"),
+        (2, "-group"),
+    ]
+
+
+def test_enhancements_cache():
+    config = "function:cached_function +app"
+    enhancements = Enhancements.from_config_string(config)
+    assert Enhancements.from_config_string(config) is enhancements
+    assert Enhancements.from_config_string(config, bases=["common:2019-03-23"]) is not enhancements
+
+    dumped = enhancements.dumps()
+    loaded = Enhancements.loads(dumped)
+    assert Enhancements.loads(dumped) is loaded
+    assert Enhancements.loads(dumped.encode("ascii")) is loaded
+
+
+def test_lru_cache_eviction():
+    cache: LRUCache[str, int] = LRUCache("test", max_entries=2, max_size=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # "b" was the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    cache.set("d", 4, size=9)
+    assert len(cache) == 1
+    assert cache.size == 9
+    assert cache.get("d") == 4
+
+    # Too large to ever fit
+    cache.set("e", 5, size=11)
+    assert cache.get("e") is None
+    assert cache.get("d") == 4
+
+
+def test_lru_cache_ttl_and_resize():
+    cache: LRUCache[str, int] = LRUCache("test", max_entries=3, max_size=10)
+    with mock.patch("time.monotonic", return_value=100.0):
+        cache.set("a", 1, ttl=10)
+        cache.set("b", 2)
+        cache.set("c", 3)
+    with mock.patch("time.monotonic", return_value=110.0):
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+    cache.resize(max_entries=1, max_size=10)
+    assert len(cache) == 1
+    # "b" was used more recently than "c"
+    assert cache.get("b") == 2
+
+
+def test_stacktrace_cache_tiers():
+    stacktrace_cache = StacktraceCache("test")
+    with mock.patch("sentry.grouping.enhancer.cache.cache") as remote:
+        remote.get.return_value = None
+        assert stacktrace_cache.get("key", kind="test", platform="native") is None
+        assert remote.get.call_count == 1
+
+        assert stacktrace_cache.set("key", [1, 2], kind="test", platform="native", size=2)
+        remote.set.assert_called_once_with("key", [1, 2], 300)
+
+        # Served from the local tier
+        assert stacktrace_cache.get("key", kind="test", platform="native") == [1, 2]
+        assert remote.get.call_count == 1
+
+        with override_settings(SENTRY_GROUPING_STACKTRACE_CACHE_LOCAL_MAX_ENTRIES=0):
+            assert stacktrace_cache.get("key", kind="test", platform="native") is None
+            assert remote.get.call_count == 2
+
+
+def test_component_contributions_cache():
+    enhancements = Enhancements.from_config_string(
+        """
+        function:foo -group
+        function:bar +sentinel
+        function:baz max-frames=1
+        """
+    )
+    frames = [{"function": "foo"}, {"function": "bar"}, {"function": "baz"}]
+
+    def assemble():
+        components = [GroupingComponent(id="frame", contributes=True) for _ in frames]
+        state = enhancements.update_frame_components_contributions(
+            components, frames, "native", None
+        )
+        return [dump_obj(c) for c in components], state.vars, state.setters
+
+    with mock.patch(
+        "sentry.grouping.enhancer._stacktrace_cache", StacktraceCache("test")
+    ), mock.patch.object(
+        Enhancements,
+        "_update_frame_components_contributions",
+        autospec=True,
+        side_effect=Enhancements._update_frame_components_contributions,
+    ) as update:
+        first = assemble()
+        second = assemble()
+
+    assert update.call_count == 1
+    assert first == second
+    components, state_vars, setters = second
+    assert [c["contributes"] for c in components] == [False, False, True]
+    assert components[1]["is_sentinel_frame"]
+    assert state_vars["max-frames"] == 1
+    assert setters == {"max-frames": "function:baz max-frames=1"}
@@ -1,6 +1,7 @@
 from sentry.models.options.project_option import ProjectOption
 from sentry.testutils.cases import TestCase
 from sentry.testutils.silo import region_silo_test
+from sentry.utils.cache import cache
 
 
 @region_silo_test(stable=True)
@@ -30,3 +31,22 @@ class ProjectOptionManagerTest(TestCase):
         ProjectOption.objects.create(project=self.project, key="foo", value="bar")
         result = ProjectOption.objects.get_value_bulk([self.project], "foo")
         assert result == {self.project: "bar"}
+
+    def test_get_all_values_bulk(self):
+        other_project = self.create_project()
+        ProjectOption.objects.create(project=self.project, key="foo", value="bar")
+        ProjectOption.objects.create(project=other_project, key="foo", value="baz")
+        cache.delete_many(
+            [ProjectOption.objects._make_key(p.id) for p in (self.project, other_project)]
+        )
+        ProjectOption.objects.clear_local_cache()
+
+        with self.assertNumQueries(1):
+            result = ProjectOption.objects.get_all_values_bulk([self.project.id, other_project.id])
+        assert result == {self.project.id: {"foo": "bar"}, other_project.id: {"foo": "baz"}}
+
+        with self.assertNumQueries(0):
+            assert ProjectOption.objects.get_all_values(other_project) == {"foo": "baz"}
+            assert ProjectOption.objects.get_all_values_bulk([self.project.id]) == {
+                self.project.id: {"foo": "bar"}
+            }
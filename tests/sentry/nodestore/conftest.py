@@ -0,0 +1,17 @@
+import pytest
+
+from sentry.testutils.helpers.options import override_options
+
+
+@pytest.fixture(autouse=True)
+def nodestore_options():
+    # Most nodestore tests run without database access, so the encoding
+    # options read on every write can't be looked up in the options store.
+    with override_options(
+        {
+            "nodestore.indexed-encoding": False,
+            "nodestore.compression": False,
+            "nodestore.compression-level": 3,
+        }
+    ):
+        yield
@@ -1,3 +1,4 @@
+import base64
 import pickle
 from datetime import timedelta
 from unittest import mock
@@ -6,8 +7,10 @@ import pytest
 from django.utils import timezone
 
 from sentry.nodestore.base import json_dumps
+from sentry.nodestore.compression import COMPRESSED_MAGIC
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from sentry.nodestore.django.models import Node
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.testutils.silo import region_silo_test
 from sentry.utils.strings import compress
@@ -49,6 +52,19 @@ class TestDjangoNodeStorage:
             "5394aa025b8e401ca6bc3ddee3130edc": {"foo": "baz"},
         }
 
+    @region_silo_test(stable=True)
+    def test_get_multi_chunked(self):
+        ns = DjangoNodeStorage(multi_get_chunk_size=2)
+        ids = [f"{i:032x}" for i in range(5)]
+        for id in ids:
+            Node.objects.create(id=id, data=compress(b'{"foo": "%s"}' % id.encode()))
+
+        with mock.patch.object(ns, "_get_bytes_chunk", wraps=ns._get_bytes_chunk) as get_chunk:
+            result = ns.get_multi(ids + ["0" * 31 + "f"])
+
+        assert get_chunk.call_count == 3
+        assert result == {id: {"foo": id} for id in ids}
+
     @region_silo_test(stable=True)
     def test_set(self):
         self.ns.set("d2502ebbd7df41ceba8d3275595cac33", {"foo": "bar"})
@@ -56,6 +72,17 @@ class TestDjangoNodeStorage:
             b'{"foo":"bar"}'
         )
 
+    @region_silo_test(stable=True)
+    def test_set_compressed(self):
+        with override_options({"nodestore.compression": True}):
+            self.ns.set("d2502ebbd7df41ceba8d3275595cac33", {"foo": "bar"})
+        data = Node.objects.get(id="d2502ebbd7df41ceba8d3275595cac33").data
+        # Stored as is, without the zlib wrapper.
+        assert base64.b64decode(data).startswith(COMPRESSED_MAGIC)
+
+        self.ns._delete_cache_item("d2502ebbd7df41ceba8d3275595cac33")
+        assert self.ns.get("d2502ebbd7df41ceba8d3275595cac33") == {"foo": "bar"}
+
     @region_silo_test(stable=True)
     def test_delete(self):
         node = Node.objects.create(id="d2502ebbd7df41ceba8d3275595cac33", data=b'{"foo": "bar"}')
@@ -0,0 +1,67 @@
+import pytest
+
+from sentry.nodestore.base import NodeStorage
+from sentry.testutils.helpers.options import override_options
+from sentry.testutils.skips import requires_pytest_benchmark
+
+
+def make_native_event(num_threads=50, num_frames=200):
+    """
+    A large native crash event, shaped like a symbolicated minidump: many
+    threads with deep stacktraces and a big debug_meta section.
+    """
+    return {
+        "platform": "native",
+        "threads": {
+            "values": [
+                {
+                    "id": thread_id,
+                    "crashed": thread_id == 0,
+                    "stacktrace": {
+                        "frames": [
+                            {
+                                "function": f"namespace::Class::method_{thread_id}_{i}",
+                                "package": "/usr/lib/libexample.so",
+                                "instruction_addr": hex(0x7FFF0000 + i * 16),
+                                "symbol_addr": hex(0x7FFF0000 + i * 16 - 8),
+                                "filename": f"src/module_{i % 17}.cpp",
+                                "lineno": i,
+                                "in_app": i % 3 == 0,
+                                "trust": "cfi",
+                            }
+                            for i in range(num_frames)
+                        ],
+                        "registers": {f"r{r}": hex(r * 4096) for r in range(16)},
+                    },
+                }
+                for thread_id in range(num_threads)
+            ]
+        },
+        "debug_meta": {
+            "images": [
+                {
+                    "type": "elf",
+                    "code_file": f"/usr/lib/lib{i}.so",
+                    "debug_id": f"{i:032x}",
+                    "image_addr": hex(0x10000000 + i * 0x10000),
+                    "image_size": 0x10000,
+                }
+                for i in range(500)
+            ]
+        },
+    }
+
+
+@pytest.fixture(params=["legacy", "indexed"])
+def encoded_event(request):
+    event = make_native_event()
+    with override_options({"nodestore.indexed-encoding": request.param == "indexed"}):
+        return NodeStorage()._encode({None: event, "unprocessed": {"platform": "native"}})
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("subkey", [None, "unprocessed"])
+def test_benchmark_decode(encoded_event, subkey, benchmark):
+    ns = NodeStorage()
+    result = benchmark(ns._decode, encoded_event, subkey)
+    assert result is not None
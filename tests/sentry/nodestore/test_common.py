@@ -6,7 +6,10 @@ from contextlib import nullcontext
 
 import pytest
 
+from sentry.nodestore.base import INDEXED_ENCODING_MAGIC
+from sentry.nodestore.compression import is_compressed
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.silo import region_silo_test
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
@@ -97,3 +100,35 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+@region_silo_test(stable=True)
+def test_set_subkeys_indexed_encoding(ns):
+    with override_options({"nodestore.indexed-encoding": True}):
+        ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+
+    assert ns.get_bytes("node_1").startswith(INDEXED_ENCODING_MAGIC)
+    assert ns.get("node_1") == {"foo": "a"}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get("node_1", subkey="missing") is None
+    assert ns.get_multi(["node_1"], subkey="other") == {"node_1": {"foo": "b"}}
+
+
+@region_silo_test(stable=True)
+def test_legacy_encoding_readable_with_indexed_encoding(ns):
+    ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+
+    with override_options({"nodestore.indexed-encoding": True}):
+        assert ns.get("node_1") == {"foo": "a"}
+        assert ns.get("node_1", subkey="other") == {"foo": "b"}
+
+
+@region_silo_test(stable=True)
+def test_set_subkeys_compressed(ns):
+    with override_options({"nodestore.compression": True}):
+        ns.set_subkeys("node_1", {None: {"platform": "python"}, "other": {"foo": "b"}})
+
+    assert is_compressed(ns.get_bytes("node_1"))
+    assert ns.get("node_1") == {"platform": "python"}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get_multi(["node_1"]) == {"node_1": {"platform": "python"}}
@@ -0,0 +1,75 @@
+import pytest
+from django.test import override_settings
+
+from sentry.nodestore.compression import (
+    NodeCompressor,
+    UnknownDictionary,
+    get_dictionary_name,
+    is_compressed,
+    train_dictionary,
+)
+from sentry.utils import json
+
+
+def make_event(platform, i):
+    return json.dumps(
+        {
+            "platform": platform,
+            "event_id": f"{i:032x}",
+            "exception": {
+                "values": [
+                    {
+                        "type": "Error",
+                        "stacktrace": {
+                            "frames": [
+                                {"function": f"function_{j}", "lineno": i * j, "in_app": j % 2 == 0}
+                                for j in range(30)
+                            ]
+                        },
+                    }
+                ]
+            },
+        }
+    ).encode("utf8")
+
+
+@pytest.fixture
+def native_dictionary(tmp_path):
+    path = tmp_path / "native.dict"
+    path.write_bytes(
+        train_dictionary([make_event("native", i) for i in range(200)], 4096).as_bytes()
+    )
+    with override_settings(SENTRY_NODESTORE_COMPRESSION_DICTIONARIES={"native": str(path)}):
+        yield
+
+
+def test_get_dictionary_name():
+    assert get_dictionary_name("cocoa") == "native"
+    assert get_dictionary_name("native") == "native"
+    assert get_dictionary_name("python") == "python"
+    assert get_dictionary_name(None) == "default"
+
+
+def test_roundtrip_without_dictionary():
+    data = make_event("python", 1)
+    compressed = NodeCompressor().compress(data, platform="python")
+    assert is_compressed(compressed)
+    assert not is_compressed(data)
+    assert NodeCompressor().decompress(compressed) == data
+
+
+def test_roundtrip_with_dictionary(native_dictionary):
+    data = make_event("native", 1000)
+    with_dictionary = NodeCompressor().compress(data, platform="cocoa")
+    without_dictionary = NodeCompressor().compress(data, platform="python")
+
+    assert len(with_dictionary) < len(without_dictionary)
+    assert NodeCompressor().decompress(with_dictionary) == data
+    assert NodeCompressor().decompress(without_dictionary) == data
+
+
+def test_unknown_dictionary(native_dictionary):
+    compressed = NodeCompressor().compress(make_event("native", 1), platform="native")
+    with override_settings(SENTRY_NODESTORE_COMPRESSION_DICTIONARIES={}):
+        with pytest.raises(UnknownDictionary):
+            NodeCompressor().decompress(compressed)
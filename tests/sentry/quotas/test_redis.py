@@ -5,6 +5,7 @@ from unittest import mock
 import pytest
 
 from sentry.constants import DataCategory
+from sentry.models.options.organization_option import OrganizationOption
 from sentry.quotas.base import QuotaConfig, QuotaScope
 from sentry.quotas.redis import RedisQuota, is_rate_limited
 from sentry.testutils.cases import TestCase
@@ -331,6 +332,65 @@ class RedisQuotaTest(TestCase):
         # count for these quotas and None for the others.
         assert usage == [n if q.id else None for q in quotas] + [0, 0]
 
+    def test_config_cache(self):
+        quota = RedisQuota(config_cache_ttl=60)
+        self.get_project_quota.return_value = (200, 60)
+
+        assert quota.get_quotas(self.project) == quota.get_quotas(self.project)
+        assert self.get_project_quota.call_count == 1
+
+        OrganizationOption.objects.create(
+            organization=self.organization, key="sentry:account-rate-limit", value=10
+        )
+        quota.get_quotas(self.project)
+        assert self.get_project_quota.call_count == 2
+
+    def test_fast_path(self):
+        quota = RedisQuota(fast_path_fraction=0.5, fast_path_ttl=60)
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (200, 60)
+        self.get_organization_quota.return_value = (100, 60)
+
+        with mock.patch("sentry.quotas.redis.is_rate_limited", wraps=is_rate_limited) as script:
+            for _ in range(11):
+                assert not quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+            assert script.call_count == 1
+
+            quotas = quota.get_quotas(self.project)
+            usage = quota.get_usage(self.project.organization_id, quotas, timestamp=timestamp)
+            assert usage == [1 if q.id else None for q in quotas]
+
+            for entry in quota._fast_path.values():
+                entry.expires_at = 0
+            assert not quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+            assert script.call_count == 2
+
+        usage = quota.get_usage(self.project.organization_id, quotas, timestamp=timestamp)
+        assert usage == [12 if q.id else None for q in quotas]
+
+    def test_fast_path_failure(self):
+        quota = RedisQuota(fast_path_fraction=0.5, fast_path_ttl=60)
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (200, 60)
+        self.get_organization_quota.return_value = (100, 60)
+
+        for _ in range(11):
+            assert not quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+        for entry in quota._fast_path.values():
+            entry.expires_at = 0
+
+        with mock.patch("sentry.quotas.redis.is_rate_limited", side_effect=Exception("boom")):
+            with pytest.raises(Exception):
+                quota.is_rate_limited(self.project, timestamp=timestamp)
+
+        # The events let through locally are counted by the next call.
+        assert not quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+        quotas = quota.get_quotas(self.project)
+        usage = quota.get_usage(self.project.organization_id, quotas, timestamp=timestamp)
+        assert usage == [12 if q.id else None for q in quotas]
+
     @mock.patch.object(RedisQuota, "get_quotas")
     def test_refund_defaults(self, mock_get_quotas):
         timestamp = time.time()
@@ -1,4 +1,5 @@
 from time import time
+from unittest import mock
 
 from sentry.ratelimits.redis import RedisRateLimiter
 from sentry.testutils.cases import TestCase
@@ -66,3 +67,29 @@ class RedisRateLimiterTest(TestCase):
             assert not limited
             assert value == 1
             assert reset_time == expected_reset_time + 5
+
+    def test_lease(self):
+        backend = RedisRateLimiter(lease_size=5)
+        with freeze_time("2000-01-01"), mock.patch.object(
+            backend.client, "incrby", wraps=backend.client.incrby
+        ) as incrby:
+            results = [backend.is_limited_with_value("foo", 8)[:2] for _ in range(10)]
+
+        assert results == [(False, i) for i in range(1, 9)] + [(True, 9), (True, 9)]
+        # One lease of 5 requests, and one of the remaining 3.
+        assert incrby.call_count == 2
+        with freeze_time("2000-01-01"):
+            assert backend.current_value("foo") == 10
+
+    def test_lease_expiry(self):
+        backend = RedisRateLimiter(lease_size=5, lease_ttl=1)
+        other = RedisRateLimiter(lease_size=5, lease_ttl=1)
+        with freeze_time("2000-01-01") as frozen_time:
+            assert backend.is_limited_with_value("foo", 10)[:2] == (False, 1)
+            assert other.is_limited_with_value("foo", 10)[:2] == (False, 6)
+
+            frozen_time.shift(1)
+            # The 4 requests left over from the first lease are topped up to
+            # 5, of which only 4 are within the limit.
+            assert backend.is_limited_with_value("foo", 10)[:2] == (False, 7)
+            assert backend.current_value("foo") == 11
@@ -8,9 +8,9 @@ from sentry.ratelimits.sliding_windows import (
 )
 
 
-@pytest.fixture
-def limiter():
-    return RedisSlidingWindowRateLimiter()
+@pytest.fixture(params=[False, True], ids=["impl", "script"])
+def limiter(request):
+    return RedisSlidingWindowRateLimiter(use_script=request.param)
 
 
 TIMESTAMP_OFFSET = 100
@@ -71,3 +71,29 @@ def test_basic(limiter):
         )
 
         assert resp == [GrantedQuota(prefix="foo", granted=0, reached_quotas=quotas)]
+
+
+def test_bulk(limiter):
+    quotas = [
+        Quota(window_seconds=10, granularity_seconds=1, limit=3),
+        Quota(window_seconds=5, granularity_seconds=1, limit=10),
+    ]
+    requests = [
+        RequestedQuota(prefix="foo", requested=2, quotas=quotas),
+        RequestedQuota(prefix="bar", requested=3, quotas=quotas),
+    ]
+
+    timestamp, grants = limiter.check_within_quotas(requests, timestamp=TIMESTAMP_OFFSET)
+    assert grants == [
+        GrantedQuota(prefix="foo", granted=2, reached_quotas=[]),
+        GrantedQuota(prefix="bar", granted=3, reached_quotas=[]),
+    ]
+
+    resp = limiter.check_and_use_quotas(requests, timestamp=TIMESTAMP_OFFSET)
+    assert resp == grants
+
+    resp = limiter.check_and_use_quotas(requests, timestamp=TIMESTAMP_OFFSET + 1)
+    assert resp == [
+        GrantedQuota(prefix="foo", granted=1, reached_quotas=[quotas[0]]),
+        GrantedQuota(prefix="bar", granted=0, reached_quotas=[quotas[0]]),
+    ]
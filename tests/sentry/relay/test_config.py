@@ -19,7 +19,12 @@ from sentry.dynamic_sampling.rules.base import NEW_MODEL_THRESHOLD_IN_MINUTES
 from sentry.models.projectkey import ProjectKey
 from sentry.models.projectteam import ProjectTeam
 from sentry.models.transaction_threshold import TransactionMetric
-from sentry.relay.config import ProjectConfig, get_project_config
+from sentry.relay.config import (
+    ProjectConfig,
+    get_project_config,
+    get_project_config_sections,
+    merge_project_config_sections,
+)
 from sentry.snuba.dataset import Dataset
 from sentry.testutils.factories import Factories
 from sentry.testutils.helpers import Feature
@@ -784,3 +789,36 @@ def test_performance_calculate_score(default_project):
                 }
             ]
         }
+
+
+def test_merge_project_config_sections():
+    config = {
+        "projectId": 1,
+        "config": {"dynamicSampling": {"rules": [], "rulesV2": []}, "metricExtraction": {"a": 1}},
+    }
+
+    assert (
+        merge_project_config_sections(config, {"dynamicSampling": {"rulesV2": [], "rules": []}})
+        is None
+    )
+
+    merged = merge_project_config_sections(
+        config, {"dynamicSampling": None, "metricExtraction": {"a": 2}}
+    )
+    assert merged == {"projectId": 1, "config": {"metricExtraction": {"a": 2}}}
+    # The cached config is left untouched.
+    assert "dynamicSampling" in config["config"]
+
+
+@django_db_all
+def test_get_project_config_sections(default_project):
+    with Feature({"organizations:dynamic-sampling": True}):
+        full_config = get_project_config(default_project).to_dict()["config"]
+        sections = get_project_config_sections(
+            default_project, ["dynamicSampling", "metricExtraction"]
+        )
+
+    assert sections == {
+        "dynamicSampling": full_config.get("dynamicSampling"),
+        "metricExtraction": full_config.get("metricExtraction"),
+    }
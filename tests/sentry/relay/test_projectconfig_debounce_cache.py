@@ -76,3 +76,22 @@ def test_custom_prefix():
     redis = cache._get_redis_client(expected_key)
 
     assert redis.get(expected_key) == b"1"
+
+
+def test_trigger_scope():
+    cache = RedisProjectConfigDebounceCache()
+    kwargs = {
+        "public_key": None,
+        "project_id": 1,
+        "organization_id": None,
+    }
+
+    cache.debounce(**kwargs, trigger="a")
+    assert cache.is_debounced(**kwargs, trigger="a")
+    assert not cache.is_debounced(**kwargs, trigger="b")
+    assert not cache.is_debounced(**kwargs)
+
+    cache.debounce(**kwargs)
+    cache.mark_task_done(**kwargs, trigger="a")
+    assert not cache.is_debounced(**kwargs, trigger="a")
+    assert cache.is_debounced(**kwargs)
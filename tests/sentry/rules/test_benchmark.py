@@ -0,0 +1,56 @@
+import pytest
+
+from sentry.models.rule import Rule
+from sentry.rules.processor import BatchRuleProcessor, RuleProcessor
+from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.testutils.skips import requires_pytest_benchmark, requires_snuba
+
+pytestmark = [requires_snuba]
+
+NUM_EVENTS = 200
+NUM_GROUPS = 4
+NUM_RULES = 20
+
+
+@pytest.fixture
+def group_events(factories, default_project):
+    """
+    A burst of events of one project, spread over a few groups, and a project
+    with many rules that never fire.
+    """
+    Rule.objects.filter(project=default_project).delete()
+    for i in range(NUM_RULES):
+        Rule.objects.create(
+            project=default_project,
+            label=f"rule {i}",
+            data={
+                "conditions": [
+                    {"id": "sentry.rules.conditions.first_seen_event.FirstSeenEventCondition"}
+                ],
+                "actions": [{"id": "sentry.rules.actions.notify_event.NotifyEventAction"}],
+            },
+        )
+
+    events = [
+        factories.store_event(data={"fingerprint": [f"group-{i}"]}, project_id=default_project.id)
+        for i in range(NUM_GROUPS)
+    ]
+    return [next(events[i % NUM_GROUPS].build_group_events()) for i in range(NUM_EVENTS)]
+
+
+def apply_per_event(group_events):
+    for group_event in group_events:
+        list(RuleProcessor(group_event, False, False, False, False).apply())
+
+
+def apply_batched(group_events):
+    batch = BatchRuleProcessor(group_events[0].project)
+    for group_event in group_events:
+        list(batch.get_processor(group_event, False, False, False, False).apply())
+
+
+@django_db_all
+@requires_pytest_benchmark
+@pytest.mark.parametrize("apply", [apply_per_event, apply_batched], ids=lambda f: f.__name__)
+def test_benchmark_rule_processor(group_events, apply, benchmark):
+    benchmark(apply, group_events)
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta
 from unittest import mock
 from unittest.mock import patch
@@ -14,12 +15,20 @@ from sentry.models.projectownership import ProjectOwnership
 from sentry.models.rule import Rule
 from sentry.models.rulefirehistory import RuleFireHistory
 from sentry.notifications.types import ActionTargetType
-from sentry.rules import init_registry
+from sentry.rules import EventState, init_registry
 from sentry.rules.conditions import EventCondition
+from sentry.rules.conditions.event_frequency import EventFrequencyCondition, FrequencyQueryPlanner
 from sentry.rules.filters.base import EventFilter
-from sentry.rules.processor import RuleProcessor
+from sentry.rules.processor import (
+    BatchRuleProcessor,
+    RuleProcessor,
+    _batch_rule_processors,
+    bulk_get_rule_statuses,
+    get_batch_rule_processor,
+)
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers import install_slack
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.silo import region_silo_test
 from sentry.testutils.skips import requires_snuba
 from sentry.utils import json
@@ -769,3 +778,160 @@ class RuleProcessorTestFilters(TestCase):
             safe_execute(callback, self.group_event, futures, _with_transaction=False)
         mock_build.assert_called_once()
         assert "notification_uuid" in mock_build.call_args[1]["embeds"][0].url
+
+
+@region_silo_test(stable=True)
+class RuleProcessorBatchingTest(TestCase):
+    def setUp(self):
+        Rule.objects.filter(project=self.project).delete()
+        ProjectOwnership.objects.create(project_id=self.project.id, fallthrough=True)
+        self.rule = Rule.objects.create(
+            project=self.project,
+            data={"conditions": [EVERY_EVENT_COND_DATA], "actions": [EMAIL_ACTION_DATA]},
+        )
+        self.group_events = [
+            next(
+                self.store_event(
+                    data={"fingerprint": [fingerprint]}, project_id=self.project.id
+                ).build_group_events()
+            )
+            for fingerprint in ("a", "b")
+        ]
+
+    def test_bulk_get_rule_statuses(self):
+        groups = [group_event.group for group_event in self.group_events]
+
+        statuses = bulk_get_rule_statuses(self.project, groups, [self.rule])
+        assert {group_id: list(s) for group_id, s in statuses.items()} == {
+            groups[0].id: [self.rule.id],
+            groups[1].id: [self.rule.id],
+        }
+        assert GroupRuleStatus.objects.filter(rule=self.rule).count() == 2
+
+        cache.clear()
+        assert bulk_get_rule_statuses(self.project, groups, [self.rule]) == statuses
+
+    def test_batch_apply(self):
+        batch = BatchRuleProcessor(self.project)
+        group_events = [self.group_events[0], self.group_events[0], self.group_events[1]]
+        with patch(
+            "sentry.rules.processor.Rule.get_for_project", wraps=Rule.get_for_project
+        ) as get_for_project, patch(
+            "sentry.rules.processor.bulk_get_rule_statuses", wraps=bulk_get_rule_statuses
+        ) as get_statuses:
+            results = [
+                list(batch.get_processor(group_event, True, False, True, False).apply())
+                for group_event in group_events
+            ]
+
+        assert get_for_project.call_count == 1
+        # Once per group.
+        assert get_statuses.call_count == 2
+        # The rule fires once per group, like it would when processing the
+        # events one by one.
+        assert [len(result) for result in results] == [1, 0, 1]
+        assert RuleFireHistory.objects.filter(rule=self.rule).count() == 2
+
+    def test_get_batch_rule_processor(self):
+        self.addCleanup(_batch_rule_processors.clear)
+        assert get_batch_rule_processor(self.project) is not get_batch_rule_processor(self.project)
+
+        with override_options({"post-process.rule-batch-window": 10.0}):
+            batch = get_batch_rule_processor(self.project)
+            assert get_batch_rule_processor(self.project) is batch
+            assert get_batch_rule_processor(self.create_project()) is not batch
+
+            with patch("sentry.rules.processor.time.monotonic", return_value=time.monotonic() + 11):
+                assert get_batch_rule_processor(self.project) is not batch
+
+    def test_frequency_queries_are_batched(self):
+        def frequency_condition(cls, interval):
+            return {
+                "id": f"sentry.rules.conditions.event_frequency.{cls}",
+                "interval": interval,
+                "value": 1000,
+            }
+
+        self.rule.delete()
+        for conditions in (
+            [frequency_condition("EventFrequencyCondition", "1h")],
+            [frequency_condition("EventFrequencyCondition", "1h")],
+            [frequency_condition("EventFrequencyCondition", "1d")],
+            [frequency_condition("EventUniqueUserFrequencyCondition", "1h")],
+        ):
+            Rule.objects.create(
+                project=self.project,
+                data={"conditions": conditions, "actions": [EMAIL_ACTION_DATA]},
+            )
+
+        group_event = self.group_events[0]
+        with patch(
+            "sentry.tsdb.get_sums", return_value={group_event.group_id: 0}
+        ) as get_sums, patch(
+            "sentry.tsdb.get_distinct_counts_totals",
+            return_value={group_event.group_id: 0},
+        ) as get_distinct_counts_totals:
+            rp = RuleProcessor(group_event, True, False, True, False)
+            assert not list(rp.apply())
+
+        # One query per distinct interval, shared by the rules using it.
+        assert get_sums.call_count == 2
+        assert get_distinct_counts_totals.call_count == 1
+        assert all(call[1]["keys"] == [group_event.group_id] for call in get_sums.call_args_list)
+
+    def test_frequency_queries_skip_rules_that_dont_apply(self):
+        def frequency_condition(interval):
+            return {
+                "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+                "interval": interval,
+                "value": 1000,
+            }
+
+        self.rule.delete()
+        Rule.objects.create(
+            project=self.project,
+            data={"conditions": [frequency_condition("1h")], "actions": [EMAIL_ACTION_DATA]},
+        )
+        # Doesn't match the environment of the event.
+        Rule.objects.create(
+            project=self.project,
+            environment_id=self.create_environment(project=self.project, name="staging").id,
+            data={"conditions": [frequency_condition("1d")], "actions": [EMAIL_ACTION_DATA]},
+        )
+        # Doesn't pass its filter, since the event is an error.
+        Rule.objects.create(
+            project=self.project,
+            data={
+                "conditions": [
+                    frequency_condition("1w"),
+                    {"id": "sentry.rules.filters.level.LevelFilter", "match": "eq", "level": "50"},
+                ],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+
+        group_event = self.group_events[0]
+        with patch("sentry.tsdb.get_sums", return_value={group_event.group_id: 0}) as get_sums:
+            rp = RuleProcessor(group_event, True, False, True, False)
+            assert not list(rp.apply())
+
+        assert get_sums.call_count == 1
+        assert get_sums.call_args[1]["end"] - get_sums.call_args[1]["start"] == timedelta(hours=1)
+
+    def test_frequency_planner_uses_condition_tsdb(self):
+        group_event = self.group_events[0]
+        backend = mock.Mock()
+        backend.get_sums.return_value = {group_event.group_id: 0}
+        condition = EventFrequencyCondition(
+            project=self.project,
+            data={"interval": "1h", "value": 1000},
+            rule=self.rule,
+            tsdb=backend,
+        )
+        condition.query_planner = FrequencyQueryPlanner()
+
+        with patch("sentry.tsdb.get_sums") as get_sums:
+            assert not condition.passes(group_event, EventState(True, False, True, False))
+
+        assert backend.get_sums.call_count == 1
+        assert get_sums.call_count == 0
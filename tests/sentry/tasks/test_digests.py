@@ -7,13 +7,15 @@ from django.core.mail.message import EmailMultiAlternatives
 import sentry
 from sentry.digests.backends.redis import RedisBackend
 from sentry.digests.notifications import event_to_record
+from sentry.models.options.project_option import ProjectOption
 from sentry.models.projectownership import ProjectOwnership
 from sentry.models.rule import Rule
-from sentry.tasks.digests import deliver_digest
+from sentry.tasks.digests import _notify_digest, deliver_digest, deliver_digests
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
 from sentry.testutils.helpers.features import with_feature
 from sentry.testutils.skips import requires_snuba
+from sentry.utils import snuba
 
 pytestmark = [requires_snuba]
 
@@ -84,3 +86,50 @@ class DeliverDigestTest(TestCase):
     def test_no_records(self):
         # This shouldn't error if no records are present
         deliver_digest(f"mail:p:{self.project.id}:IssueOwners:")
+
+
+class DeliverDigestsTest(TestCase):
+    def test_batch(self):
+        keys = [
+            f"mail:p:{self.project.id}:IssueOwners:",
+            f"mail:p:{self.project.id}:Member:{self.user.id}",
+        ]
+        with mock.patch.object(sentry, "digests") as digests:
+            backend = RedisBackend()
+            digests.digest_many = backend.digest_many
+
+            rule = Rule.objects.create(project=self.project, label="Test Rule", data={})
+            ProjectOwnership.objects.create(project_id=self.project.id, fallthrough=True)
+            for key in keys:
+                for fingerprint in ("group-1", "group-2"):
+                    event = self.store_event(
+                        data={
+                            "timestamp": iso_format(before_now(days=1)),
+                            "fingerprint": [fingerprint],
+                        },
+                        project_id=self.project.id,
+                    )
+                    backend.add(
+                        key, event_to_record(event, [rule]), increment_delay=0, maximum_delay=0
+                    )
+
+            consistent = []
+
+            def notify_digest(*args):
+                consistent.append(snuba.OVERRIDE_OPTIONS.get("consistent"))
+                return _notify_digest(*args)
+
+            with self.tasks(), mock.patch(
+                "sentry.tasks.digests._notify_digest", side_effect=notify_digest
+            ), mock.patch.object(
+                ProjectOption.objects, "get_value", wraps=ProjectOption.objects.get_value
+            ) as get_value:
+                deliver_digests([(key, None) for key in keys])
+
+        assert len(mail.outbox) == 2
+        assert all("2 new alerts since" in message.subject for message in mail.outbox)
+        assert consistent == [True, True]
+        # Both timelines belong to the same project.
+        assert [
+            call for call in get_value.call_args_list if "digests:mail:minimum_delay" in call[0]
+        ] == [mock.call(self.project, "digests:mail:minimum_delay")]
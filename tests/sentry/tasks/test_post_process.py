@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+import threading
 import time
 import uuid
 from datetime import datetime, timedelta, timezone
@@ -57,9 +58,11 @@ from sentry.tasks.derive_code_mappings import SUPPORTED_LANGUAGES
 from sentry.tasks.merge import merge_groups
 from sentry.tasks.post_process import (
     ISSUE_OWNERS_PER_PROJECT_PER_MIN_RATELIMIT,
+    POST_PROCESS_PIPELINE_STEP_DEPENDENCIES,
     feedback_filter_decorator,
     post_process_group,
     process_event,
+    run_pipeline_concurrently,
 )
 from sentry.testutils.cases import BaseTestCase, PerformanceIssueTestCase, SnubaTestCase, TestCase
 from sentry.testutils.helpers import with_feature
@@ -368,7 +371,9 @@ class RuleProcessorTestMixin(BasePostProgressGroupMixin):
             event=event,
         )
 
-        mock_processor.assert_called_once_with(EventMatcher(event), True, False, True, False)
+        mock_processor.assert_called_once_with(
+            EventMatcher(event), True, False, True, False, batch=mock.ANY
+        )
         mock_processor.return_value.apply.assert_called_once_with()
 
         mock_callback.assert_called_once_with(EventMatcher(event), mock_futures)
@@ -389,7 +394,9 @@ class RuleProcessorTestMixin(BasePostProgressGroupMixin):
             event=event,
         )
 
-        mock_processor.assert_called_once_with(EventMatcher(event), True, False, True, False)
+        mock_processor.assert_called_once_with(
+            EventMatcher(event), True, False, True, False, batch=mock.ANY
+        )
         mock_processor.return_value.apply.assert_called_once_with()
 
         mock_callback.assert_called_once_with(EventMatcher(event), mock_futures)
@@ -475,7 +482,7 @@ class RuleProcessorTestMixin(BasePostProgressGroupMixin):
         )
         # Ensure that rule processing sees the merged group.
         mock_processor.assert_called_with(
-            EventMatcher(event, group=group2), True, False, True, False
+            EventMatcher(event, group=group2), True, False, True, False, batch=mock.ANY
         )
 
     @patch("sentry.rules.processor.RuleProcessor")
@@ -508,7 +515,7 @@ class RuleProcessorTestMixin(BasePostProgressGroupMixin):
             event=event2,
         )
         mock_processor.assert_called_with(
-            EventMatcher(event2, group=group1), False, True, False, False
+            EventMatcher(event2, group=group1), False, True, False, False, batch=mock.ANY
         )
         sent_group_date = mock_processor.call_args[0][0].group.last_seen
         # Check that last_seen was updated to be at least the new event's date
@@ -754,7 +761,9 @@ class InboxTestMixin(BasePostProgressGroupMixin):
         assert group.status == GroupStatus.UNRESOLVED
         assert group.substatus == GroupSubStatus.NEW
 
-        mock_processor.assert_called_with(EventMatcher(new_event), True, True, False, False)
+        mock_processor.assert_called_with(
+            EventMatcher(new_event), True, True, False, False, batch=mock.ANY
+        )
 
         # resolve the new issue so regression actually happens
         group.status = GroupStatus.RESOLVED
@@ -778,7 +787,9 @@ class InboxTestMixin(BasePostProgressGroupMixin):
             event=regressed_event,
         )
 
-        mock_processor.assert_called_with(EventMatcher(regressed_event), False, True, False, False)
+        mock_processor.assert_called_with(
+            EventMatcher(regressed_event), False, True, False, False, batch=mock.ANY
+        )
         group.refresh_from_db()
         assert group.status == GroupStatus.UNRESOLVED
         assert group.substatus == GroupSubStatus.REGRESSED
@@ -1540,7 +1551,9 @@ class SnoozeTestSkipSnoozeMixin(BasePostProgressGroupMixin):
         assert GroupInbox.objects.filter(group=group, reason=GroupInboxReason.NEW.value).exists()
         GroupInbox.objects.filter(group=group).delete()  # Delete so it creates the UNIGNORED entry.
         Activity.objects.filter(group=group).delete()
-        mock_processor.assert_called_with(EventMatcher(event), True, False, True, False)
+        mock_processor.assert_called_with(
+            EventMatcher(event), True, False, True, False, batch=mock.ANY
+        )
 
         event = self.create_event(data={"message": "testing"}, project_id=self.project.id)
         group.status = GroupStatus.IGNORED
@@ -1557,7 +1570,9 @@ class SnoozeTestSkipSnoozeMixin(BasePostProgressGroupMixin):
             is_new_group_environment=True,
             event=event,
         )
-        mock_processor.assert_called_with(EventMatcher(event), False, False, True, True)
+        mock_processor.assert_called_with(
+            EventMatcher(event), False, False, True, True, batch=mock.ANY
+        )
 
         if should_detect_escalation:
             mock_send_escalating_robust.assert_called_once_with(
@@ -1618,7 +1633,9 @@ class SnoozeTestMixin(BasePostProgressGroupMixin):
         GroupInbox.objects.filter(group=group).delete()  # Delete so it creates the UNIGNORED entry.
         Activity.objects.filter(group=group).delete()
 
-        mock_processor.assert_called_with(EventMatcher(event), True, False, True, False)
+        mock_processor.assert_called_with(
+            EventMatcher(event), True, False, True, False, batch=mock.ANY
+        )
 
         event = self.create_event(data={"message": "testing"}, project_id=self.project.id)
         group.status = GroupStatus.IGNORED
@@ -1636,7 +1653,9 @@ class SnoozeTestMixin(BasePostProgressGroupMixin):
             event=event,
         )
 
-        mock_processor.assert_called_with(EventMatcher(event), False, False, True, True)
+        mock_processor.assert_called_with(
+            EventMatcher(event), False, False, True, True, batch=mock.ANY
+        )
         mock_send_escalating_robust.assert_called_once_with(
             project=group.project,
             group=group,
@@ -1712,7 +1731,9 @@ class SnoozeTestMixin(BasePostProgressGroupMixin):
             event=event,
         )
 
-        mock_processor.assert_called_with(EventMatcher(event), True, False, True, False)
+        mock_processor.assert_called_with(
+            EventMatcher(event), True, False, True, False, batch=mock.ANY
+        )
 
         assert GroupSnooze.objects.filter(id=snooze.id).exists()
         group.refresh_from_db()
@@ -2323,7 +2344,9 @@ class PostProcessGroupGenericTest(
             event=event,
         )
         assert mock_processor.call_count == 1
-        mock_processor.assert_called_with(EventMatcher(event), True, True, False, False)
+        mock_processor.assert_called_with(
+            EventMatcher(event), True, True, False, False, batch=mock.ANY
+        )
 
         # Calling this again should do nothing, since we've already processed this occurrence.
         self.call_post_process_group(
@@ -2479,3 +2502,76 @@ class PostProcessGroupFeedbackTest(
     @pytest.mark.skip(reason="those tests do not work with the given call_post_process_group impl")
     def test_processing_cache_cleared_with_commits(self):
         pass
+
+
+class RunPipelineConcurrentlyTest(TestCase):
+    def test_runs_independent_steps_on_pool(self):
+        calls = []
+        inbox_done = threading.Event()
+
+        def process_snoozes(job):
+            calls.append(("process_snoozes", threading.current_thread()))
+
+        def process_inbox_adds(job):
+            calls.append(("process_inbox_adds", threading.current_thread()))
+            inbox_done.set()
+
+        def process_similarity(job):
+            # Only finishes if the other steps run at the same time.
+            assert inbox_done.wait(5)
+            calls.append(("process_similarity", threading.current_thread()))
+
+        run_pipeline_concurrently(
+            {"event": Mock()}, [process_similarity, process_snoozes, process_inbox_adds], "error", 2
+        )
+
+        # Every step has finished once it returns.
+        assert [name for name, _ in calls] == [
+            "process_snoozes",
+            "process_inbox_adds",
+            "process_similarity",
+        ]
+        assert calls[0][1] is threading.current_thread()
+        assert calls[1][1] is threading.current_thread()
+        assert calls[2][1] is not threading.current_thread()
+
+    def test_waits_for_dependencies(self):
+        calls = []
+
+        def handle_owner_assignment(job):
+            calls.append("handle_owner_assignment")
+
+        def handle_auto_assignment(job):
+            calls.append("handle_auto_assignment")
+
+        def process_resource_change_bounds(job):
+            calls.append("process_resource_change_bounds")
+
+        run_pipeline_concurrently(
+            {"event": Mock()},
+            [process_resource_change_bounds, handle_owner_assignment, handle_auto_assignment],
+            "error",
+            2,
+        )
+
+        assert calls == [
+            "handle_owner_assignment",
+            "handle_auto_assignment",
+            "process_resource_change_bounds",
+        ]
+
+    def test_dependencies_run_on_calling_thread(self):
+        for dependencies in POST_PROCESS_PIPELINE_STEP_DEPENDENCIES.values():
+            assert not dependencies & POST_PROCESS_PIPELINE_STEP_DEPENDENCIES.keys()
+
+    def test_step_failure(self):
+        def process_similarity(job):
+            raise Exception("boom")
+
+        process_snoozes = Mock(__name__="process_snoozes")
+
+        run_pipeline_concurrently(
+            {"event": Mock()}, [process_similarity, process_snoozes], "error", 2
+        )
+
+        process_snoozes.assert_called_once()
@@ -14,10 +14,12 @@ from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDe
 from sentry.tasks.relay import (
     _schedule_invalidate_project_config,
     build_project_config,
+    compute_projectkey_config,
     invalidate_project_config,
     schedule_build_project_config,
     schedule_invalidate_project_config,
 )
+from sentry.testutils.factories import Factories
 from sentry.testutils.hybrid_cloud import simulated_transaction_watermarks
 from sentry.testutils.pytest.fixtures import django_db_all
 
@@ -93,6 +95,7 @@ def redis_cache(monkeypatch):
     monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", cache.set_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.delete_many", cache.delete_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.get", cache.get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.get_many", cache.get_many)
 
     return cache
 
@@ -415,6 +418,40 @@ class TestInvalidationTask:
             },
         ]
 
+    def test_debounce_partial(
+        self,
+        monkeypatch,
+        default_project,
+        invalidation_debounce_cache,
+        django_cache,
+    ):
+        tasks = []
+
+        def apply_async(args=None, kwargs=None, countdown=None):
+            tasks.append(kwargs["trigger"])
+
+        monkeypatch.setattr("sentry.tasks.relay.invalidate_project_config.apply_async", apply_async)
+
+        invalidation_debounce_cache.mark_task_done(
+            public_key=None, project_id=default_project.id, organization_id=None
+        )
+        for trigger in (
+            "dynamic_sampling_sliding_window",
+            "dynamic_sampling_sliding_window",
+            "dynamic_sampling:boost_release",
+            # Not swallowed by the pending partial invalidations.
+            "test",
+            # Swallowed by the pending full invalidation.
+            "dynamic_sampling_boost_low_volume_projects",
+        ):
+            schedule_invalidate_project_config(project_id=default_project.id, trigger=trigger)
+
+        assert tasks == [
+            "dynamic_sampling_sliding_window",
+            "dynamic_sampling:boost_release",
+            "test",
+        ]
+
     def test_invalidate(
         self,
         monkeypatch,
@@ -463,6 +500,60 @@ class TestInvalidationTask:
             assert new_cfg is not None
             assert new_cfg != cfg
 
+    def test_invalidate_org_batch(
+        self,
+        default_organization,
+        default_project,
+        redis_cache,
+        django_cache,
+    ):
+        projects = [default_project] + [
+            Factories.create_project(organization=default_organization) for _ in range(3)
+        ]
+        public_keys = [
+            public_key for project in projects for public_key in _cache_keys_for_project(project)
+        ]
+        cfg = {"dummy-key": "val"}
+        redis_cache.set_many({public_key: cfg for public_key in public_keys[1:]})
+
+        with mock.patch(
+            "sentry.relay.projectconfig_cache.get_many", wraps=redis_cache.get_many
+        ) as get_many:
+            invalidate_project_config(organization_id=default_organization.id)
+
+        assert get_many.call_count == 1
+        # Keys without a cached config are not computed.
+        assert redis_cache.get(public_keys[0]) is None
+        for public_key in public_keys[1:]:
+            new_cfg = redis_cache.get(public_key)
+            assert new_cfg is not None
+            assert new_cfg != cfg
+
+    def test_invalidate_partial(
+        self,
+        default_project,
+        default_projectkey,
+        redis_cache,
+        django_cache,
+    ):
+        redis_cache.set_many(
+            {default_projectkey.public_key: compute_projectkey_config(default_projectkey)}
+        )
+        cfg = redis_cache.get(default_projectkey.public_key)
+        rules = {"rules": [], "rulesV2": [{"id": 1}]}
+
+        with mock.patch.dict(
+            "sentry.relay.config.PROJECT_CONFIG_SECTIONS", {"dynamicSampling": lambda p: rules}
+        ), mock.patch("sentry.tasks.relay.compute_projectkey_config") as compute:
+            invalidate_project_config(
+                project_id=default_project.id, trigger="dynamic_sampling_sliding_window"
+            )
+
+        assert not compute.called
+        new_cfg = redis_cache.get(default_projectkey.public_key)
+        assert new_cfg["config"]["dynamicSampling"] == rules
+        assert new_cfg["config"] == {**cfg["config"], "dynamicSampling": rules}
+
     @mock.patch(
         "sentry.tasks.relay._schedule_invalidate_project_config",
         wraps=_schedule_invalidate_project_config,
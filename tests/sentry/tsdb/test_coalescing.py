@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase, mock
+
+import pytest
+
+from sentry.tsdb.base import ONE_HOUR, TSDBModel
+from sentry.tsdb.coalescing import CoalescingWriter
+from sentry.tsdb.inmemory import InMemoryTSDB
+
+
+class CoalescingWriterTest(TestCase):
+    def setUp(self):
+        self.backend = InMemoryTSDB(rollups=((10, 30), (ONE_HOUR, 24)))
+        self.writer = CoalescingWriter(self.backend, flush_interval=0, max_pending=100)
+        self.now = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+    def test_incr_multi(self):
+        for offset in range(5):
+            self.writer.incr_multi(
+                [(TSDBModel.project, 1), (TSDBModel.group, 2, {"count": 2})],
+                timestamp=self.now + timedelta(seconds=offset),
+                environment_id=3,
+            )
+
+        assert self.backend.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 0}
+
+        with mock.patch.object(self.backend, "incr_multi", wraps=self.backend.incr_multi) as incr:
+            self.writer.flush()
+        assert incr.call_count == 1
+
+        end = self.now + timedelta(seconds=5)
+        assert self.backend.get_sums(TSDBModel.project, [1], self.now, end) == {1: 5}
+        assert self.backend.get_sums(TSDBModel.group, [2], self.now, end) == {2: 10}
+        assert self.backend.get_sums(
+            TSDBModel.group, [2], self.now, end, rollup=ONE_HOUR, environment_id=3
+        ) == {2: 10}
+
+    def test_record_multi(self):
+        for user in ("a", "b", "a"):
+            self.writer.record_multi(
+                [(TSDBModel.users_affected_by_group, 2, [user])],
+                timestamp=self.now,
+                environment_id=3,
+            )
+        self.writer.flush()
+
+        assert self.backend.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [2], self.now, self.now, environment_id=3
+        ) == {2: 2}
+
+    def test_flush_on_size(self):
+        self.writer.max_pending = 2
+        self.writer.incr_multi([(TSDBModel.project, 1)], timestamp=self.now)
+        assert self.backend.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 0}
+
+        self.writer.incr_multi([(TSDBModel.group, 2)], timestamp=self.now)
+        assert self.backend.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 1}
+
+    def test_failed_flush_on_size_does_not_raise(self):
+        self.writer.max_pending = 1
+        with mock.patch.object(self.backend, "incr_multi", side_effect=Exception("boom")):
+            self.writer.incr_multi([(TSDBModel.project, 1)], timestamp=self.now)
+
+        self.writer.flush()
+        assert self.backend.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 1}
+
+    def test_failed_flush_is_retried(self):
+        self.writer.incr_multi([(TSDBModel.project, 1)], timestamp=self.now)
+        self.writer.record_multi([(TSDBModel.users_affected_by_project, 1, ["a"])], self.now)
+
+        with mock.patch.object(self.backend, "record_multi", side_effect=Exception("boom")):
+            with pytest.raises(Exception):
+                self.writer.flush()
+
+        # The increments went through and must not be written again.
+        assert self.backend.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 1}
+        self.writer.incr_multi([(TSDBModel.project, 1)], timestamp=self.now)
+        self.writer.close()
+
+        assert self.backend.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 2}
+        assert self.backend.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_project, [1], self.now, self.now
+        ) == {1: 1}
+
+    def test_environment_validation(self):
+        with pytest.raises(ValueError):
+            self.writer.incr_multi([(TSDBModel.organization_total_received, 1)], environment_id=3)
@@ -187,6 +187,56 @@ class RedisTSDBTest(TestCase):
         results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
         assert results == {1: 0, 2: 0}
 
+    def test_get_range_arrays(self):
+        now = datetime.utcnow().replace(tzinfo=timezone.utc) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+        keys = [1, 2, "foo", 65]  # 1 and 65 share a vnode
+
+        self.db.incr_multi([(TSDBModel.project, key) for key in keys], dts[0])
+        self.db.incr(TSDBModel.project, 1, dts[1], count=2)
+        self.db.incr(TSDBModel.project, "foo", dts[3], count=5)
+        self.db.incr(TSDBModel.project, 65, dts[3], count=3, environment_id=1)
+
+        epochs, counts = self.db.get_range_arrays(TSDBModel.project, keys + [3], dts[0], dts[-1])
+        assert epochs == [int(to_timestamp(d)) - int(to_timestamp(d)) % 3600 for d in dts]
+        assert {key: list(values) for key, values in counts.items()} == {
+            1: [1, 2, 0, 0],
+            2: [1, 0, 0, 0],
+            "foo": [1, 0, 0, 5],
+            65: [1, 0, 0, 3],
+            3: [0, 0, 0, 0],
+        }
+
+        _, counts = self.db.get_range_arrays(
+            TSDBModel.project, keys, dts[0], dts[-1], environment_id=1
+        )
+        assert {key: list(values) for key, values in counts.items()} == {
+            1: [0, 0, 0, 0],
+            2: [0, 0, 0, 0],
+            "foo": [0, 0, 0, 0],
+            65: [0, 0, 0, 3],
+        }
+
+        assert self.db.get_range(TSDBModel.project, [1], dts[0], dts[-1]) == {
+            1: list(zip(epochs, [1, 2, 0, 0]))
+        }
+        assert self.db.get_sums(TSDBModel.project, keys, dts[0], dts[-1]) == {
+            1: 3,
+            2: 1,
+            "foo": 6,
+            65: 4,
+        }
+
+        model = TSDBModel.users_affected_by_group
+        self.db.record_multi(((model, 1, ("foo", "bar")), (model, 2, ("bar",))), dts[2])
+        epochs, counts = self.db.get_distinct_counts_arrays(
+            model, [1, 2], dts[0], dts[-1], rollup=3600
+        )
+        assert {key: list(values) for key, values in counts.items()} == {
+            1: [0, 0, 2, 0],
+            2: [0, 0, 1, 0],
+        }
+
     def test_count_distinct(self):
         now = datetime.utcnow().replace(tzinfo=timezone.utc) - timedelta(hours=4)
         dts = [now + timedelta(hours=i) for i in range(4)]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from copy import deepcopy
+
+import pytest
+
+from sentry.testutils.performance_issues.event_generators import get_event
+from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.testutils.skips import requires_pytest_benchmark
+from sentry.utils.performance_issues.performance_detection import (
+    DETECTOR_CLASSES,
+    get_detection_settings,
+    run_detector_on_data,
+)
+from sentry.utils.performance_issues.span_columns import SpanColumns
+
+NUM_SPANS = 5000
+
+
+@pytest.fixture
+def large_event(default_project):
+    """
+    A transaction with a few thousand spans, made by repeating the spans of a
+    transaction with an N+1 query in it.
+    """
+    event = get_event("n-plus-one-in-django-index-view")
+    event["project"] = default_project.id
+    spans = event["spans"]
+    event["spans"] = [
+        {**deepcopy(spans[i % len(spans)]), "span_id": f"{i:016x}"} for i in range(NUM_SPANS)
+    ]
+    return event
+
+
+def detect_per_span(event):
+    settings = get_detection_settings()
+    for detector_class in DETECTOR_CLASSES:
+        detector = detector_class(settings, event)
+        if detector.is_event_eligible(event):
+            for span in event["spans"]:
+                detector.visit_span(span)
+            detector.on_complete()
+
+
+def detect_columnar(event):
+    settings = get_detection_settings()
+    columns = SpanColumns(event["spans"])
+    for detector_class in DETECTOR_CLASSES:
+        run_detector_on_data(detector_class(settings, event), event, columns)
+
+
+@django_db_all
+@requires_pytest_benchmark
+@pytest.mark.parametrize("detect", [detect_per_span, detect_columnar], ids=lambda f: f.__name__)
+def test_benchmark_performance_detection(large_event, detect, benchmark):
+    benchmark(detect, large_event)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+
+from sentry.testutils.performance_issues.event_generators import (
+    EVENTS,
+    create_event,
+    create_span,
+    get_event,
+)
+from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.utils.performance_issues.detectors.n_plus_one_db_span_detector import (
+    NPlusOneDBSpanDetector,
+)
+from sentry.utils.performance_issues.performance_detection import (
+    DETECTOR_CLASSES,
+    get_detection_settings,
+    run_detector_on_data,
+)
+from sentry.utils.performance_issues.span_columns import SpanColumns
+
+
+def test_span_columns():
+    event = create_event([create_span("db.sql.query", 100.0), create_span("HTTP.client", 50.0)])
+    spans = event["spans"]
+    spans[0]["span_id"] = "c" * 16
+    spans[0]["hash"] = "a" * 16
+    spans[1]["span_id"] = "d" * 16
+    spans[1]["parent_span_id"] = "c" * 16
+
+    columns = SpanColumns(spans)
+
+    assert len(columns) == 2
+    assert columns.ops == ["db.sql.query", "HTTP.client"]
+    assert columns.span_ids == ["c" * 16, "d" * 16]
+    assert columns.parent_ids == [spans[0].get("parent_span_id"), "c" * 16]
+    assert columns.hashes == ["a" * 16, spans[1].get("hash")]
+    assert list(columns.starts) == [span["start_timestamp"] for span in spans]
+    assert list(columns.ends) == [span["timestamp"] for span in spans]
+    assert columns.indexes_with_op_prefix(("db",)) == [0]
+    assert columns.indexes_with_op_prefix(("http.client", "resource")) == [1]
+    assert columns.indexes_with_op_prefix(()) == []
+
+
+def test_span_columns_missing_fields():
+    columns = SpanColumns([{"op": None, "timestamp": None}, {}])
+
+    assert columns.ops == ["", ""]
+    assert columns.span_ids == [None, None]
+    assert columns.parent_ids == [None, None]
+    assert columns.hashes == [None, None]
+    assert list(columns.starts) == [0.0, 0.0]
+    assert list(columns.ends) == [0.0, 0.0]
+
+
+@django_db_all
+def test_n_plus_one_db_skips_db_runs_without_repeats():
+    event = create_event(
+        [create_span("db", desc=f"SELECT {i} FROM table", hash=str(i)) for i in range(10)]
+        + [create_span("http.client")]
+    )
+    detector = NPlusOneDBSpanDetector(get_detection_settings(), event)
+
+    with mock.patch.object(detector, "visit_span", wraps=detector.visit_span) as visit_span:
+        run_detector_on_data(detector, event, SpanColumns(event["spans"]))
+
+    # None of the DB queries repeat, so only the HTTP span is visited.
+    assert visit_span.call_count == 1
+    assert detector.stored_problems == {}
+
+
+@django_db_all
+@pytest.mark.parametrize("event_name", sorted(EVENTS))
+def test_detectors_find_same_problems(default_project, event_name):
+    settings = get_detection_settings()
+
+    for detector_class in DETECTOR_CLASSES:
+        event = get_event(event_name)
+        event["project"] = default_project.id
+        detector = detector_class(settings, event)
+        if not detector.is_event_eligible(event):
+            continue
+        for span in event.get("spans", []):
+            detector.visit_span(span)
+        detector.on_complete()
+
+        columnar_detector = detector_class(settings, event)
+        run_detector_on_data(columnar_detector, event, SpanColumns(event.get("spans", [])))
+
+        assert columnar_detector.stored_problems == detector.stored_problems, detector_class
@@ -4,6 +4,7 @@ from enum import Enum
 from unittest import TestCase
 from unittest.mock import patch
 
+import pytest
 from django.utils.translation import gettext_lazy as _
 
 from sentry.utils import json
@@ -59,3 +60,30 @@ class JSONTest(TestCase):
     def test_loads_without_sdk_trace(self, start_span_mock):
         json.loads('{"test": "message"}', skip_trace=True)
         start_span_mock.assert_not_called()
+
+    def test_iterload_array(self):
+        document = {
+            "meta": [{"name": "id", "type": "UInt64"}],
+            "data": [{"id": 1, "name": "caf\u00e9"}, {"id": 23456, "tags": [1.5, None, True]}],
+            "totals": {"count": 2},
+            "rows": 12345,
+        }
+        encoded = json.dumps(document).encode("utf-8")
+
+        for size in (1, 3, 16, len(encoded)):
+            chunks = [encoded[i : i + size] for i in range(0, len(encoded), size)]
+            body: dict = {}
+            assert list(json.iterload_array(chunks, "data", body)) == document["data"]
+            assert body == {"meta": document["meta"], "totals": {"count": 2}, "rows": 12345}
+
+    def test_iterload_array_empty(self):
+        body: dict = {}
+        assert list(json.iterload_array([b'{"data": [], "rows": 0}'], "data", body)) == []
+        assert body == {"rows": 0}
+        assert list(json.iterload_array([b"{}"], "data", {})) == []
+
+    def test_iterload_array_truncated(self):
+        rows = json.iterload_array([b'{"data": [{"id": 1}, {"id"'], "data", {})
+        assert next(rows) == {"id": 1}
+        with pytest.raises(json.JSONDecodeError):
+            next(rows)
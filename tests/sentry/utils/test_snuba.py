@@ -1,8 +1,12 @@
+import io
 import unittest
 from datetime import datetime, timedelta, timezone
 from unittest import mock
 
 import pytest
+import urllib3
+from django.core.cache import cache
+from django.test import override_settings
 from django.utils import timezone as django_timezone
 
 from sentry.models.grouprelease import GroupRelease
@@ -10,15 +14,20 @@ from sentry.models.project import Project
 from sentry.models.release import Release
 from sentry.snuba.dataset import Dataset
 from sentry.testutils.cases import TestCase
+from sentry.utils import json
 from sentry.utils.snuba import (
+    QueryExecutionError,
     SnubaQueryParams,
     UnqualifiedQueryError,
+    _apply_cache_and_build_results,
     _prepare_query_params,
+    get_cache_key,
     get_json_type,
     get_query_params_to_update_for_projects,
     get_snuba_column_name,
     get_snuba_translators,
     quantize_time,
+    stream_raw_query,
 )
 
 
@@ -375,3 +384,161 @@ class QuantizeTimeTest(unittest.TestCase):
                 break
 
         assert i != j
+
+
+class QueryCacheTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.query = ({"dataset": "events", "query": 1}, lambda x: x, lambda x: x)
+        self.cache_key = get_cache_key(self.query[0])
+        self.other_query = ({"dataset": "events", "query": 2}, lambda x: x, lambda x: x)
+
+    def tearDown(self):
+        super().tearDown()
+        cache.delete_many(
+            [
+                self.cache_key,
+                f"{self.cache_key}:lock",
+                f"{self.cache_key}:fresh",
+                get_cache_key(self.other_query[0]),
+            ]
+        )
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_repeated_queries(self, bulk_snuba_query):
+        bulk_snuba_query.return_value = [{"data": [1]}, {"data": [2]}]
+
+        results = _apply_cache_and_build_results(
+            [self.query, self.other_query, self.query], referrer="testing.test", use_cache=True
+        )
+        assert results == [{"data": [1]}, {"data": [2]}, {"data": [1]}]
+        assert results[0] is not results[2]
+        assert bulk_snuba_query.call_count == 1
+        assert len(bulk_snuba_query.call_args[0][0]) == 2
+        assert cache.get(f"{self.cache_key}:lock") is None
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_coalesce(self, bulk_snuba_query):
+        cache.set(f"{self.cache_key}:lock", 1)
+
+        def finish_query(interval):
+            cache.set(self.cache_key, json.dumps({"data": [1]}))
+
+        with mock.patch("sentry.utils.snuba.time.sleep", side_effect=finish_query):
+            results = _apply_cache_and_build_results(
+                [self.query], referrer="testing.test", use_cache=True
+            )
+        assert results == [{"data": [1]}]
+        assert bulk_snuba_query.call_count == 0
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_coalesce_failed_query(self, bulk_snuba_query):
+        bulk_snuba_query.return_value = [{"data": [2]}]
+        cache.set(f"{self.cache_key}:lock", 1)
+
+        def fail_query(interval):
+            cache.delete(f"{self.cache_key}:lock")
+
+        with mock.patch("sentry.utils.snuba.time.sleep", side_effect=fail_query):
+            results = _apply_cache_and_build_results(
+                [self.query], referrer="testing.test", use_cache=True
+            )
+        assert results == [{"data": [2]}]
+        assert bulk_snuba_query.call_count == 1
+
+    @override_settings(SENTRY_SNUBA_CACHE_COALESCE_TIMEOUT_SECONDS=0)
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_coalesce_disabled(self, bulk_snuba_query):
+        bulk_snuba_query.return_value = [{"data": [2]}]
+        cache.set(f"{self.cache_key}:lock", 1)
+
+        results = _apply_cache_and_build_results(
+            [self.query], referrer="testing.test", use_cache=True
+        )
+        assert results == [{"data": [2]}]
+        assert bulk_snuba_query.call_count == 1
+
+    @override_settings(
+        SENTRY_SNUBA_CACHE_REFERRER_TTL_SECONDS={"testing.test": 10},
+        SENTRY_SNUBA_CACHE_STALE_TTL_SECONDS={"testing.test": 60},
+    )
+    @mock.patch("sentry.utils.snuba._query_cache_refresh_pool")
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_stale_while_revalidate(self, bulk_snuba_query, refresh_pool):
+        refresh_pool.submit.side_effect = lambda fn, *args: fn(*args)
+        bulk_snuba_query.return_value = [{"data": [1]}]
+
+        def query():
+            return _apply_cache_and_build_results(
+                [self.query], referrer="testing.test", use_cache=True
+            )
+
+        assert query() == [{"data": [1]}]
+        assert query() == [{"data": [1]}]
+        assert bulk_snuba_query.call_count == 1
+        assert refresh_pool.submit.call_count == 0
+
+        # The result expired, it is served once more while it is refreshed.
+        cache.delete(f"{self.cache_key}:fresh")
+        bulk_snuba_query.return_value = [{"data": [2]}]
+        assert query() == [{"data": [1]}]
+        assert bulk_snuba_query.call_count == 2
+        assert refresh_pool.submit.call_count == 1
+        assert cache.get(f"{self.cache_key}:lock") is None
+
+        assert query() == [{"data": [2]}]
+        assert bulk_snuba_query.call_count == 2
+
+
+class StreamRawQueryTest(TestCase):
+    def response(self, body, status=200):
+        return urllib3.response.HTTPResponse(
+            body=io.BytesIO(json.dumps(body).encode("utf-8")),
+            status=status,
+            preload_content=False,
+        )
+
+    def stream(self):
+        self.environment = self.create_environment(project=self.project, name="production")
+        return stream_raw_query(
+            dataset=Dataset.Events,
+            start=datetime.now() - timedelta(days=1),
+            end=datetime.now(),
+            selected_columns=["event_id", "environment"],
+            filter_keys={"project_id": [self.project.id], "environment": [self.environment.id]},
+            referrer="testing.test",
+            tenant_ids={"organization_id": self.organization.id},
+            chunk_size=8,
+        )
+
+    @mock.patch("sentry.utils.snuba._snuba_pool")
+    def test_stream(self, snuba_pool):
+        snuba_pool.urlopen.return_value = self.response(
+            {
+                "data": [
+                    {"event_id": "a" * 32, "environment": "production"},
+                    {"event_id": "b" * 32, "environment": "production"},
+                ],
+                "meta": [{"name": "event_id"}, {"name": "environment"}],
+            }
+        )
+
+        result = self.stream()
+        assert snuba_pool.urlopen.call_args[1]["preload_content"] is False
+        assert result.body == {}
+
+        environment_id = self.environment.id
+        assert list(result) == [
+            {"event_id": "a" * 32, "environment": environment_id},
+            {"event_id": "b" * 32, "environment": environment_id},
+        ]
+        assert result.body == {"meta": [{"name": "event_id"}, {"name": "environment"}]}
+
+    @mock.patch("sentry.utils.snuba._snuba_pool")
+    def test_stream_error(self, snuba_pool):
+        snuba_pool.urlopen.return_value = self.response(
+            {"error": {"type": "clickhouse", "code": 0, "message": "boom"}}, status=500
+        )
+
+        with pytest.raises(QueryExecutionError):
+            self.stream()
@@ -2,11 +2,13 @@ import time
 from datetime import timedelta, timezone
 from unittest import mock
 
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone as django_timezone
 
 from sentry.api.event_search import SearchFilter, SearchKey, SearchValue
 from sentry.api.serializers import serialize
-from sentry.api.serializers.models.group import snuba_tsdb
+from sentry.api.serializers.models.group import bulk_raw_query, snuba_tsdb
 from sentry.api.serializers.models.group_stream import StreamGroupSerializerSnuba
 from sentry.models.environment import Environment
 from sentry.testutils.cases import APITestCase, SnubaTestCase
@@ -274,3 +276,40 @@ class StreamGroupSerializerTestCase(APITestCase, SnubaTestCase):
         assert not serializer.conditions
         result = serialize([group], self.user, serializer=serializer)
         assert result[0]["id"] == str(group.id)
+
+    def test_query_count(self):
+        """
+        Serializing a page of issues makes the same number of queries no matter
+        how many issues are on it, and the seen stats of each dataset come from a
+        single Snuba request.
+        """
+        organization_id = self.project.organization_id
+
+        def serialize_page(num_groups):
+            groups = [self.create_group(project=self.project) for _ in range(num_groups)]
+            serializer = StreamGroupSerializerSnuba(
+                stats_period="24h",
+                start=before_now(days=1),
+                end=before_now(),
+                search_filters=[SearchFilter(SearchKey("level"), "=", SearchValue("error"))],
+                organization_id=organization_id,
+                project_ids=[self.project.id],
+            )
+            with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries, mock.patch(
+                "sentry.api.serializers.models.group.bulk_raw_query", side_effect=bulk_raw_query
+            ) as seen_stats_queries:
+                result = serialize(groups, self.user, serializer=serializer)
+            assert [item["id"] for item in result] == [str(group.id) for group in groups]
+            return len(queries.captured_queries), seen_stats_queries
+
+        serialize_page(1)
+        num_queries, _ = serialize_page(10)
+        num_queries_large, seen_stats_queries = serialize_page(100)
+
+        assert num_queries_large == num_queries
+        assert seen_stats_queries.call_count == 1
+        # time range, filtered and lifetime stats of the error issues
+        assert len(seen_stats_queries.call_args[0][0]) == 3
+        assert seen_stats_queries.call_args[1]["referrer"] == (
+            "serializers.GroupSerializerSnuba._execute_error_seen_stats_query"
+        )
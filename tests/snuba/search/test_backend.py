@@ -38,6 +38,7 @@ from sentry.search.snuba.backend import (
 )
 from sentry.search.snuba.executors import InvalidQueryForExecutor, PrioritySortWeights
 from sentry.snuba.dataset import Dataset
+from sentry.tasks.auto_resolve_issues import auto_resolve_project_issues
 from sentry.testutils.cases import SnubaTestCase, TestCase, TransactionTestCase
 from sentry.testutils.helpers import Feature, apply_feature_flag_on_cls
 from sentry.testutils.helpers.datetime import before_now, iso_format
@@ -1912,6 +1913,115 @@ class EventsSnubaSearchTestCases(EventsDatasetTestSetup):
         finally:
             options.set("snuba.search.pre-snuba-candidates-optimizer", prev_optimizer_enabled)
 
+    def test_intersect_candidates(self):
+        with self.options(
+            {
+                "snuba.search.max-pre-snuba-candidates": 1,
+                "snuba.search.pre-snuba-candidates-optimizer": True,
+                "snuba.search.pre-snuba-candidates-percentage": 1.0,
+            }
+        ), mock.patch("sentry.search.snuba.executors.metrics.incr") as incr:
+            # too many candidates to pre-filter, but few enough to intersect
+            results = self.make_query(sort_by="freq")
+            assert set(results) == {self.group1, self.group2}
+            incr.assert_any_call(
+                "snuba.search.plan", tags={"strategy": "intersect"}, skip_internal=False
+            )
+
+            results = self.make_query(search_filter_query="foo")
+            assert set(results) == {self.group1}
+            incr.assert_any_call(
+                "snuba.search.plan", tags={"strategy": "prefilter"}, skip_internal=False
+            )
+
+        with self.options(
+            {
+                "snuba.search.max-pre-snuba-candidates": 1,
+                "snuba.search.pre-snuba-candidates-optimizer": True,
+                "snuba.search.pre-snuba-candidates-percentage": 0.0,
+            }
+        ), mock.patch("sentry.search.snuba.executors.metrics.incr") as incr:
+            # the candidates are all groups of the project, intersecting them is pointless
+            results = self.make_query(sort_by="freq")
+            assert set(results) == {self.group1, self.group2}
+            incr.assert_any_call(
+                "snuba.search.plan", tags={"strategy": "postfilter"}, skip_internal=False
+            )
+
+    def test_result_cache(self):
+        with self.options({"snuba.search.result-cache-ttl": 60}):
+            results = self.make_query(search_filter_query="is:unresolved")
+            assert list(results) == [self.group1]
+
+            # status changes made behind the back of the cache are not seen
+            Group.objects.filter(id=self.group1.id).update(status=GroupStatus.RESOLVED)
+            results = self.make_query(search_filter_query="is:unresolved")
+            assert list(results) == [self.group1]
+
+            record_group_history(self.group1, GroupHistoryStatus.RESOLVED)
+            results = self.make_query(search_filter_query="is:unresolved")
+            assert list(results) == []
+
+    def test_result_cache_auto_resolve(self):
+        self.project.update_option("sentry:resolve_age", 1)
+        Group.objects.filter(id=self.group1.id).update(
+            last_seen=django_timezone.now() - timedelta(days=1)
+        )
+        with self.options({"snuba.search.result-cache-ttl": 60}):
+            results = self.make_query(search_filter_query="is:unresolved")
+            assert list(results) == [self.group1]
+
+            with self.tasks(), mock.patch("sentry.tasks.auto_ongoing_issues.backend") as backend:
+                backend.get_size.return_value = 0
+                auto_resolve_project_issues(project_id=self.project.id)
+
+            assert Group.objects.get(id=self.group1.id).status == GroupStatus.RESOLVED
+            results = self.make_query(search_filter_query="is:unresolved")
+            assert list(results) == []
+
+    def test_result_cache_refresh(self):
+        with self.options({"snuba.search.result-cache-ttl": 60}):
+            results = self.make_query(sort_by="date", limit=2)
+            assert list(results) == [self.group1, self.group2]
+            assert not results.next
+
+            event = self.store_event(
+                data={"fingerprint": ["put-me-in-group3"], "timestamp": iso_format(before_now())},
+                project_id=self.project.id,
+            )
+            results = self.make_query(sort_by="date", limit=2)
+            assert list(results) == [self.group1, self.group2]
+
+            with mock.patch("sentry.search.snuba.backend.time") as mock_time:
+                mock_time.time.return_value = time.time() + 30
+                results = self.make_query(sort_by="date", limit=2)
+            assert list(results) == [event.group, self.group1]
+            assert results.next
+
+    def test_result_cache_refresh_full_page(self):
+        with self.options({"snuba.search.result-cache-ttl": 60}):
+            results = self.make_query(sort_by="date", limit=1)
+            assert list(results) == [self.group1]
+
+            event = self.store_event(
+                data={"fingerprint": ["put-me-in-group3"], "timestamp": iso_format(before_now())},
+                project_id=self.project.id,
+            )
+            with mock.patch("sentry.search.snuba.backend.time") as mock_time, mock.patch.object(
+                self.backend, "_query", wraps=self.backend._query
+            ) as query:
+                mock_time.time.return_value = time.time() + 30
+                results = self.make_query(sort_by="date", limit=1)
+
+            # Only the issues seen since the last refresh were searched for,
+            # and they fill the page.
+            assert query.call_count == 1
+            assert list(results) == [event.group]
+            assert results.next
+
+            results = self.make_query(sort_by="date", limit=1, cursor=results.next)
+            assert list(results) == [self.group1]
+
     def test_search_out_of_range(self):
         the_date = datetime(2000, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
         results = self.make_query(